@@ -0,0 +1,45 @@
+# Metrics compared against the baseline and whether a higher value is better.
+COMPARED_METRICS = {
+    'bytes_per_million_entries': False,
+    'mb_per_second': True,
+    'operations_per_second': True,
+    'peak_rss_bytes': False
+}
+
+
+class BenchmarkResult:
+
+    def __init__(self, name, operations, seconds, **metrics):
+        self.name = name
+        self.operations = operations
+        self.seconds = seconds
+        self.metrics = metrics
+
+    def to_dict(self):
+        result = {
+            'name': self.name,
+            'operations': self.operations,
+            'seconds': self.seconds,
+            'operations_per_second': self.operations / self.seconds if self.seconds > 0 else 0.0
+        }
+        result.update(self.metrics)
+
+        return result
+
+
+def compare_results(results, baseline_results, tolerance):
+    baseline_by_names = {result['name']: result for result in baseline_results}
+    regressions = []
+
+    for result in results:
+        baseline = baseline_by_names.get(result['name'])
+        if baseline is None:
+            continue
+        for metric, is_higher_better in COMPARED_METRICS.items():
+            if metric not in result or not baseline.get(metric):
+                continue
+            change = (result[metric] - baseline[metric]) / baseline[metric]
+            if (is_higher_better and change < -tolerance) or (not is_higher_better and change > tolerance):
+                regressions.append((result['name'], metric, baseline[metric], result[metric]))
+
+    return regressions
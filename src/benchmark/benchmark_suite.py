@@ -0,0 +1,75 @@
+import multiprocessing
+import os
+import resource
+import tempfile
+import time
+
+from benchmark.filesystem_benchmark import run_filesystem_benchmark
+from benchmark.index_benchmark import run_index_benchmark
+from benchmark.index_memory_benchmark import run_index_memory_benchmark
+from benchmark.read_benchmark import run_read_benchmark
+from benchmark.tree_generator import TreeGenerator
+from benchmark.write_benchmark import run_write_benchmark
+
+BENCHMARKS = {
+    'filesystem': run_filesystem_benchmark,
+    'index': run_index_benchmark,
+    'index_memory': run_index_memory_benchmark,
+    'read': run_read_benchmark,
+    'write': run_write_benchmark
+}
+
+
+class BenchmarkContext:
+
+    def __init__(self, file_count, disk_file_count, work_directory):
+        self.file_count = file_count
+        self.disk_file_count = disk_file_count
+        self.work_directory = work_directory
+        self.source_directory = os.path.join(work_directory, 'source')
+
+
+# Every benchmark runs in a child process, so the peak resident set size reported for it is not affected by the others.
+# Benchmarks that work on the disk use a tree of at most disk_file_count files, the others use file_count paths.
+class BenchmarkSuite:
+
+    def __init__(self, file_count, disk_file_count=10000, names=None):
+        self._file_count = file_count
+        self._disk_file_count = min(file_count, disk_file_count)
+        self._names = names if names is not None else sorted(BENCHMARKS.keys())
+
+    def run(self):
+        results = []
+
+        with tempfile.TemporaryDirectory() as work_directory:
+            context = BenchmarkContext(self._file_count, self._disk_file_count, work_directory)
+            start = time.perf_counter()
+            TreeGenerator(context.source_directory, self._disk_file_count).create()
+            print(F'Generated {self._disk_file_count} files in {time.perf_counter() - start:.1f} seconds.')
+
+            for name in self._names:
+                results.extend(self._run_benchmark(name, context))
+
+        return results
+
+    def _run_benchmark(self, name, context):
+        receiver, sender = multiprocessing.Pipe(duplex=False)
+        process = multiprocessing.Process(target=_run_in_child, args=(BENCHMARKS[name], context, sender))
+        process.start()
+        sender.close()
+        results = receiver.recv()
+        process.join()
+
+        return results
+
+
+def _run_in_child(benchmark, context, sender):
+    results = [result.to_dict() for result in benchmark(context)]
+
+    # The maximum resident set size is reported in kilobytes on Linux.
+    peak_rss_bytes = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    for result in results:
+        result['peak_rss_bytes'] = peak_rss_bytes
+
+    sender.send(results)
+    sender.close()
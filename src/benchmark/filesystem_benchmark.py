@@ -0,0 +1,90 @@
+import os
+import time
+
+from benchmark.benchmark_result import BenchmarkResult
+from benchmark.tree_generator import TRANSFORMATION
+from domain.config import TransformationConfig
+from filesystem.attribute_cache import AttributeCache
+from filesystem.file_pool import FilePool
+from filesystem.mirror_fs import MirrorFs
+from filesystem.transformer_fs import TransformerFs
+from filesystem.transformation.directory_lister import DirectoryLister
+from filesystem.transformation.transformer import Transformer
+
+_HOT_FILES = 100
+_REOPENING_ROUNDS = 100
+
+
+# Calls the operations of the filesystems directly, the way FUSE would call them for every file of the generated tree:
+# listing the parent directory, getting the attributes, then opening, reading and releasing the file. Opening the same
+# files again and again is measured with and without pooling their file descriptors.
+def run_filesystem_benchmark(context):
+    results = []
+
+    transformer = Transformer()
+    transformer.add_to_cache(DirectoryLister(context.source_directory), [TransformationConfig(*TRANSFORMATION)])
+    transformed_paths = [os.sep + target for target, _ in transformer.get_entries()]
+    results.extend(_measure_operations('transformer_fs', TransformerFs(transformer), transformed_paths))
+
+    attribute_cache = AttributeCache(60)
+    cached_transformer_fs = TransformerFs(transformer, attribute_cache=attribute_cache)
+    for path in transformed_paths:
+        cached_transformer_fs.getattr(path)
+    results.extend(_measure_operations('transformer_fs.cached', cached_transformer_fs, transformed_paths))
+
+    hot_paths = transformed_paths[:_HOT_FILES]
+    results.append(_measure_reopening('transformer_fs', TransformerFs(transformer), hot_paths))
+    pooled_transformer_fs = TransformerFs(transformer, file_pool=FilePool(_HOT_FILES))
+    results.append(_measure_reopening('transformer_fs.pooled', pooled_transformer_fs, hot_paths))
+    pooled_transformer_fs.destroy('/')
+
+    mirrored_paths = [
+        os.sep + os.path.relpath(os.path.join(dirname, filename), context.source_directory)
+        for dirname, _, filenames
+        in os.walk(context.source_directory)
+        for filename
+        in filenames
+    ]
+    results.extend(_measure_operations('mirror_fs', MirrorFs(context.source_directory), mirrored_paths))
+
+    return results
+
+
+def _measure_operations(prefix, fuse_fs, paths):
+    directories = sorted({os.path.dirname(path) for path in paths})
+
+    start = time.perf_counter()
+    for directory in directories:
+        for _ in fuse_fs.readdir(directory, None):
+            pass
+    readdir_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for path in paths:
+        fuse_fs.getattr(path)
+    getattr_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for path in paths:
+        fh = fuse_fs.open(path, os.O_RDONLY)
+        fuse_fs.read(path, 4096, 0, fh)
+        fuse_fs.release(path, fh)
+    read_seconds = time.perf_counter() - start
+
+    return [
+        BenchmarkResult(F'{prefix}.readdir', len(directories), readdir_seconds),
+        BenchmarkResult(F'{prefix}.getattr', len(paths), getattr_seconds),
+        BenchmarkResult(F'{prefix}.open_read_release', len(paths), read_seconds)
+    ]
+
+
+def _measure_reopening(prefix, fuse_fs, paths):
+    start = time.perf_counter()
+    for _ in range(_REOPENING_ROUNDS):
+        for path in paths:
+            fh = fuse_fs.open(path, os.O_RDONLY)
+            fuse_fs.read(path, 4096, 0, fh)
+            fuse_fs.release(path, fh)
+    seconds = time.perf_counter() - start
+
+    return BenchmarkResult(F'{prefix}.reopen_read_release', _REOPENING_ROUNDS * len(paths), seconds)
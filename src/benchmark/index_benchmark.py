@@ -0,0 +1,39 @@
+import os
+import time
+
+from benchmark.benchmark_result import BenchmarkResult
+from benchmark.tree_generator import TRANSFORMATION, GeneratedDirectoryLister, TreeGenerator
+from domain.config import TransformationConfig
+from filesystem.transformation.transformer import Transformer
+
+_MAX_LOOKUPS = 1000000
+
+
+# Measures building the index from generated paths and looking up its directories and files.
+def run_index_benchmark(context):
+    tree_generator = TreeGenerator('/home/root/doc', context.file_count)
+    transformer = Transformer()
+
+    start = time.perf_counter()
+    transformer.add_to_cache(GeneratedDirectoryLister(tree_generator), [TransformationConfig(*TRANSFORMATION)])
+    build_seconds = time.perf_counter() - start
+
+    entries = transformer.get_entries()
+    directories = sorted({os.sep + os.path.dirname(target) for target, _ in entries})
+    targets = [os.sep + target for target, _ in entries[:_MAX_LOOKUPS]]
+
+    start = time.perf_counter()
+    for directory in directories:
+        transformer.get_directory_contents(directory)
+    listing_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for target in targets:
+        transformer.get_source_path(target)
+    lookup_seconds = time.perf_counter() - start
+
+    return [
+        BenchmarkResult('index.add_to_cache', context.file_count, build_seconds),
+        BenchmarkResult('index.get_directory_contents', len(directories), listing_seconds),
+        BenchmarkResult('index.get_source_path', len(targets), lookup_seconds)
+    ]
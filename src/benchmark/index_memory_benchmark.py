@@ -0,0 +1,51 @@
+import gc
+import time
+import tracemalloc
+
+from benchmark.benchmark_result import BenchmarkResult
+from filesystem.transformation.transformer import Transformer
+
+
+# Measures the memory retained by the index of a Transformer and the speed of its lookups. Entries resemble the result
+# of a typical rule: files are spread over a few thousand source directories and keep their names.
+def run_index_memory_benchmark(context):
+    entry_count = context.file_count
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        entries = _create_entries(entry_count)
+        transformer = Transformer()
+        transformer.add_entries(entries)
+        targets = [target for target, _ in entries[::max(1, entry_count // 100000)]]
+        del entries
+        gc.collect()
+        memory_bytes, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    start = time.perf_counter()
+    for target in targets:
+        transformer.get_source_path(target)
+    lookup_seconds = time.perf_counter() - start
+
+    return [
+        BenchmarkResult(
+            'index_memory',
+            len(targets),
+            lookup_seconds,
+            bytes_per_million_entries=memory_bytes * 1000000 // entry_count)
+    ]
+
+
+def _create_entries(entry_count):
+    entries = []
+
+    for i in range(entry_count):
+        category = F'category{i % 50}'
+        title = F'title{i // 50 % 100}'
+        filename = F'document{i}.md'
+        source = F'/home/root/doc/{title}/{category}/content/{filename}'
+        entries.append((F'cyclopaedia/{title} [{category}]/{filename}', source))
+
+    return entries
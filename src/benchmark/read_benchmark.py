@@ -0,0 +1,85 @@
+import ctypes
+import os
+import random
+import tempfile
+import time
+
+from benchmark.benchmark_result import BenchmarkResult
+from filesystem.mmap_pool import MmapPool
+from filesystem.readahead import Readahead
+from filesystem.transformer_fs import TransformerFs
+from filesystem.transformation.transformer import Transformer
+
+TARGET_PATH = '/benchmark/data.bin'
+
+
+# Measures the throughput of reads through TransformerFs the way FUSE issues them: into a ctypes buffer of the size of
+# the request. The read method returns bytes that fusepy copies into the buffer, while read_into fills the buffer
+# directly, either with preadv or from a shared mapping. Readahead only passes hints to the kernel, so it makes a
+# difference when the file is not in the page cache yet.
+def run_read_benchmark(context, file_size=64 * 1024 * 1024, block_size=128 * 1024, rounds=3):
+    results = []
+
+    with tempfile.TemporaryDirectory(dir=context.work_directory) as directory:
+        source_path = os.path.join(directory, 'data.bin')
+        with open(source_path, 'wb') as source_file:
+            source_file.write(os.urandom(file_size))
+
+        patterns = _create_patterns(file_size, block_size)
+        for name, transformer_fs, read in _create_methods(source_path):
+            for pattern, offsets in patterns:
+                seconds = _measure(transformer_fs, read, offsets, block_size, rounds)
+                results.append(BenchmarkResult(
+                    F'read.{name}.{pattern}',
+                    len(offsets),
+                    seconds,
+                    mb_per_second=file_size / seconds / 1024 / 1024))
+
+    return results
+
+
+def _create_methods(source_path):
+    transformer = Transformer()
+    transformer.add_entries([(TARGET_PATH[1:], source_path)])
+
+    return [
+        ('read', TransformerFs(transformer), _read),
+        ('read_into', TransformerFs(transformer), _read_into),
+        ('read_into_mmap', TransformerFs(transformer, mmap_pool=MmapPool(1)), _read_into),
+        ('read_into_readahead', TransformerFs(transformer, readahead=Readahead(8 * 1024 * 1024)), _read_into)
+    ]
+
+
+def _create_patterns(file_size, block_size):
+    sequential_offsets = list(range(0, file_size, block_size))
+    random_offsets = list(sequential_offsets)
+    random.Random(0).shuffle(random_offsets)
+
+    return [('sequential', sequential_offsets), ('random', random_offsets)]
+
+
+def _measure(transformer_fs, read, offsets, block_size, rounds):
+    buffer = (ctypes.c_char * block_size)()
+    fh = transformer_fs.open(TARGET_PATH, os.O_RDONLY)
+    try:
+        # The first round only warms up the page cache.
+        best_seconds = None
+        for _ in range(rounds + 1):
+            start = time.perf_counter()
+            for offset in offsets:
+                read(transformer_fs, buffer, offset, fh)
+            seconds = time.perf_counter() - start
+            best_seconds = seconds if best_seconds is None else min(best_seconds, seconds)
+    finally:
+        transformer_fs.release(TARGET_PATH, fh)
+
+    return best_seconds
+
+
+def _read(transformer_fs, buffer, offset, fh):
+    data = transformer_fs.read(TARGET_PATH, len(buffer), offset, fh)
+    ctypes.memmove(buffer, data, len(data))
+
+
+def _read_into(transformer_fs, buffer, offset, fh):
+    transformer_fs.read_into(TARGET_PATH, memoryview(buffer).cast('B'), offset, fh)
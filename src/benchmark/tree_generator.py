@@ -0,0 +1,56 @@
+import os
+import random
+
+CATEGORIES = ('fruits', 'nuts', 'vegetables', 'grains', 'spices', 'herbs', 'mushrooms', 'seeds')
+EXTENSIONS = ('md', 'odt', 'txt', 'pdf')
+STAGES = ('content', 'content', 'content', 'draft')
+
+TRANSFORMATION = (
+    '.*/(?P<title>[^/]+)/(?P<category>[^/]+)/content/(?P<filename>.+)\\.(?P<extension>md|odt|txt)$',
+    'cyclopaedia/\\g<title> [\\g<category>]/\\g<filename>.\\g<extension>')
+
+
+# Generates source trees shaped like the example of the README: title/category/stage/file.extension. Three quarters of
+# the files are in content directories, and three quarters of those have an extension matched by TRANSFORMATION.
+class TreeGenerator:
+
+    def __init__(self, root, file_count, files_per_directory=100, seed=0):
+        self._root = root
+        self._file_count = file_count
+        self._files_per_directory = files_per_directory
+        self._seed = seed
+
+    def create(self):
+        directories = set()
+        for path in self.generate_paths():
+            directory = os.path.dirname(path)
+            if directory not in directories:
+                os.makedirs(directory, exist_ok=True)
+                directories.add(directory)
+            with open(path, 'wb'):
+                pass
+
+    def generate_paths(self):
+        randomizer = random.Random(self._seed)
+        directory_count = max(1, self._file_count // self._files_per_directory)
+
+        for i in range(self._file_count):
+            directory_number = i % directory_count
+            title = F'title{directory_number // len(CATEGORIES)}'
+            category = CATEGORIES[directory_number % len(CATEGORIES)]
+            stage = STAGES[randomizer.randrange(len(STAGES))]
+            extension = EXTENSIONS[randomizer.randrange(len(EXTENSIONS))]
+            yield os.path.join(self._root, title, category, stage, F'document{i}.{extension}')
+
+
+# A directory lister that returns generated paths, so indexing can be measured without the cost of walking a disk.
+class GeneratedDirectoryLister:
+
+    def __init__(self, tree_generator):
+        self._tree_generator = tree_generator
+
+    def list_directory(self, rule_matchers=()):  # pylint: disable=unused-argument
+        return self._tree_generator.generate_paths()
+
+    def pop_stat(self, path):  # pylint: disable=unused-argument
+        return None
@@ -0,0 +1,36 @@
+import os
+import tempfile
+import time
+
+from benchmark.benchmark_result import BenchmarkResult
+from filesystem.file_syncer import DURABILITY_GROUP_COMMIT, DURABILITY_PASSTHROUGH, DURABILITY_STRICT, FileSyncer
+from filesystem.mirror_fs import MirrorFs
+
+
+# Writes small files through MirrorFs the way FUSE calls it when a program creates a file and closes it: creating,
+# writing, flushing and releasing the file. The durability mode decides whether the flush syncs the file to the disk.
+def run_write_benchmark(context, file_size=4096):
+    results = []
+    data = os.urandom(file_size)
+
+    for durability in (DURABILITY_STRICT, DURABILITY_GROUP_COMMIT, DURABILITY_PASSTHROUGH):
+        with tempfile.TemporaryDirectory(dir=context.work_directory) as directory:
+            mirror_fs = MirrorFs(directory, file_syncer=FileSyncer(durability))
+            paths = [F'/{index}.bin' for index in range(context.disk_file_count)]
+
+            start = time.perf_counter()
+            for path in paths:
+                fh = mirror_fs.create(path, 0o644)
+                mirror_fs.write(path, memoryview(data), 0, fh)
+                mirror_fs.flush(path, fh)
+                mirror_fs.release(path, fh)
+            mirror_fs.destroy('/')
+            seconds = time.perf_counter() - start
+
+            results.append(BenchmarkResult(
+                F'write.{durability}',
+                len(paths),
+                seconds,
+                mb_per_second=len(paths) * file_size / seconds / 1024 / 1024))
+
+    return results
@@ -0,0 +1,87 @@
+"""
+Benchmark module.
+Runs the benchmarks, prints their results and compares them with a baseline.
+"""
+
+import getopt
+import json
+import sys
+
+from benchmark.benchmark_result import compare_results
+from benchmark.benchmark_suite import BENCHMARKS, BenchmarkSuite
+
+
+def main():
+    try:
+        opts, names = getopt.getopt(
+            sys.argv[1:], 'b:d:hn:o:t:', ['baseline=', 'disk-files=', 'help', 'files=', 'output=', 'tolerance='])
+    except getopt.GetoptError as exception:
+        print(exception)
+        _print_help()
+        sys.exit(2)
+
+    baseline_path = None
+    disk_file_count = 10000
+    file_count = 100000
+    output_path = None
+    tolerance = 0.2
+    for opt, arg in opts:
+        if opt in ('-b', '--baseline'):
+            baseline_path = arg
+        elif opt in ('-d', '--disk-files'):
+            disk_file_count = int(arg)
+        elif opt in ('-h', '--help'):
+            _print_help()
+            return
+        elif opt in ('-n', '--files'):
+            file_count = int(arg)
+        elif opt in ('-o', '--output'):
+            output_path = arg
+        elif opt in ('-t', '--tolerance'):
+            tolerance = float(arg)
+
+    results = BenchmarkSuite(file_count, disk_file_count, names or None).run()
+    _print_results(results)
+
+    if output_path is not None:
+        with open(output_path, 'w', encoding='utf-8') as output_file:
+            json.dump({'file_count': file_count, 'results': results}, output_file, indent=2, sort_keys=True)
+
+    if baseline_path is not None and _has_regressions(results, baseline_path, tolerance):
+        sys.exit(1)
+
+
+def _has_regressions(results, baseline_path, tolerance):
+    with open(baseline_path, 'r', encoding='utf-8') as baseline_file:
+        baseline = json.load(baseline_file)
+    regressions = compare_results(results, baseline['results'], tolerance)
+    for name, metric, baseline_value, value in regressions:
+        print(F'Regression in {name}: {metric} changed from {baseline_value:.1f} to {value:.1f}.')
+
+    return bool(regressions)
+
+
+def _print_help():
+    print('python benchmark_runner.py <options> [benchmark ...]')
+    print('')
+    print('  -b, --baseline     The path of a result file to compare the results with.')
+    print('  -d, --disk-files   The number of files generated on the disk (10000 by default).')
+    print('  -h, --help         Print this help and exit.')
+    print('  -n, --files        The number of paths indexed (100000 by default).')
+    print('  -o, --output       The path of the file the results are saved to.')
+    print('  -t, --tolerance    The relative change treated as a regression (0.2 by default).')
+    print('')
+    print(F'Benchmarks: {", ".join(sorted(BENCHMARKS.keys()))}.')
+
+
+def _print_results(results):
+    print(F'{"Benchmark":<42} {"Seconds":>12} {"Operations/s":>14} {"Peak RSS MB":>12}')
+    for result in results:
+        peak_rss_mb = result['peak_rss_bytes'] / 1024 / 1024
+        print(
+            F'{result["name"]:<42} {result["seconds"]:>12.3f} {result["operations_per_second"]:>14.0f} '
+            F'{peak_rss_mb:>12.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -2,9 +2,22 @@ class Config:
 
     def __init__(self):
         self.logging = LoggingConfig()
+        self.tracing = TracingConfig()
         self.volumes = []
 
 
+# The mount points affected by a reloaded configuration, with their new volumes. The index of a mount point whose
+# volumes only differ in their source directories, transformations and walkers is rebuilt in place, other changed mount
+# points are remounted.
+class ConfigChanges:
+
+    def __init__(self):
+        self.added = {}
+        self.reindexed = {}
+        self.remounted = {}
+        self.removed = []
+
+
 class LoggingConfig:
 
     def __init__(self):
@@ -14,6 +27,15 @@ class LoggingConfig:
         self.path = ''
 
 
+class TracingConfig:
+
+    def __init__(self):
+        self.enabled = False
+        self.max_payload_bytes = 32
+        self.sample_rates = {}
+
+
+# pylint: disable=too-many-instance-attributes
 class VolumeConfig:
 
     def __init__(self, source_path, mount_point):
@@ -21,7 +43,61 @@ class VolumeConfig:
         self.mount_point = mount_point
 
         self.allow_other = False
+        self.cache = CacheConfig()
+        self.index = IndexConfig()
+        self.io = IoConfig()
+        self.metrics = MetricsConfig()
         self.transformations = []
+        self.walker = WalkerConfig()
+
+
+class CacheConfig:
+
+    def __init__(self):
+        self.attribute_max_entries = 65536
+        self.attribute_ttl_seconds = 1.0
+        self.directory_handle_max_entries = 64
+        self.directory_handle_ttl_seconds = 1.0
+        self.negative_max_entries = 4096
+        self.negative_ttl_seconds = 1.0
+
+
+class IndexConfig:
+
+    def __init__(self):
+        self.progressive = False
+        self.snapshot_directory = ''
+        self.wait_timeout_seconds = 0
+        self.watch = False
+
+
+class IoConfig:
+
+    def __init__(self):
+        self.durability = 'strict'
+        self.file_pool_max_entries = 0
+        self.file_pool_ttl_seconds = 1.0
+        self.group_commit_interval_seconds = 1.0
+        self.mmap_threshold_bytes = 0
+        self.readahead_max_bytes = 8388608
+        self.threads = 1
+
+
+class MetricsConfig:
+
+    def __init__(self):
+        self.enabled = False
+
+
+class WalkerConfig:
+
+    def __init__(self):
+        self.collect_stats = False
+        self.engine = 'walk'
+        self.exclude = []
+        self.include = []
+        self.max_depth = None
+        self.threads = 4
 
 
 class TransformationConfig:
@@ -1,6 +1,18 @@
+# The index builder of a transformed filesystem is run in its FUSE process: before mounting, or in the background after
+# mounting if the index is progressive. Its watchers are started before the index is built. The profiler is installed
+# in the FUSE process as well, and started right away if profiling is enabled.
+# pylint: disable=too-many-instance-attributes
 class Proxy:
 
-    def __init__(self, mount_point, fuse_fs, allow_other):
+    # pylint: disable=too-many-arguments
+    def __init__(self, mount_point, fuse_fs, allow_other, threads=1, connection=None):
         self.mount_point = mount_point
         self.fuse_fs = fuse_fs
         self.allow_other = allow_other
+        self.threads = threads
+        self.connection = connection
+        self.index_builder = None
+        self.watchers = ()
+        self.is_index_progressive = False
+        self.is_profiling_enabled = False
+        self.profiler = None
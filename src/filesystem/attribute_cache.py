@@ -0,0 +1,66 @@
+import threading
+import time
+from collections import OrderedDict
+
+KIND_ATTRIBUTES = 'getattr'
+KIND_STATFS = 'statfs'
+
+# Results of access are stored under the access mode, so every kind of entry belonging to a path can be enumerated.
+_KINDS = (KIND_ATTRIBUTES, KIND_STATFS) + tuple(range(8))
+
+
+# Keeps the attributes of at most max_entries paths for ttl seconds, evicting the least recently used entry. Entries
+# seeded with the attributes captured while the index is built expire ttl seconds after they were captured. Seeding
+# stops once the cache is full, since the entries of a larger index would only evict each other. Setting ttl or
+# max_entries to 0 disables the cache.
+class AttributeCache:
+
+    def __init__(self, ttl, max_entries=65536):
+        self._ttl = ttl
+        self._max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, path, kind):
+        key = (path, kind)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            expiry, value = entry
+            if expiry < time.monotonic():
+                del self._entries[key]
+                return None
+
+            self._entries.move_to_end(key)
+            return value
+
+    def seed(self, path, kind, value, captured_at):
+        if len(self._entries) < self._max_entries:
+            self._put((path, kind), captured_at + self._ttl, value)
+
+    def set(self, path, kind, value):
+        self._put((path, kind), time.monotonic() + self._ttl, value)
+
+    def invalidate(self, path):
+        with self._lock:
+            for kind in _KINDS:
+                self._entries.pop((path, kind), None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def _put(self, key, expiry, value):
+        if self._ttl <= 0 or self._max_entries <= 0:
+            return
+
+        with self._lock:
+            self._entries[key] = (expiry, value)
+            self._entries.move_to_end(key)
+            if len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
@@ -0,0 +1,112 @@
+import contextlib
+import os
+import threading
+import time
+from collections import OrderedDict
+
+
+class _Handle:
+
+    def __init__(self, fd, expiry):
+        self.fd = fd
+        self.expiry = expiry
+        self.references = 0
+        self.is_evicted = False
+
+
+# Resolves paths relative to handles (O_PATH file descriptors) of directories, so the kernel only has to look up the
+# last component of a path instead of walking it from the root, and the source directory keeps being used even if it is
+# renamed. The handles of the parent directories of the most recently used paths are kept, at most max_entries of them.
+# Subdirectories may be renamed by other programs, so their handles expire after ttl seconds. A handle is only closed
+# once no operation uses it. Setting max_entries to 0 resolves paths relative to the source directory.
+class DirectoryHandles:
+
+    def __init__(self, root, max_entries=64, ttl=1.0):
+        self._root = root
+        self._max_entries = max_entries
+        self._ttl = ttl
+        self._handles = OrderedDict()
+        self._lock = threading.Lock()
+        self._root_fd = None
+
+    def clear(self):
+        with self._lock:
+            for path in list(self._handles):
+                self._evict(path)
+
+    def close(self):
+        self.clear()
+        with self._lock:
+            if self._root_fd is not None:
+                os.close(self._root_fd)
+                self._root_fd = None
+
+    @contextlib.contextmanager
+    def resolve(self, path):
+        # Yields a directory handle and the path relative to it, which can be passed as dir_fd to the functions of os.
+        relative_path = path.strip(os.sep)
+        parent_path, _, name = relative_path.rpartition(os.sep)
+        if not parent_path or self._max_entries <= 0:
+            yield self._get_root_fd(), relative_path or '.'
+            return
+
+        handle = self._acquire(parent_path)
+        try:
+            yield handle.fd, name
+        finally:
+            self._release(handle)
+
+    def _acquire(self, path):
+        with self._lock:
+            handle = self._get_handle(path)
+            if handle is not None:
+                return handle
+
+        fd = os.open(path, os.O_PATH | os.O_DIRECTORY, dir_fd=self._get_root_fd())
+        with self._lock:
+            # Another thread may have opened the same directory in the meantime.
+            handle = self._get_handle(path)
+            if handle is not None:
+                os.close(fd)
+                return handle
+
+            handle = _Handle(fd, time.monotonic() + self._ttl)
+            handle.references = 1
+            self._handles[path] = handle
+            if len(self._handles) > self._max_entries:
+                self._evict(next(iter(self._handles)))
+
+        return handle
+
+    def _evict(self, path):
+        handle = self._handles.pop(path)
+        handle.is_evicted = True
+        if handle.references == 0:
+            os.close(handle.fd)
+
+    def _get_handle(self, path):
+        handle = self._handles.get(path)
+        if handle is None:
+            return None
+        if handle.expiry < time.monotonic():
+            self._evict(path)
+            return None
+
+        self._handles.move_to_end(path)
+        handle.references = handle.references + 1
+
+        return handle
+
+    def _get_root_fd(self):
+        if self._root_fd is None:
+            with self._lock:
+                if self._root_fd is None:
+                    self._root_fd = os.open(self._root, os.O_PATH | os.O_DIRECTORY)
+
+        return self._root_fd
+
+    def _release(self, handle):
+        with self._lock:
+            handle.references = handle.references - 1
+            if handle.is_evicted and handle.references == 0:
+                os.close(handle.fd)
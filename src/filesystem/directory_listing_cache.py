@@ -0,0 +1,32 @@
+import threading
+from collections import OrderedDict
+
+
+# Keeps the names in the most recently listed directories, so a directory that is read in several pages is only copied
+# out of the index once. Listings are stored with the generation of the index they were taken from, and are discarded
+# when the index changes.
+class DirectoryListingCache:
+
+    def __init__(self, max_entries=64):
+        self._max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, path, generation):
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is None or entry[0] != generation:
+                return None
+
+            self._entries.move_to_end(path)
+            return entry[1]
+
+    def set(self, path, generation, names):
+        if self._max_entries <= 0:
+            return
+
+        with self._lock:
+            self._entries[path] = (generation, names)
+            self._entries.move_to_end(path)
+            if len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
@@ -0,0 +1,118 @@
+import logging
+import os
+import resource
+import threading
+import time
+from collections import OrderedDict
+
+
+class _PooledFile:
+
+    def __init__(self, key, fd, file_id, expiry):
+        self.key = key
+        self.fd = fd
+        self.file_id = file_id
+        self.expiry = expiry
+        self.is_in_use = False
+        self.is_discarded = False
+
+
+# Keeps the handles of source files opened for reading open after they have been released, so files opened again and
+# again are only opened once. A released file descriptor is handed out again when the same source path is opened with
+# the same flags. It is never shared by handles that are open at the same time, because the read-ahead, the memory maps
+# and the syncing of files are tracked per handle; while it is in use, the same file is opened again without pooling.
+# At most max_entries file descriptors are pooled (limited to half of the maximum number of open files), the least
+# recently used unused ones are closed first. Stat'ing the source path costs about as much as opening it, so whether
+# the file has been replaced since it was opened is only checked once every ttl seconds.
+class FilePool:
+
+    def __init__(self, max_entries=0, ttl=1.0):
+        self._max_entries = self._limit_max_entries(max_entries)
+        self._ttl = ttl
+        self._files = {}
+        self._files_by_handles = {}
+        self._idle_files = OrderedDict()
+        self._lock = threading.Lock()
+
+    def close(self):
+        with self._lock:
+            for pooled_file in list(self._files.values()):
+                self._discard(pooled_file)
+
+    def open(self, path, flags):
+        if self._max_entries <= 0 or flags & os.O_ACCMODE != os.O_RDONLY or flags & (os.O_CREAT | os.O_TRUNC):
+            return os.open(path, flags)
+
+        key = (path, flags)
+        pooled_file = self._idle_files.get(key)
+        if pooled_file is not None:
+            now = time.monotonic()
+            file_id = None
+            if pooled_file.expiry < now:
+                file_stat = os.stat(path)
+                file_id = (file_stat.st_dev, file_stat.st_ino)
+            with self._lock:
+                if self._idle_files.get(key) is pooled_file:
+                    if file_id is None or file_id == pooled_file.file_id:
+                        if file_id is not None:
+                            pooled_file.expiry = now + self._ttl
+                        del self._idle_files[key]
+                        pooled_file.is_in_use = True
+                        return pooled_file.fd
+                    self._discard(pooled_file)
+
+        fd = os.open(path, flags)
+        with self._lock:
+            # A handle of the same file that is still in use, possibly opened by another thread in the meantime, keeps
+            # its pooled file descriptor, then this one is not pooled.
+            if key in self._files or not self._make_room():
+                return fd
+            file_stat = os.fstat(fd)
+            pooled_file = _PooledFile(key, fd, (file_stat.st_dev, file_stat.st_ino), time.monotonic() + self._ttl)
+            pooled_file.is_in_use = True
+            self._files[key] = pooled_file
+            self._files_by_handles[fd] = pooled_file
+
+        return fd
+
+    def release(self, fh):
+        with self._lock:
+            pooled_file = self._files_by_handles.get(fh)
+            if pooled_file is not None:
+                pooled_file.is_in_use = False
+                if not pooled_file.is_discarded:
+                    self._idle_files[pooled_file.key] = pooled_file
+                    return
+                del self._files_by_handles[fh]
+
+        os.close(fh)
+
+    def _discard(self, pooled_file):
+        # File descriptors still in use are closed when they are released.
+        del self._files[pooled_file.key]
+        pooled_file.is_discarded = True
+        if not pooled_file.is_in_use:
+            del self._idle_files[pooled_file.key]
+            del self._files_by_handles[pooled_file.fd]
+            os.close(pooled_file.fd)
+
+    def _make_room(self):
+        if len(self._files) < self._max_entries:
+            return True
+        if not self._idle_files:
+            return False
+
+        self._discard(next(iter(self._idle_files.values())))
+        return True
+
+    @staticmethod
+    def _limit_max_entries(max_entries):
+        soft_limit, _ = resource.getrlimit(resource.RLIMIT_NOFILE)
+        if soft_limit == resource.RLIM_INFINITY or max_entries <= soft_limit // 2:
+            return max_entries
+
+        logging.warning(
+            'Pooling at most %s files instead of %s, half of the maximum number of open files.',
+            soft_limit // 2,
+            max_entries)
+        return soft_limit // 2
@@ -0,0 +1,82 @@
+import logging
+import os
+import threading
+
+DURABILITY_GROUP_COMMIT = 'group_commit'
+DURABILITY_PASSTHROUGH = 'passthrough'
+DURABILITY_STRICT = 'strict'
+
+
+# Decides when the data written to a file is synced to the disk. The kernel flushes a file every time one of its handles
+# is closed, which syncs it in the strict mode. In the passthrough mode only explicit fsync calls sync files, while in
+# the group_commit mode flushed files are synced together on a background thread every interval_seconds. Pending files
+# are synced through duplicates of their handles, so they can be released before the next commit.
+class FileSyncer:
+
+    def __init__(self, durability=DURABILITY_STRICT, interval_seconds=1.0):
+        self._durability = durability
+        self._interval_seconds = interval_seconds
+        self._detached_handles = []
+        self._lock = threading.Lock()
+        self._pending_handles = {}
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def commit(self):
+        with self._lock:
+            handles = list(self._pending_handles.values()) + self._detached_handles
+            self._pending_handles = {}
+            self._detached_handles = []
+
+        for handle in handles:
+            try:
+                os.fsync(handle)
+            except OSError as exception:
+                logging.error('Could not sync file. %s', exception)
+            finally:
+                os.close(handle)
+
+    def flush(self, fh):
+        if self._durability == DURABILITY_STRICT:
+            os.fsync(fh)
+        elif self._durability == DURABILITY_GROUP_COMMIT:
+            with self._lock:
+                if fh not in self._pending_handles:
+                    self._pending_handles[fh] = os.dup(fh)
+                self._start()
+
+    def fsync(self, fh):
+        with self._lock:
+            handle = self._pending_handles.pop(fh, None)
+        if handle is not None:
+            os.close(handle)
+
+        os.fsync(fh)
+
+    def release(self, fh):
+        if not self._pending_handles:
+            return
+
+        with self._lock:
+            handle = self._pending_handles.pop(fh, None)
+            if handle is not None:
+                self._detached_handles.append(handle)
+
+    def stop(self):
+        if self._thread is not None:
+            self._stop_event.set()
+            self._thread.join()
+            self._thread = None
+        self.commit()
+
+    def _run(self):
+        while not self._stop_event.wait(self._interval_seconds):
+            self.commit()
+
+    def _start(self):
+        # The thread is started on the first flush, because the filesystem is created before the process serving it is
+        # forked.
+        if self._thread is None:
+            self._stop_event.clear()
+            self._thread = threading.Thread(target=self._run, name='file-syncer', daemon=True)
+            self._thread.start()
@@ -1,78 +1,143 @@
 import errno
 import os
+import stat
 
 from fuse import FuseOSError, Operations
 
-# pylint: disable=unused-import
-from util.decorate_all import decorate_all, dont_decorate
-from util.log_decorator import log_decorator
+from filesystem.directory_handles import DirectoryHandles
+from filesystem.file_syncer import FileSyncer
+from filesystem.mmap_pool import MmapPool
+from filesystem.negative_cache import NegativeCache
+from filesystem.open_files import OpenFiles
+from filesystem.readahead import Readahead
 
 
+# Paths are resolved relative to handles of the source directory and its subdirectories, see DirectoryHandles. Paths
+# that do not exist in the source directory are cached for a limited time, since the source directory may be changed by
+# other programs. Operations creating paths through the filesystem invalidate them.
 # pylint: disable=too-many-public-methods
-class MirrorFs(Operations, metaclass=decorate_all(log_decorator)):
+class MirrorFs(Operations):
 
-    def __init__(self, root):
+    # pylint: disable=too-many-arguments
+    def __init__(
+            self, root, *, mmap_pool=None, negative_cache=None, file_syncer=None, readahead=None,
+            directory_handles=None):
         self._root = root
+        self._directory_handles = directory_handles if directory_handles is not None else DirectoryHandles(root)
+        self._negative_cache = negative_cache if negative_cache is not None else NegativeCache(0)
+        self._file_syncer = file_syncer if file_syncer is not None else FileSyncer()
+        self._open_files = OpenFiles(
+            mmap_pool if mmap_pool is not None else MmapPool(),
+            readahead if readahead is not None else Readahead(),
+            self._file_syncer)
 
     ####################################################################################################################
     # Methods related to directory and permission mangement.
     ####################################################################################################################
 
     def access(self, path, amode):
-        full_path = self._full_path(path)
-        if not os.access(full_path, amode):
-            raise FuseOSError(errno.EACCES)
+        with self._directory_handles.resolve(path) as (dir_fd, name):
+            if not os.access(name, amode, dir_fd=dir_fd):
+                raise FuseOSError(errno.EACCES)
 
     def chmod(self, path, mode):
-        full_path = self._full_path(path)
-        return os.chmod(full_path, mode)
+        with self._directory_handles.resolve(path) as (dir_fd, name):
+            return os.chmod(name, mode, dir_fd=dir_fd)
 
     def chown(self, path, uid, gid):
-        full_path = self._full_path(path)
-        return os.chown(full_path, uid, gid)
+        with self._directory_handles.resolve(path) as (dir_fd, name):
+            return os.chown(name, uid, gid, dir_fd=dir_fd)
+
+    def destroy(self, path):
+        self._file_syncer.stop()
+        self._directory_handles.close()
 
     def getattr(self, path, fh=None):
-        full_path = self._full_path(path)
-        stat = os.lstat(full_path)
+        if self._negative_cache.contains(path):
+            raise FuseOSError(errno.ENOENT)
+
+        try:
+            with self._directory_handles.resolve(path) as (dir_fd, name):
+                source_stat = os.stat(name, dir_fd=dir_fd, follow_symlinks=False)
+        except FileNotFoundError:
+            self._negative_cache.add(path)
+            raise
         attrs = ('st_atime', 'st_ctime', 'st_gid', 'st_mode',
                  'st_mtime', 'st_nlink', 'st_size', 'st_uid')
-        return dict((key, getattr(stat, key)) for key in attrs)
+        return dict((key, getattr(source_stat, key)) for key in attrs)
 
     def link(self, target, source):
-        return os.link(self._full_path(target), self._full_path(source))
+        # Creates the hard link target to the existing file source.
+        try:
+            with self._directory_handles.resolve(source) as (source_dir_fd, source_name):
+                with self._directory_handles.resolve(target) as (target_dir_fd, target_name):
+                    return os.link(source_name, target_name, src_dir_fd=source_dir_fd, dst_dir_fd=target_dir_fd)
+        finally:
+            self._negative_cache.invalidate(target)
 
     def mkdir(self, path, mode):
-        return os.mkdir(self._full_path(path), mode)
+        try:
+            with self._directory_handles.resolve(path) as (dir_fd, name):
+                return os.mkdir(name, mode, dir_fd=dir_fd)
+        finally:
+            self._negative_cache.invalidate(path)
 
     def mknod(self, path, mode, dev):
-        return os.mknod(self._full_path(path), mode, dev)
-
-    def readdir(self, path, fh):
-        full_path = self._full_path(path)
-
-        dirents = ['.', '..']
-        if os.path.isdir(full_path):
-            dirents.extend(os.listdir(full_path))
-        for entry in dirents:
-            yield entry
+        try:
+            with self._directory_handles.resolve(path) as (dir_fd, name):
+                return os.mknod(name, mode, dev, dir_fd=dir_fd)
+        finally:
+            self._negative_cache.invalidate(path)
+
+    def readdir(self, path, fh, offset=0):  # pylint: disable=unused-argument
+        # Entries are returned without their positions, so libfuse reads the whole directory in one call and the
+        # offset is always 0.
+        yield '.', None, 0
+        yield '..', None, 0
+        try:
+            with self._directory_handles.resolve(path) as (dir_fd, name):
+                fd = os.open(name, os.O_RDONLY | os.O_DIRECTORY, dir_fd=dir_fd)
+        except (FileNotFoundError, NotADirectoryError):
+            return
+        try:
+            with os.scandir(fd) as entries:
+                for entry in entries:
+                    yield entry.name, self._get_entry_attributes(entry), 0
+        finally:
+            os.close(fd)
 
     def readlink(self, path):
-        pathname = os.readlink(self._full_path(path))
+        with self._directory_handles.resolve(path) as (dir_fd, name):
+            pathname = os.readlink(name, dir_fd=dir_fd)
         if pathname.startswith("/"):
             # Path name is absolute, sanitize it.
             return os.path.relpath(pathname, self._root)
         return pathname
 
     def rename(self, old, new):
-        return os.rename(self._full_path(old), self._full_path(new))
+        # A renamed directory brings its whole subtree to the new path, so the handles of its subdirectories are closed.
+        try:
+            with self._directory_handles.resolve(old) as (old_dir_fd, old_name):
+                with self._directory_handles.resolve(new) as (new_dir_fd, new_name):
+                    return os.rename(old_name, new_name, src_dir_fd=old_dir_fd, dst_dir_fd=new_dir_fd)
+        finally:
+            self._directory_handles.clear()
+            self._negative_cache.clear()
 
     def rmdir(self, path):
-        full_path = self._full_path(path)
-        return os.rmdir(full_path)
+        try:
+            with self._directory_handles.resolve(path) as (dir_fd, name):
+                return os.rmdir(name, dir_fd=dir_fd)
+        finally:
+            self._directory_handles.clear()
 
     def statfs(self, path):
-        full_path = self._full_path(path)
-        stv = os.statvfs(full_path)
+        with self._directory_handles.resolve(path) as (dir_fd, name):
+            fd = os.open(name, os.O_PATH, dir_fd=dir_fd)
+        try:
+            stv = os.statvfs(fd)
+        finally:
+            os.close(fd)
         attrs = (
             'f_bavail', 'f_bfree', 'f_blocks', 'f_bsize',
             'f_favail', 'f_ffree', 'f_files', 'f_flag',
@@ -80,54 +145,77 @@ class MirrorFs(Operations, metaclass=decorate_all(log_decorator)):
         return dict((key, getattr(stv, key)) for key in attrs)
 
     def symlink(self, target, source):
-        return os.symlink(source, self._full_path(target))
+        try:
+            with self._directory_handles.resolve(target) as (dir_fd, name):
+                return os.symlink(source, name, dir_fd=dir_fd)
+        finally:
+            self._negative_cache.invalidate(target)
 
     def unlink(self, path):
-        return os.unlink(self._full_path(path))
+        with self._directory_handles.resolve(path) as (dir_fd, name):
+            return os.unlink(name, dir_fd=dir_fd)
 
     def utimens(self, path, times=None):
-        return os.utime(self._full_path(path), times)
+        with self._directory_handles.resolve(path) as (dir_fd, name):
+            return os.utime(name, times, dir_fd=dir_fd)
 
     ####################################################################################################################
     # Methods related to file management.
     ####################################################################################################################
 
     def create(self, path, mode, fi=None):
-        full_path = self._full_path(path)
-        return os.open(full_path, os.O_WRONLY | os.O_CREAT, mode)
+        try:
+            with self._directory_handles.resolve(path) as (dir_fd, name):
+                return os.open(name, os.O_WRONLY | os.O_CREAT, mode, dir_fd=dir_fd)
+        finally:
+            self._negative_cache.invalidate(path)
 
     def flush(self, path, fh):
-        return os.fsync(fh)
+        return self._file_syncer.flush(fh)
 
     def fsync(self, path, datasync, fh):
-        return self.flush(path, fh)
+        return self._file_syncer.fsync(fh)
 
     def open(self, path, flags):
-        full_path = self._full_path(path)
-        return os.open(full_path, flags)
+        with self._directory_handles.resolve(path) as (dir_fd, name):
+            fh = os.open(name, flags, dir_fd=dir_fd)
+        self._open_files.acquire(fh, flags)
+        return fh
 
     def read(self, path, size, offset, fh):
-        os.lseek(fh, offset, os.SEEK_SET)
-        return os.read(fh, size)
+        return self._open_files.read(fh, size, offset)
+
+    def read_into(self, path, buffer, offset, fh):  # pylint: disable=unused-argument
+        return self._open_files.read_into(fh, buffer, offset)
 
     def release(self, path, fh):
+        self._open_files.release(fh)
         return os.close(fh)
 
     def truncate(self, path, length, fh=None):
-        full_path = self._full_path(path)
-        with open(full_path, 'r+') as opened_file:
-            opened_file.truncate(length)
+        with self._directory_handles.resolve(path) as (dir_fd, name):
+            fd = os.open(name, os.O_WRONLY, dir_fd=dir_fd)
+        try:
+            os.ftruncate(fd, length)
+        finally:
+            os.close(fd)
 
     def write(self, path, data, offset, fh):
-        os.lseek(fh, offset, os.SEEK_SET)
-        return os.write(fh, data)
+        return os.pwrite(fh, data, offset)
 
     ####################################################################################################################
     # Auxiliary methods.
     ####################################################################################################################
 
-    def _full_path(self, partial):
-        if partial.startswith("/"):
-            partial = partial[1:]
-        path = os.path.join(self._root, partial)
-        return path
+    def _get_entry_attributes(self, entry):
+        # Only the attributes that os.scandir provides without calling stat are returned.
+        if entry.is_symlink():
+            file_type = stat.S_IFLNK
+        elif entry.is_dir(follow_symlinks=False):
+            file_type = stat.S_IFDIR
+        elif entry.is_file(follow_symlinks=False):
+            file_type = stat.S_IFREG
+        else:
+            return None
+
+        return {'st_ino': entry.inode(), 'st_mode': file_type}
@@ -0,0 +1,78 @@
+import mmap
+import os
+import stat
+import threading
+
+
+class _Mapping:
+
+    def __init__(self, mapping):
+        self.mapping = mapping
+        self.view = memoryview(mapping)
+        self.references = 0
+
+
+# Maps large files opened for reading into memory, so reads are served without system calls. Handles of the same source
+# file (identified by its device and inode numbers) share one mapping, which is unmapped when the last one is released.
+# Note that a mapped file must not be truncated by another process, because reading the lost pages raises SIGBUS. A
+# handle shared by several opens (see FilePool) is acquired and released once for each of them.
+class MmapPool:
+
+    def __init__(self, threshold_bytes=0):
+        self._threshold_bytes = threshold_bytes
+        self._handle_references = {}
+        self._keys_by_handles = {}
+        self._lock = threading.Lock()
+        self._mappings = {}
+
+    def acquire(self, fh, flags):
+        if self._threshold_bytes <= 0 or flags & os.O_ACCMODE != os.O_RDONLY:
+            return
+
+        file_stat = os.fstat(fh)
+        if not stat.S_ISREG(file_stat.st_mode) or file_stat.st_size < self._threshold_bytes:
+            return
+
+        key = (file_stat.st_dev, file_stat.st_ino)
+        with self._lock:
+            mapping = self._mappings.get(key)
+            if mapping is None:
+                try:
+                    mapping = _Mapping(mmap.mmap(fh, 0, prot=mmap.PROT_READ))
+                except (OSError, ValueError):
+                    return
+                self._mappings[key] = mapping
+            mapping.references = mapping.references + 1
+            self._keys_by_handles[fh] = key
+            self._handle_references[fh] = self._handle_references.get(fh, 0) + 1
+
+    def read_into(self, fh, buffer, offset):
+        key = self._keys_by_handles.get(fh)
+        if key is None:
+            return None
+
+        # Ranges outside of the mapping (for example, because the file has grown since it was mapped) are not served.
+        view = self._mappings[key].view
+        size = len(buffer)
+        if offset + size > len(view):
+            return None
+
+        buffer[:size] = view[offset:offset + size]
+        return size
+
+    def release(self, fh):
+        if fh not in self._keys_by_handles:
+            return
+
+        with self._lock:
+            key = self._keys_by_handles[fh]
+            self._handle_references[fh] = self._handle_references[fh] - 1
+            if self._handle_references[fh] == 0:
+                del self._handle_references[fh]
+                del self._keys_by_handles[fh]
+            mapping = self._mappings[key]
+            mapping.references = mapping.references - 1
+            if mapping.references == 0:
+                del self._mappings[key]
+                mapping.view.release()
+                mapping.mapping.close()
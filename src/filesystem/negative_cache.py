@@ -0,0 +1,52 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+# Remembers a bounded number of paths that do not exist, evicting the least recently used one. Every entry is stored
+# with the generation of the index it was looked up in, so changing the index invalidates all of them at once.
+# Entries also expire after ttl seconds if it is not None, for sources that may change without notice. Setting
+# max_entries or ttl to 0 disables the cache.
+class NegativeCache:
+
+    def __init__(self, max_entries=4096, ttl=None):
+        self._max_entries = max_entries
+        self._ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def add(self, path, generation=0):
+        if self._max_entries <= 0 or self._ttl == 0:
+            return
+
+        expiry = time.monotonic() + self._ttl if self._ttl is not None else None
+        with self._lock:
+            self._entries[path] = (generation, expiry)
+            self._entries.move_to_end(path)
+            if len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def contains(self, path, generation=0):
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is None:
+                return False
+
+            entry_generation, expiry = entry
+            if entry_generation != generation or (expiry is not None and expiry < time.monotonic()):
+                del self._entries[path]
+                return False
+
+            self._entries.move_to_end(path)
+            return True
+
+    def invalidate(self, path):
+        with self._lock:
+            self._entries.pop(path, None)
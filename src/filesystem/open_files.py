@@ -0,0 +1,33 @@
+import os
+
+
+# Reads the source files of open handles and forgets their state once they are released. Handles with a memory map are
+# read from it, the others with positional reads advised by the read-ahead. Shared by the filesystems, which only
+# differ in how source files are opened and closed.
+class OpenFiles:
+
+    def __init__(self, mmap_pool, readahead, file_syncer):
+        self._mmap_pool = mmap_pool
+        self._readahead = readahead
+        self._file_syncer = file_syncer
+
+    def acquire(self, fh, flags):
+        self._mmap_pool.acquire(fh, flags)
+
+    def read(self, fh, size, offset):
+        self._readahead.on_read(fh, offset, size)
+        return os.pread(fh, size, offset)
+
+    def read_into(self, fh, buffer, offset):
+        size = self._mmap_pool.read_into(fh, buffer, offset)
+        if size is not None:
+            return size
+
+        self._readahead.on_read(fh, offset, len(buffer))
+        return os.preadv(fh, [buffer], offset)
+
+    def release(self, fh):
+        # The handle is closed by the caller afterwards.
+        self._mmap_pool.release(fh)
+        self._readahead.release(fh)
+        self._file_syncer.release(fh)
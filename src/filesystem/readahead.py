@@ -0,0 +1,62 @@
+import os
+
+
+class _Stream:
+
+    def __init__(self):
+        self.advice = None
+        self.end = 0
+        self.prefetched_end = 0
+        self.window = 0
+
+
+# Tracks the reads of every file handle and tells the kernel how the file is accessed. A read starting where the
+# previous one ended continues a sequential stream: the file is advised as sequential and the window following the read
+# is requested in advance, so the kernel fetches it in the background while the current read is served. The window
+# starts at min_window_bytes and doubles with every sequential read up to max_window_bytes. Any other read advises the
+# file as random and resets the window. Setting max_window_bytes to 0 disables it.
+class Readahead:
+
+    def __init__(self, max_window_bytes=0, min_window_bytes=131072):
+        self._max_window_bytes = max_window_bytes if hasattr(os, 'posix_fadvise') else 0
+        self._min_window_bytes = min(min_window_bytes, self._max_window_bytes)
+        self._streams = {}
+
+    def on_read(self, fh, offset, size):
+        if self._max_window_bytes <= 0:
+            return
+
+        # Concurrent reads of the same handle may only make the hints less accurate, so the streams are not locked.
+        stream = self._streams.get(fh)
+        if stream is None:
+            stream = self._streams.setdefault(fh, _Stream())
+
+        end = offset + size
+        if offset == stream.end:
+            self._advise(fh, stream, os.POSIX_FADV_SEQUENTIAL)
+            stream.window = min(max(stream.window * 2, self._min_window_bytes), self._max_window_bytes)
+            # The next window is requested once less than half of the current one is left ahead of the reader.
+            if end + stream.window // 2 > stream.prefetched_end:
+                start = max(end, stream.prefetched_end)
+                self._fadvise(fh, start, end + stream.window - start, os.POSIX_FADV_WILLNEED)
+                stream.prefetched_end = end + stream.window
+        else:
+            self._advise(fh, stream, os.POSIX_FADV_RANDOM)
+            stream.window = 0
+            stream.prefetched_end = 0
+        stream.end = end
+
+    def release(self, fh):
+        self._streams.pop(fh, None)
+
+    def _advise(self, fh, stream, advice):
+        if stream.advice != advice:
+            self._fadvise(fh, 0, 0, advice)
+            stream.advice = advice
+
+    @staticmethod
+    def _fadvise(fh, offset, length, advice):
+        try:
+            os.posix_fadvise(fh, offset, length, advice)
+        except OSError:
+            pass
@@ -0,0 +1,50 @@
+import ctypes
+
+from fuse import FUSE, c_stat, set_st_attrs
+
+
+# fusepy copies the result of every read into the buffer of libfuse and every written buffer into a new bytes object.
+# If the filesystem implements read_into, data is read directly into the buffer of libfuse instead, and written data is
+# passed to the filesystem as a memoryview of the buffer of libfuse, which is only valid during the call.
+#
+# fusepy does not pass the offset to readdir either, so a directory returning the positions of its entries would be
+# listed from the beginning for every page. The offset is passed as an additional argument.
+class RouterFuse(FUSE):
+
+    def __init__(self, operations, mountpoint, **kwargs):
+        self._is_read_into_supported = callable(getattr(operations, 'read_into', None))
+        super().__init__(operations, mountpoint, **kwargs)
+
+    # pylint: disable=too-many-arguments
+    def read(self, path, buf, size, offset, fip):
+        if not self._is_read_into_supported:
+            return super().read(path, buf, size, offset, fip)
+
+        fh = fip.contents if self.raw_fi else fip.contents.fh
+        buffer = _get_buffer(buf, size)
+
+        return self.operations('read_into', self._decode_optional_path(path), buffer, offset, fh)
+
+    # pylint: disable=too-many-arguments
+    def readdir(self, path, buf, filler, offset, fip):
+        fh = fip.contents.fh
+        for name, attributes, entry_offset in self.operations('readdir', self._decode_optional_path(path), fh, offset):
+            stat = None
+            if attributes:
+                stat = c_stat()
+                set_st_attrs(stat, attributes, use_ns=self.use_ns)
+            if filler(buf, name.encode(self.encoding), stat, entry_offset) != 0:
+                break
+
+        return 0
+
+    # pylint: disable=too-many-arguments
+    def write(self, path, buf, size, offset, fip):
+        fh = fip.contents if self.raw_fi else fip.contents.fh
+        buffer = _get_buffer(buf, size)
+
+        return self.operations('write', self._decode_optional_path(path), buffer, offset, fh)
+
+
+def _get_buffer(pointer, size):
+    return memoryview(ctypes.cast(pointer, ctypes.POINTER(ctypes.c_char * size)).contents).cast('B')
@@ -1,6 +1,8 @@
 import os
 from datetime import datetime
 
+ATTRIBUTE_NAMES = ('st_atime', 'st_ctime', 'st_gid', 'st_mode', 'st_mtime', 'st_nlink', 'st_size', 'st_uid')
+
 
 # pylint: disable=too-many-instance-attributes
 class Stat:
@@ -36,3 +38,7 @@ class Stat:
         stat.st_uid = Stat.default_uid
 
         return stat
+
+    @staticmethod
+    def to_dict(stat):
+        return dict((key, getattr(stat, key)) for key in ATTRIBUTE_NAMES)
@@ -0,0 +1,173 @@
+import errno
+import functools
+import itertools
+import os
+import threading
+import time
+
+from fuse import FuseOSError
+
+from filesystem.stat import Stat
+from util.operation_wrapper import get_operation_names, wrap_operations
+
+STATS_DIRECTORY = '/.routerfs'
+STATS_FILES = {
+    STATS_DIRECTORY + '/stats': lambda metrics: metrics.to_json(),
+    STATS_DIRECTORY + '/stats.prom': lambda metrics: metrics.to_prometheus()
+}
+
+# Synthetic file handles start above the range of file descriptors, so they never collide with real ones.
+_FIRST_HANDLE = 1 << 32
+# The stats directory is listed last in the root directory, at a position after those of the entries of the filesystem.
+_STATS_DIRECTORY_OFFSET = 1 << 62
+
+
+# Serves the metrics of a filesystem as read-only files in the virtual /.routerfs directory. Operations on other paths
+# are passed through to the filesystem.
+class StatsFile:
+
+    def __init__(self, metrics):
+        self._metrics = metrics
+        self._sizes = {}
+        self._handles = itertools.count(_FIRST_HANDLE)
+        self._lock = threading.Lock()
+        self._open_contents = {}
+
+    def install(self, fuse_fs):
+        handlers = {
+            'access': self._access,
+            'flush': self._ignore_handle,
+            'fsync': self._ignore_handle,
+            'getattr': self._getattr,
+            'open': self._open,
+            'read': self._read,
+            'read_into': self._read_into,
+            'readdir': self._readdir,
+            'release': self._release,
+            'statfs': self._statfs
+        }
+
+        def wrap(name, operation):
+            handler = handlers.get(name)
+            if handler is not None:
+                return functools.partial(handler, operation)
+            if name in ('init', 'destroy'):
+                return operation
+            return functools.partial(self._deny, name, operation)
+
+        wrap_operations(fuse_fs, wrap, get_operation_names(fuse_fs))
+
+    def _access(self, operation, path, amode):
+        if not _is_stats_path(path):
+            return operation(path, amode)
+        if amode & os.W_OK:
+            raise FuseOSError(errno.EACCES)
+
+        return 0
+
+    def _deny(self, name, operation, *args, **kwargs):
+        paths = args[:2] if name in ('link', 'rename') else args[:1]
+        if any(_is_stats_path(path) for path in paths):
+            raise FuseOSError(errno.EROFS)
+
+        return operation(*args, **kwargs)
+
+    def _getattr(self, operation, path, fh=None):
+        if path == STATS_DIRECTORY:
+            return Stat.to_dict(Stat.create_default())
+        if path not in STATS_FILES:
+            if _is_stats_path(path):
+                raise FuseOSError(errno.ENOENT)
+            return operation(path, fh)
+
+        # Rendering the metrics walks the index, so the content is only rendered when the file is opened, and the size
+        # of the last rendering is reported. A file that has never been opened is rendered once to get its size.
+        size = self._sizes.get(path)
+        if size is None:
+            size = len(self._render(path))
+        attributes = Stat.to_dict(Stat.create_default(True))
+        attributes['st_mode'] = 33060
+        attributes['st_size'] = size
+        attributes['st_mtime'] = time.time()
+
+        return attributes
+
+    def _ignore_handle(self, operation, path, *args):
+        if path in STATS_FILES:
+            return 0
+
+        return operation(path, *args)
+
+    def _open(self, operation, path, flags):
+        if path not in STATS_FILES:
+            if _is_stats_path(path):
+                raise FuseOSError(errno.ENOENT)
+            return operation(path, flags)
+        if flags & (os.O_WRONLY | os.O_RDWR):
+            raise FuseOSError(errno.EACCES)
+
+        content = self._render(path)
+        with self._lock:
+            handle = next(self._handles)
+            self._open_contents[handle] = content
+
+        return handle
+
+    # pylint: disable=too-many-arguments
+    def _read(self, operation, path, size, offset, fh):
+        content = self._open_contents.get(fh)
+        if content is None:
+            return operation(path, size, offset, fh)
+
+        return content[offset:offset + size]
+
+    # pylint: disable=too-many-arguments
+    def _read_into(self, operation, path, buffer, offset, fh):
+        content = self._open_contents.get(fh)
+        if content is None:
+            return operation(path, buffer, offset, fh)
+
+        data = content[offset:offset + len(buffer)]
+        buffer[:len(data)] = data
+        return len(data)
+
+    def _readdir(self, operation, path, fh, offset=0):
+        if path == STATS_DIRECTORY:
+            yield '.', None, 0
+            yield '..', None, 0
+            for name in STATS_FILES:
+                yield name[len(STATS_DIRECTORY) + 1:], None, 0
+            return
+        if offset >= _STATS_DIRECTORY_OFFSET:
+            return
+
+        # If the filesystem returns the positions of its entries, the stats directory needs one as well.
+        entry_offset = offset
+        for name, attributes, entry_offset in operation(path, fh, offset):
+            yield name, attributes, entry_offset
+        if path == os.sep:
+            stats_directory_offset = _STATS_DIRECTORY_OFFSET if entry_offset else 0
+            yield STATS_DIRECTORY[1:], Stat.to_dict(Stat.create_default()), stats_directory_offset
+
+    def _release(self, operation, path, fh):
+        with self._lock:
+            if self._open_contents.pop(fh, None) is not None:
+                return 0
+
+        return operation(path, fh)
+
+    def _render(self, path):
+        content = STATS_FILES[path](self._metrics).encode()
+        self._sizes[path] = len(content)
+
+        return content
+
+    def _statfs(self, operation, path):
+        if _is_stats_path(path):
+            return operation(os.sep)
+
+        return operation(path)
+
+
+def _is_stats_path(path):
+    return path == STATS_DIRECTORY or path.startswith(STATS_DIRECTORY + '/')
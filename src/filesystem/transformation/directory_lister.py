@@ -1,12 +1,67 @@
 import os
+import time
 
+from filesystem.transformation.directory_mtimes import get_directory_mtime
+from filesystem.transformation.path_filter import PathFilter
 
+
+# If is_recording_directory_mtimes is set, the modification time of every directory walked is recorded, so an index
+# saved to a snapshot can be reconciled with the source directory after a restart. Directories are stat'ed after they
+# have been listed, which is safe, because directories modified since the walk started are recorded with an unknown
+# modification time. Subdirectories excluded by the path filter, or in which none of the rule matchers passed to
+# list_directory can match a path, are not walked.
 class DirectoryLister:
 
-    def __init__(self, source_directory):
+    def __init__(self, source_directory, path_filter=None):
         self._source_directory = source_directory
+        self._path_filter = path_filter if path_filter is not None else PathFilter(source_directory)
+        self._directory_mtimes = {}
+        self._walked_directory_count = 0
+        self.is_recording_directory_mtimes = False
+
+    @property
+    def path_filter(self):
+        return self._path_filter
+
+    @property
+    def source_directory(self):
+        return self._source_directory
+
+    @property
+    def walked_directory_count(self):
+        return self._walked_directory_count
+
+    def get_directory_mtimes(self):
+        return self._directory_mtimes
 
-    def list_directory(self):
-        for dirname, _, filenames in os.walk(self._source_directory):
+    def list_directory(self, rule_matchers=()):
+        self._directory_mtimes = {}
+        self._walked_directory_count = 0
+        start_ns = time.time_ns()
+        for dirname, subdirectories, filenames in os.walk(self._source_directory):
+            self._walked_directory_count = self._walked_directory_count + 1
+            subdirectories[:] = [
+                subdirectory
+                for subdirectory
+                in subdirectories
+                if is_directory_walked(os.path.join(dirname, subdirectory, ''), self._path_filter, rule_matchers)
+            ]
+            if self.is_recording_directory_mtimes:
+                mtime = get_directory_mtime(dirname, start_ns)
+                if mtime is not None:
+                    self._directory_mtimes[os.path.join(dirname, '')] = mtime
             for filename in filenames:
-                yield os.path.join(dirname, filename)
+                path = os.path.join(dirname, filename)
+                if self._path_filter.is_file_listed(path):
+                    yield path
+
+    def pop_stat(self, path):  # pylint: disable=unused-argument
+        return None
+
+
+def is_directory_walked(directory, path_filter, rule_matchers=()):
+    # The directory ends with a separator. Without rule matchers, only the path filter decides.
+    if not path_filter.is_directory_walked(directory):
+        return False
+
+    return not rule_matchers or any(rule_matcher.can_match_below(directory) for rule_matcher in rule_matchers)
@@ -0,0 +1,18 @@
+import os
+
+# Modification times are only trusted if they are older than the start of the walk by this many nanoseconds, since
+# some filesystems store them with a granularity of up to two seconds.
+_GRANULARITY_NS = 2000000000
+
+UNKNOWN_MTIME = 0
+
+
+def get_directory_mtime(directory, start_ns):
+    # Returns the modification time of the directory, UNKNOWN_MTIME if the directory may have been changed since the
+    # walk started without changing its modification time afterwards, or None if the directory cannot be accessed.
+    try:
+        mtime = os.stat(directory).st_mtime_ns
+    except OSError:
+        return None
+
+    return mtime if mtime < start_ns - _GRANULARITY_NS else UNKNOWN_MTIME
@@ -0,0 +1,223 @@
+import logging
+import os
+import threading
+import time
+
+from filesystem.transformation.index_reconciler import IndexReconciler
+from filesystem.transformation.shared_walk import SharedWalk
+
+
+# Fills a Transformer from a snapshot or by walking the source directories. An index loaded from a snapshot is
+# reconciled with the source directories, using the modification times of the directories saved with it. The index is
+# either built before the filesystem is mounted, or in the background after it has been mounted, in which case lookups
+# see the entries added so far and can wait for the build to finish.
+# pylint: disable=too-many-instance-attributes
+class IndexBuilder:
+
+    # pylint: disable=too-many-arguments
+    def __init__(self, transformer, sources, snapshot=None, metrics=None, wait_timeout=0):
+        self._transformer = transformer
+        self._sources = sources
+        self._source_directories = [directory_lister.source_directory for directory_lister, _ in sources]
+        self._snapshot = snapshot
+        self._metrics = metrics
+        self._wait_timeout = wait_timeout
+        self._build_seconds = 0.0
+        self._callbacks = []
+        self._directory_mtimes = {}
+        self._is_succeeded = False
+        self._ready = threading.Event()
+        self._shared_walk = None
+
+    @property
+    def build_seconds(self):
+        return self._build_seconds
+
+    @property
+    def is_ready(self):
+        return self._ready.is_set()
+
+    @property
+    def source_directories(self):
+        return self._source_directories
+
+    def add_callback(self, callback):
+        # Callbacks are called with the index builder whenever the index has been built or rebuilt successfully.
+        self._callbacks.append(callback)
+
+    def add_sources(self, shared_walk):
+        # Returns whether the sources have to be walked, which is not the case if the snapshot could be loaded.
+        if self._load_snapshot():
+            self._reconcile()
+            return False
+
+        self._record_directory_mtimes(self._sources)
+        self._shared_walk = shared_walk
+        for directory_lister, transformations in self._sources:
+            rule_matcher = self._transformer.add_transformations(transformations)
+            shared_walk.add(directory_lister, self._transformer, rule_matcher)
+
+        return True
+
+    def build(self):
+        start = time.perf_counter()
+        build_indexes([self])
+        self._build_seconds = time.perf_counter() - start
+        self._call_callbacks()
+
+    def complete(self, walk_seconds=None):
+        # Called when the index is built, walk_seconds is None if it has been loaded from the snapshot.
+        if walk_seconds is not None:
+            if self._metrics is not None:
+                self._metrics.record_phase('walk', walk_seconds)
+            self._update_directory_mtimes(self._sources)
+            self._save_snapshot()
+        self._is_succeeded = True
+
+    def finish(self):
+        # Called after the build, even if it failed.
+        self._ready.set()
+
+    def get_progress(self):
+        # The counts of the walk are those of the initial build, they stay at 0 if the index was loaded from a snapshot.
+        shared_walk = self._shared_walk
+        return {
+            'ready': int(self._ready.is_set()),
+            'walked_directories': shared_walk.walked_directory_count if shared_walk is not None else 0,
+            'listed_files': shared_walk.listed_count if shared_walk is not None else 0
+        }
+
+    def rebuild(self, sources, kept_sources=None, snapshot=None):
+        # Applies a changed configuration: only sources are listed, see Transformer.rebuild. A build that is still in
+        # progress is finished first. The snapshot of the previous configuration is replaced by that of the new one.
+        self._ready.wait()
+
+        previous_snapshot = self._snapshot
+        self._snapshot = snapshot
+        self._record_directory_mtimes(sources)
+        start = time.perf_counter()
+        self._transformer.rebuild(sources, kept_sources)
+        if kept_sources is not None:
+            self._source_directories = [directory for directory, _ in kept_sources]
+        self._source_directories = self._source_directories + [
+            directory_lister.source_directory for directory_lister, _ in sources]
+        self._build_seconds = time.perf_counter() - start
+        self._record_phase('rebuild', start)
+
+        self._is_succeeded = True
+        self._update_directory_mtimes(sources)
+        self._remove_directory_mtimes()
+        self._save_snapshot()
+        if previous_snapshot is not None and (snapshot is None or snapshot.path != previous_snapshot.path):
+            previous_snapshot.delete()
+        self._call_callbacks()
+
+    def save_snapshot(self):
+        if self._is_succeeded:
+            self._save_snapshot()
+
+    def start(self):
+        thread = threading.Thread(target=self._build_in_background, name='IndexBuilder', daemon=True)
+        thread.start()
+
+    def wait(self):
+        if self._ready.is_set():
+            return True
+
+        return self._ready.wait(self._wait_timeout)
+
+    def _build_in_background(self):
+        try:
+            self.build()
+        except Exception:  # pylint: disable=broad-except
+            logging.exception('Could not build the index.')
+            return
+        logging.info('Index built in %.1f seconds.', self._build_seconds)
+
+    def _call_callbacks(self):
+        for callback in self._callbacks:
+            callback(self)
+
+    def _load_snapshot(self):
+        if self._snapshot is None:
+            return False
+
+        start = time.perf_counter()
+        is_loaded = self._snapshot.load(self._transformer, self._directory_mtimes)
+        self._record_phase('snapshot_load', start)
+
+        return is_loaded
+
+    def _reconcile(self):
+        start = time.perf_counter()
+        sources = [
+            (
+                directory_lister.source_directory,
+                self._transformer.add_transformations(transformations),
+                directory_lister.path_filter)
+            for directory_lister, transformations
+            in self._sources
+        ]
+        directory_mtimes, listed_count = IndexReconciler(self._transformer, self._directory_mtimes).reconcile(sources)
+        self._record_phase('reconcile', start)
+        logging.info('Index reconciled, %s of %s directories changed.', listed_count, len(directory_mtimes))
+
+        if directory_mtimes != self._directory_mtimes:
+            self._directory_mtimes = directory_mtimes
+            self._save_snapshot()
+
+    def _save_snapshot(self):
+        if self._snapshot is not None:
+            start = time.perf_counter()
+            self._snapshot.save(self._transformer, self._directory_mtimes)
+            self._record_phase('snapshot_save', start)
+
+    def _record_directory_mtimes(self, sources):
+        # Directory listers only stat the directories they walk if the modification times are needed for a snapshot.
+        # A directory lister shared with another index builder keeps recording them if either of them has a snapshot.
+        if self._snapshot is not None:
+            for directory_lister, _ in sources:
+                directory_lister.is_recording_directory_mtimes = True
+
+    def _update_directory_mtimes(self, sources):
+        # The modification times are only needed for the snapshot. Those of directories that have not been walked again
+        # are kept.
+        if self._snapshot is not None:
+            for directory_lister, _ in sources:
+                self._directory_mtimes.update(directory_lister.get_directory_mtimes())
+
+    def _remove_directory_mtimes(self):
+        # Drops the modification times of the directories that are not under any of the current source directories, as
+        # those of removed sources would otherwise be saved with the snapshot of the new configuration.
+        prefixes = tuple(os.path.join(directory, '') for directory in self._source_directories)
+        self._directory_mtimes = {
+            directory: mtime
+            for directory, mtime
+            in self._directory_mtimes.items()
+            if directory.startswith(prefixes)
+        }
+
+    def _record_phase(self, name, start):
+        if self._metrics is not None:
+            self._metrics.record_phase(name, time.perf_counter() - start)
+
+
+def build_indexes(index_builders):
+    # The index builders that cannot load their snapshot walk their sources together, so a source directory used by
+    # several of them is walked only once.
+    shared_walk = SharedWalk()
+    try:
+        walking_index_builders = [
+            index_builder
+            for index_builder
+            in index_builders
+            if index_builder.add_sources(shared_walk)
+        ]
+        start = time.perf_counter()
+        shared_walk.run()
+        walk_seconds = time.perf_counter() - start
+        for index_builder in index_builders:
+            index_builder.complete(walk_seconds if index_builder in walking_index_builders else None)
+    finally:
+        for index_builder in index_builders:
+            index_builder.finish()
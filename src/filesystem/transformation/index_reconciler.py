@@ -0,0 +1,101 @@
+import os
+import time
+
+from filesystem.transformation.directory_lister import is_directory_walked
+from filesystem.transformation.directory_mtimes import UNKNOWN_MTIME, get_directory_mtime
+
+
+# Brings an index loaded from a snapshot up to date with its source directories. Creating, removing or renaming a file
+# changes the modification time of its directory, so only the directories whose modification time differs from the one
+# recorded with the snapshot are listed and their files transformed again; the others are only stat'ed, and their
+# subdirectories are taken from the recorded ones. Entries whose source directory is gone, or whose source file is
+# missing from the listing of its directory, are removed. Subdirectories are skipped the same way as by the directory
+# listers.
+class IndexReconciler:
+
+    def __init__(self, transformer, directory_mtimes):
+        self._transformer = transformer
+        self._recorded_mtimes = directory_mtimes
+
+    def reconcile(self, sources):
+        # Takes a list of source directories, their rule matchers and path filters, returns the modification times of
+        # the directories found and the number of directories listed.
+        directory_mtimes, listings = self._walk(sources)
+
+        self._transformer.remove_missing_sources(directory_mtimes, listings)
+        for directory, filenames in listings.items():
+            directory_sources = _get_sources(directory, sources)
+            for filename in filenames:
+                path = directory + filename
+                for _, rule_matcher, path_filter in directory_sources:
+                    if path_filter.is_file_listed(path):
+                        self._transformer.add_listed_path(path, None, rule_matcher)
+
+        return directory_mtimes, len(listings)
+
+    def _walk(self, sources):
+        # Returns the modification times of the directories found and the file names of the directories listed.
+        start_ns = time.time_ns()
+        subdirectories_by_parents = self._get_recorded_subdirectories()
+        directory_mtimes = {}
+        listings = {}
+
+        for source_directory, _, _ in sources:
+            directories = [os.path.join(source_directory, '')]
+            while directories:
+                directory = directories.pop()
+                if directory in directory_mtimes:
+                    continue
+                mtime = get_directory_mtime(directory, start_ns)
+                if mtime is None:
+                    continue
+                directory_mtimes[directory] = mtime
+                if mtime != UNKNOWN_MTIME and mtime == self._recorded_mtimes.get(directory):
+                    directories.extend(subdirectories_by_parents.get(directory, ()))
+                else:
+                    subdirectories = []
+                    listings[directory] = self._list_directory(directory, subdirectories)
+                    directories.extend(
+                        subdirectory
+                        for subdirectory
+                        in subdirectories
+                        if _is_walked(subdirectory, sources))
+
+        return directory_mtimes, listings
+
+    def _get_recorded_subdirectories(self):
+        subdirectories_by_parents = {}
+        for directory in self._recorded_mtimes:
+            parent = os.path.join(os.path.dirname(directory[:-1]), '')
+            subdirectories_by_parents.setdefault(parent, []).append(directory)
+
+        return subdirectories_by_parents
+
+    @staticmethod
+    def _list_directory(directory, subdirectories):
+        # Directories are walked the same way as by the directory listers: symbolic links to directories are skipped,
+        # and unreadable directories are treated as empty.
+        filenames = set()
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_dir():
+                        if not entry.is_symlink():
+                            subdirectories.append(os.path.join(entry.path, ''))
+                        continue
+                    filenames.add(entry.name)
+        except OSError:
+            pass
+
+        return filenames
+
+
+def _get_sources(directory, sources):
+    return [source for source in sources if directory.startswith(os.path.join(source[0], ''))]
+
+
+def _is_walked(directory, sources):
+    return any(
+        is_directory_walked(directory, path_filter, [rule_matcher])
+        for _, rule_matcher, path_filter
+        in _get_sources(directory, sources))
@@ -0,0 +1,135 @@
+import hashlib
+import itertools
+import logging
+import mmap
+import os
+import struct
+
+from filesystem.transformation.path_filter import get_filter_key
+
+SNAPSHOT_MAGIC = b'RFSI'
+SNAPSHOT_VERSION = 2
+
+# Magic, format version, key digest, number of entries, number of directories.
+_HEADER = struct.Struct('<4sH32sQQ')
+_SEPARATOR = b'\0'
+
+
+# The file name is derived from the source directories, the transformation rules and the path filters of the volumes,
+# so a snapshot is never applied to a different configuration. Besides the entries of the index, the modification times
+# of the source directories are stored, so the index can be reconciled with the changes made while it was not running.
+class IndexSnapshot:
+
+    def __init__(self, directory, volumes):
+        self._key = self._compute_key(volumes)
+        self._path = os.path.join(directory, F'{self._key.hex()}.idx')
+
+    @property
+    def path(self):
+        return self._path
+
+    def delete(self):
+        try:
+            os.remove(self._path)
+        except FileNotFoundError:
+            pass
+        except OSError as exception:
+            logging.warning('Could not delete index snapshot %s. %s', self._path, exception)
+
+    def load(self, transformer, directory_mtimes=None):
+        if not os.path.isfile(self._path):
+            return False
+
+        try:
+            entries, loaded_directory_mtimes = self._read_entries()
+        except (OSError, ValueError) as exception:
+            logging.warning('Could not load index snapshot %s. %s', self._path, exception)
+            return False
+
+        transformer.add_entries(entries)
+        if directory_mtimes is not None:
+            directory_mtimes.update(loaded_directory_mtimes)
+
+        return True
+
+    def save(self, transformer, directory_mtimes=None):
+        temporary_path = F'{self._path}.tmp'
+
+        try:
+            os.makedirs(os.path.dirname(self._path), exist_ok=True)
+            with open(temporary_path, 'wb') as snapshot_file:
+                self._write_entries(snapshot_file, transformer.get_entries(), directory_mtimes or {})
+            os.replace(temporary_path, self._path)
+        except OSError as exception:
+            logging.warning('Could not save index snapshot %s. %s', self._path, exception)
+
+    def _compute_key(self, volumes):
+        digest = hashlib.sha256()
+
+        for volume in volumes:
+            if not volume.transformations:
+                continue
+            digest.update(os.fsencode(os.path.abspath(volume.source_path)) + _SEPARATOR)
+            for transformation in volume.transformations:
+                digest.update(transformation.from_path.encode() + _SEPARATOR)
+                digest.update(transformation.to_path.encode() + _SEPARATOR)
+            # Snapshots saved without path filters stay valid.
+            filter_key = get_filter_key(volume.walker)
+            if filter_key != ((), (), None):
+                digest.update(repr(filter_key).encode() + _SEPARATOR)
+
+        return digest.digest()
+
+    def _read_entries(self):
+        with open(self._path, 'rb') as snapshot_file:
+            with mmap.mmap(snapshot_file.fileno(), 0, access=mmap.ACCESS_READ) as mapped_file:
+                if len(mapped_file) < _HEADER.size:
+                    raise ValueError('The file is truncated.')
+                magic, version, key, count, directory_count = _HEADER.unpack_from(mapped_file, 0)
+                if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+                    raise ValueError('Unsupported file format.')
+                if key != self._key:
+                    raise ValueError('The snapshot belongs to a different configuration.')
+
+                # Every entry is stored as a NUL terminated target and source path, followed by every directory as a
+                # NUL terminated path and modification time in decimal. The fields are parsed from the mapping one by
+                # one, so the file is never copied as a whole; the entries are only applied once all of them are read.
+                fields = _iterate_fields(mapped_file, _HEADER.size)
+                pairs = zip(fields, fields)
+                entries = [
+                    (os.fsdecode(target), os.fsdecode(source))
+                    for target, source
+                    in itertools.islice(pairs, count)
+                ]
+                directory_mtimes = {
+                    os.fsdecode(directory): int(mtime)
+                    for directory, mtime
+                    in itertools.islice(pairs, directory_count)
+                }
+                if len(entries) != count or len(directory_mtimes) != directory_count or next(fields, None) is not None:
+                    raise ValueError('The number of entries does not match the header.')
+
+        return entries, directory_mtimes
+
+    def _write_entries(self, snapshot_file, entries, directory_mtimes):
+        snapshot_file.write(_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, self._key, 0, 0))
+
+        count = 0
+        for target, source in entries:
+            snapshot_file.write(os.fsencode(target) + _SEPARATOR + os.fsencode(source) + _SEPARATOR)
+            count = count + 1
+        for directory, mtime in directory_mtimes.items():
+            snapshot_file.write(os.fsencode(directory) + _SEPARATOR + str(mtime).encode() + _SEPARATOR)
+
+        snapshot_file.seek(0)
+        snapshot_file.write(_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, self._key, count, len(directory_mtimes)))
+
+
+def _iterate_fields(mapped_file, position):
+    size = len(mapped_file)
+    while position < size:
+        end = mapped_file.find(_SEPARATOR, position)
+        if end < 0:
+            raise ValueError('The file is truncated.')
+        yield mapped_file[position:end]
+        position = end + 1
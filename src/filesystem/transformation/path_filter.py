@@ -0,0 +1,88 @@
+import fnmatch
+import os
+import re
+
+
+# Limits the paths of a source directory that are indexed, set in the walker section of a volume. Glob patterns
+# containing a separator are matched against the path relative to the source directory, others against the name of the
+# file or directory. Excluded directories are skipped together with their contents, and only the files matching one of
+# the include patterns are indexed if there are any. Directories deeper than max_depth below the source directory are
+# skipped as well, 0 only indexes the files directly in the source directory.
+# pylint: disable=too-many-instance-attributes
+class PathFilter:
+
+    def __init__(self, source_directory, include=(), exclude=(), max_depth=None):
+        self._prefix_length = len(os.path.join(source_directory, ''))
+        self._max_depth = max_depth
+        self._include_names, self._include_paths = _compile_patterns(include)
+        self._exclude_names, self._exclude_paths = _compile_patterns(exclude)
+        self._include_prefixes = None
+        if include and self._include_names is None:
+            self._include_prefixes = [_get_literal_prefix(pattern) for pattern in include]
+        self._is_filtering_files = bool(include or exclude)
+
+    def is_directory_walked(self, directory):
+        relative_path = directory[self._prefix_length:].rstrip(os.sep)
+        if not relative_path:
+            return True
+        if self._max_depth is not None and relative_path.count(os.sep) >= self._max_depth:
+            return False
+        if self._is_excluded(relative_path):
+            return False
+        if self._include_prefixes is None:
+            return True
+
+        # Only the directories leading to or below the literal part of an include pattern can contain included files.
+        relative_directory = os.path.join(relative_path, '')
+        return any(
+            relative_directory.startswith(prefix) or prefix.startswith(relative_directory)
+            for prefix
+            in self._include_prefixes)
+
+    def is_file_listed(self, path):
+        if not self._is_filtering_files:
+            return True
+
+        relative_path = path[self._prefix_length:]
+        if self._is_excluded(relative_path):
+            return False
+        if self._include_names is None and self._include_paths is None:
+            return True
+
+        return self._matches(relative_path, self._include_names, self._include_paths)
+
+    def _is_excluded(self, relative_path):
+        return self._matches(relative_path, self._exclude_names, self._exclude_paths)
+
+    @staticmethod
+    def _matches(relative_path, names, paths):
+        if names is not None and names.match(relative_path[relative_path.rfind(os.sep) + 1:]):
+            return True
+
+        return paths is not None and paths.match(relative_path) is not None
+
+
+def get_filter_key(walker_config):
+    # Identifies the paths indexed with the walker settings.
+    return tuple(walker_config.include), tuple(walker_config.exclude), walker_config.max_depth
+
+
+def _compile_patterns(patterns):
+    # Returns a regular expression matching the names and one matching the relative paths, None if there are no such
+    # patterns.
+    names = [fnmatch.translate(pattern) for pattern in patterns if os.sep not in pattern]
+    paths = [fnmatch.translate(pattern.strip(os.sep)) for pattern in patterns if os.sep in pattern]
+
+    return (
+        re.compile('|'.join(names)) if names else None,
+        re.compile('|'.join(paths)) if paths else None)
+
+
+def _get_literal_prefix(pattern):
+    segments = []
+    for segment in pattern.strip(os.sep).split(os.sep)[:-1]:
+        if any(character in segment for character in '*?['):
+            break
+        segments.append(segment + os.sep)
+
+    return ''.join(segments)
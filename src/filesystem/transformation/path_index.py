@@ -0,0 +1,192 @@
+import os
+import sys
+
+
+class _Directory:
+
+    __slots__ = ('children',)
+
+    def __init__(self):
+        self.children = {}
+
+
+class _RenamedFile:
+
+    __slots__ = ('source_directory', 'name')
+
+    def __init__(self, source_directory, name):
+        self.source_directory = source_directory
+        self.name = name
+
+
+# Maps target paths to source paths. Virtual directories can be looked up by their path in a single dictionary, and
+# virtual files in the children of their parent directory, so a lookup takes two dictionary operations regardless of
+# the depth of the path. The names of directories are interned. Source paths are split into their source directory,
+# which is shared by all the files in it, and the file name: if the file keeps its name, the source directory itself is
+# stored in the children of the directory, otherwise a _RenamedFile holding the source directory and the source file
+# name. Source directories are counted, so they are dropped with their last file. Target paths are relative, they do not
+# start with a separator.
+#
+# The methods that modify the index are not thread-safe, but they can run concurrently with lookups.
+class PathIndex:
+
+    def __init__(self):
+        self._root = _Directory()
+        self._directories_by_paths = {'': self._root}
+        self._source_directories = {}
+        self._file_count = 0
+
+    def __len__(self):
+        return self._file_count
+
+    def add(self, target, source):
+        split_index = source.rfind(os.sep) + 1
+        source_directory = self._acquire_source_directory(source[:split_index])
+
+        parent_path, _, name = target.rpartition(os.sep)
+        directory = self._add_directory(parent_path)
+        source_name = source[split_index:]
+        node = directory.children.get(name)
+        if _is_file(node):
+            self._release_source_directory(self._get_source_parts(name, node)[0])
+        else:
+            self._file_count = self._file_count + 1
+        directory.children[name] = (
+            source_directory if source_name == name else _RenamedFile(source_directory, source_name))
+
+    def get_directory_count(self):
+        return len(self._directories_by_paths) - 1
+
+    def get_directory_contents(self, path):
+        while True:
+            directory = self._directories_by_paths.get(path)
+            if directory is not None:
+                return list(directory.children.keys())
+            path = path.rpartition(os.sep)[0]
+
+    def get_entries(self, source_directories=None):
+        # Returns the entries whose source directory is among source_directories, all of them if it is None.
+        entries = []
+
+        for path, directory in list(self._directories_by_paths.items()):
+            prefix = path + os.sep if path else ''
+            for name, node in list(directory.children.items()):
+                if not _is_file(node):
+                    continue
+                source_directory, source_name = self._get_source_parts(name, node)
+                if source_directories is None or source_directory in source_directories:
+                    entries.append((prefix + name, source_directory + source_name))
+
+        return entries
+
+    def get_memory_size(self):
+        counted_objects = set()
+
+        def get_size(value):
+            if id(value) in counted_objects:
+                return 0
+            counted_objects.add(id(value))
+            return sys.getsizeof(value)
+
+        size = get_size(self._directories_by_paths) + get_size(self._source_directories)
+        for source_directory in list(self._source_directories.values()):
+            size = size + get_size(source_directory) + get_size(source_directory[0])
+        for path, directory in list(self._directories_by_paths.items()):
+            size = size + get_size(path) + get_size(directory) + get_size(directory.children)
+            for name, node in list(directory.children.items()):
+                size = size + get_size(name) + get_size(node)
+                if isinstance(node, _RenamedFile):
+                    size = size + get_size(node.name)
+
+        return size
+
+    def get_source(self, target):
+        parent_path, _, name = target.rpartition(os.sep)
+        directory = self._directories_by_paths.get(parent_path)
+        if directory is None:
+            return None
+        node = directory.children.get(name)
+        if node.__class__ is str:
+            return node + name
+        if node.__class__ is _RenamedFile:
+            return node.source_directory + node.name
+
+        return None
+
+    def get_source_directories(self, source_directory=None):
+        # Returns the source directories, ending with a separator, that are below source_directory if it is not None.
+        source_directories = list(self._source_directories)
+        if source_directory is None:
+            return source_directories
+
+        prefix = os.path.join(source_directory, '')
+        return [directory for directory in source_directories if directory.startswith(prefix)]
+
+    def is_directory(self, path):
+        return path in self._directories_by_paths
+
+    def remove(self, target):
+        # Targets that are not files in the index are ignored.
+        parent_path, _, name = target.rpartition(os.sep)
+        parent = self._directories_by_paths.get(parent_path)
+        node = parent.children.get(name) if parent is not None else None
+        if not _is_file(node):
+            return
+        self._file_count = self._file_count - 1
+        self._release_source_directory(self._get_source_parts(name, node)[0])
+
+        # Remove the file, then every directory that became empty, starting from the deepest one.
+        path = target
+        while path:
+            parent_path, _, name = path.rpartition(os.sep)
+            parent = self._directories_by_paths[parent_path]
+            del parent.children[name]
+            if path != target:
+                del self._directories_by_paths[path]
+            if parent.children:
+                break
+            path = parent_path
+
+    def _add_directory(self, path):
+        directory = self._directories_by_paths.get(path)
+        if directory is not None:
+            return directory
+
+        parent_path, _, name = path.rpartition(os.sep)
+        parent = self._add_directory(parent_path)
+        node = parent.children.get(name)
+        if _is_file(node):
+            self._file_count = self._file_count - 1
+            self._release_source_directory(self._get_source_parts(name, node)[0])
+        directory = _Directory()
+        parent.children[sys.intern(name)] = directory
+        self._directories_by_paths[path] = directory
+
+        return directory
+
+    def _acquire_source_directory(self, source_directory):
+        # Returns the shared copy of the source directory.
+        entry = self._source_directories.get(source_directory)
+        if entry is None:
+            entry = [source_directory, 0]
+            self._source_directories[source_directory] = entry
+        entry[1] = entry[1] + 1
+
+        return entry[0]
+
+    def _release_source_directory(self, source_directory):
+        entry = self._source_directories[source_directory]
+        entry[1] = entry[1] - 1
+        if entry[1] == 0:
+            del self._source_directories[source_directory]
+
+    @staticmethod
+    def _get_source_parts(name, node):
+        if isinstance(node, _RenamedFile):
+            return node.source_directory, node.name
+
+        return node, name
+
+
+def _is_file(node):
+    return node is not None and not isinstance(node, _Directory)
@@ -0,0 +1,281 @@
+import re
+
+try:
+    from re import _constants as sre_constants, _parser as sre_parse
+except ImportError:
+    import sre_constants  # pylint: disable=deprecated-module
+    import sre_parse  # pylint: disable=deprecated-module
+
+# The opcodes are generated when sre_constants is imported, so pylint cannot find them.
+# pylint: disable=no-member
+
+_MAX_ALTERNATIVES = 64
+
+
+class RuleStatistics:
+
+    def __init__(self, from_path):
+        self.from_path = from_path
+        self.candidates = 0
+        self.matches = 0
+
+
+# Every rule is analyzed for conditions that all the paths it matches fulfill: literal fragments they contain, the
+# literal prefix they start with, the extensions they may end with and the minimum and maximum number of separators.
+# Rules are bucketed by extension, so a path is only tested against the regular expressions of the rules that can match
+# it. The first matching rule wins. The prefixes and the maximum number of separators also tell which directories
+# cannot contain a matching path, so walks can skip them.
+class RuleMatcher:
+
+    def __init__(self, transformations):
+        self._rules = [_Rule(transformation) for transformation in transformations]
+        self._statistics = [RuleStatistics(transformation.from_path) for transformation in transformations]
+
+        self._all_rules = list(range(len(self._rules)))
+        self._generic_rules = [i for i, rule in enumerate(self._rules) if rule.extensions is None]
+        self._rules_by_extension = {}
+        for i, rule in enumerate(self._rules):
+            for extension in rule.extensions or ():
+                self._rules_by_extension.setdefault(extension, set()).add(i)
+        for extension, rule_indices in self._rules_by_extension.items():
+            self._rules_by_extension[extension] = sorted(rule_indices.union(self._generic_rules))
+
+    def can_match_below(self, directory):
+        # The directory ends with a separator.
+        return any(rule.can_match_below(directory) for rule in self._rules)
+
+    def get_statistics(self):
+        return self._statistics
+
+    def transform(self, path):
+        for i in self._get_candidates(path):
+            rule = self._rules[i]
+            if not rule.is_possible_match(path):
+                continue
+
+            statistics = self._statistics[i]
+            statistics.candidates = statistics.candidates + 1
+            if rule.regexp.match(path):
+                statistics.matches = statistics.matches + 1
+                return rule.regexp.sub(rule.to_path, path)
+
+        return None
+
+    def _get_candidates(self, path):
+        # A trailing newline is matched by $, so the extension cannot be derived from the end of such a path.
+        if '\n' in path:
+            return self._all_rules
+
+        extension_start = path.rfind('.')
+        if extension_start < 0:
+            return self._generic_rules
+
+        return self._rules_by_extension.get(path[extension_start + 1:], self._generic_rules)
+
+
+class _Rule:
+
+    def __init__(self, transformation):
+        self.regexp = re.compile(transformation.from_path)
+        self.to_path = transformation.to_path
+
+        self.extensions = None
+        self.fragments = ()
+        self.prefix = ''
+        self.min_separators = 0
+        self.max_separators = None
+
+        try:
+            self._analyze(transformation.from_path)
+        except (re.error, IndexError, RecursionError, TypeError, ValueError):
+            self.extensions = None
+            self.fragments = ()
+            self.prefix = ''
+            self.min_separators = 0
+            self.max_separators = None
+
+    def can_match_below(self, directory):
+        # Paths below the directory start with it and contain at least as many separators.
+        if self.max_separators is not None and directory.count('/') > self.max_separators:
+            return False
+
+        return directory.startswith(self.prefix) or self.prefix.startswith(directory)
+
+    def is_possible_match(self, path):
+        if self.min_separators or self.max_separators is not None:
+            separators = path.count('/')
+            if separators < self.min_separators:
+                return False
+            if self.max_separators is not None and separators > self.max_separators:
+                return False
+
+        for fragment in self.fragments:
+            if fragment not in path:
+                return False
+
+        return True
+
+    def _analyze(self, pattern):
+        if self.regexp.flags & (re.IGNORECASE | re.MULTILINE):
+            return
+
+        nodes = _flatten(list(sre_parse.parse(pattern, self.regexp.flags)))
+        if nodes is None:
+            return
+
+        self.fragments = tuple(fragment for fragment in _get_literal_runs(nodes) if fragment)
+        self.prefix = _get_prefix(nodes)
+        self.min_separators = sum(fragment.count('/') for fragment in self.fragments)
+
+        if nodes and nodes[-1] in (
+                (sre_constants.AT, sre_constants.AT_END), (sre_constants.AT, sre_constants.AT_END_STRING)):
+            self.extensions = _get_extensions(nodes[:-1])
+            self.max_separators = _get_max_separators(nodes[:-1])
+
+
+def _flatten(nodes):
+    flattened = []
+
+    for opcode, argument in nodes:
+        if opcode == sre_constants.SUBPATTERN:
+            add_flags = argument[1]
+            if add_flags & (re.IGNORECASE | re.MULTILINE):
+                return None
+            subpattern = _flatten(list(argument[-1]))
+            if subpattern is None:
+                return None
+            flattened.extend(subpattern)
+        else:
+            flattened.append((opcode, argument))
+
+    return flattened
+
+
+def _get_literal_runs(nodes):
+    run = []
+
+    for opcode, argument in nodes:
+        if opcode == sre_constants.LITERAL:
+            run.append(chr(argument))
+        else:
+            yield ''.join(run)
+            run = []
+
+    yield ''.join(run)
+
+
+def _get_prefix(nodes):
+    # Patterns are matched at the start of paths, so the literal characters they start with are a prefix of every match.
+    start = 0
+    while start < len(nodes) and nodes[start] in (
+            (sre_constants.AT, sre_constants.AT_BEGINNING), (sre_constants.AT, sre_constants.AT_BEGINNING_STRING)):
+        start = start + 1
+
+    return next(_get_literal_runs(nodes[start:]))
+
+
+def _get_extensions(nodes):
+    for i in range(len(nodes) - 1, -1, -1):
+        if nodes[i] != (sre_constants.LITERAL, ord('.')):
+            continue
+        alternatives = _get_alternatives(nodes[i + 1:])
+        if alternatives is None or any('.' in alternative for alternative in alternatives):
+            return None
+        return frozenset(alternatives)
+
+    return None
+
+
+def _get_alternatives(nodes):
+    if nodes is None:
+        return None
+
+    alternatives = {''}
+
+    for opcode, argument in nodes:
+        if opcode == sre_constants.LITERAL:
+            node_alternatives = {chr(argument)}
+        elif opcode == sre_constants.IN and all(item[0] == sre_constants.LITERAL for item in argument):
+            node_alternatives = {chr(item[1]) for item in argument}
+        elif opcode == sre_constants.BRANCH:
+            node_alternatives = set()
+            for branch in argument[1]:
+                branch_alternatives = _get_alternatives(_flatten(list(branch)))
+                if branch_alternatives is None:
+                    return None
+                node_alternatives.update(branch_alternatives)
+        else:
+            return None
+
+        alternatives = {prefix + suffix for prefix in alternatives for suffix in node_alternatives}
+        if len(alternatives) > _MAX_ALTERNATIVES:
+            return None
+
+    return alternatives
+
+
+def _get_max_separators(nodes):
+    if nodes is None:
+        return None
+
+    separators = 0
+
+    for opcode, argument in nodes:
+        node_separators = _get_node_max_separators(opcode, argument)
+        if node_separators is None:
+            return None
+        separators = separators + node_separators
+
+    return separators
+
+
+def _get_node_max_separators(opcode, argument):
+    if opcode == sre_constants.BRANCH:
+        branch_separators = [_get_max_separators(_flatten(list(branch))) for branch in argument[1]]
+        return None if None in branch_separators else max(branch_separators)
+    if opcode in (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT):
+        return _get_repeat_max_separators(argument)
+    if opcode == sre_constants.AT:
+        return 0
+
+    return _get_character_max_separators(opcode, argument)
+
+
+def _get_repeat_max_separators(argument):
+    _, max_count, nodes = argument
+    repeated_separators = _get_max_separators(_flatten(list(nodes)))
+    if repeated_separators is None or repeated_separators and max_count == sre_constants.MAXREPEAT:
+        return None
+
+    return repeated_separators * max_count
+
+
+def _get_character_max_separators(opcode, argument):
+    # Nodes matching a single character match at most one separator, None is returned for other nodes.
+    if opcode == sre_constants.LITERAL:
+        return int(argument == ord('/'))
+    if opcode == sre_constants.NOT_LITERAL:
+        return int(argument != ord('/'))
+    if opcode == sre_constants.IN:
+        return int(_can_match_separator(argument))
+    if opcode == sre_constants.ANY:
+        return 1
+
+    return None
+
+
+def _can_match_separator(items):
+    separator = ord('/')
+    is_negated = bool(items) and items[0][0] == sre_constants.NEGATE
+    contains_separator = False
+
+    for opcode, argument in items:
+        if opcode == sre_constants.LITERAL and argument == separator:
+            contains_separator = True
+        elif opcode == sre_constants.RANGE and argument[0] <= separator <= argument[1]:
+            contains_separator = True
+        elif opcode == sre_constants.CATEGORY:
+            # Character classes such as \W or \S may contain the separator.
+            return True
+
+    return contains_separator != is_negated
@@ -0,0 +1,162 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from filesystem.transformation.directory_lister import is_directory_walked
+from filesystem.transformation.directory_mtimes import get_directory_mtime
+from filesystem.transformation.path_filter import PathFilter
+
+_BATCH_SIZE = 1024
+_QUEUE_SIZE = 64
+_QUEUE_TIMEOUT = 0.1
+
+
+# pylint: disable=too-many-instance-attributes
+class ScandirDirectoryLister:
+
+    def __init__(self, source_directory, threads=4, collect_stats=False, path_filter=None):
+        self._source_directory = source_directory
+        self._threads = max(1, threads)
+        self._collect_stats = collect_stats
+        self._path_filter = path_filter if path_filter is not None else PathFilter(source_directory)
+        self._directory_mtimes = {}
+        self._stats = {}
+        self._walk = None
+        self.is_recording_directory_mtimes = False
+
+    @property
+    def path_filter(self):
+        return self._path_filter
+
+    @property
+    def source_directory(self):
+        return self._source_directory
+
+    @property
+    def walked_directory_count(self):
+        return self._walk.walked_directory_count if self._walk is not None else 0
+
+    def get_directory_mtimes(self):
+        return self._directory_mtimes
+
+    def list_directory(self, rule_matchers=()):
+        self._directory_mtimes = {}
+        self._walk = _ParallelWalk(
+            self._threads,
+            self._stats if self._collect_stats else None,
+            self._directory_mtimes if self.is_recording_directory_mtimes else None,
+            self._path_filter,
+            rule_matchers)
+        return self._walk.run(self._source_directory)
+
+    def pop_stat(self, path):
+        # Returns the attributes captured for the path and the monotonic time they were captured at.
+        return self._stats.pop(path, None)
+
+
+# pylint: disable=too-many-instance-attributes
+class _ParallelWalk:
+
+    # pylint: disable=too-many-arguments
+    def __init__(self, threads, stats, directory_mtimes, path_filter, rule_matchers):
+        self._threads = threads
+        self._stats = stats
+        self._directory_mtimes = directory_mtimes
+        self._path_filter = path_filter
+        self._rule_matchers = rule_matchers
+        self._start_ns = time.time_ns()
+
+        self._executor = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._walked_directory_count = 0
+        self._results = queue.Queue(_QUEUE_SIZE)
+        self._stopped = threading.Event()
+
+    @property
+    def walked_directory_count(self):
+        return self._walked_directory_count
+
+    def run(self, root):
+        self._executor = ThreadPoolExecutor(self._threads)
+        self._submit(root)
+
+        try:
+            while True:
+                batch = self._results.get()
+                if batch is None:
+                    break
+                yield from batch
+        finally:
+            self._stopped.set()
+            self._executor.shutdown(wait=True)
+
+    def _submit(self, directory):
+        if self._stopped.is_set():
+            return
+        with self._lock:
+            self._pending = self._pending + 1
+        self._executor.submit(self._scan, directory)
+
+    def _scan(self, directory):
+        try:
+            self._scan_entries(directory)
+        except OSError:
+            # Unreadable directories are skipped silently, the same way as os.walk does.
+            pass
+        finally:
+            with self._lock:
+                self._pending = self._pending - 1
+                self._walked_directory_count = self._walked_directory_count + 1
+                is_finished = self._pending == 0
+            if is_finished:
+                self._put(None)
+
+    def _scan_entries(self, directory):
+        batch = []
+
+        # The modification time is taken before listing the directory, so later changes are noticed.
+        if self._directory_mtimes is not None:
+            mtime = get_directory_mtime(directory, self._start_ns)
+            if mtime is not None:
+                self._directory_mtimes[os.path.join(directory, '')] = mtime
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if self._stopped.is_set():
+                    return
+                # The type comes from d_type, only symbolic links need an additional stat call.
+                if entry.is_dir():
+                    if not entry.is_symlink() and self._is_walked(entry.path):
+                        self._submit(entry.path)
+                    continue
+                if not self._path_filter.is_file_listed(entry.path):
+                    continue
+
+                if self._stats is not None:
+                    self._capture_stat(entry)
+                batch.append(entry.path)
+                if len(batch) >= _BATCH_SIZE:
+                    self._put(batch)
+                    batch = []
+
+        if batch:
+            self._put(batch)
+
+    def _capture_stat(self, entry):
+        try:
+            self._stats[entry.path] = (entry.stat(follow_symlinks=False), time.monotonic())
+        except OSError:
+            pass
+
+    def _is_walked(self, directory):
+        return is_directory_walked(os.path.join(directory, ''), self._path_filter, self._rule_matchers)
+
+    def _put(self, item):
+        while not self._stopped.is_set():
+            try:
+                self._results.put(item, timeout=_QUEUE_TIMEOUT)
+                return
+            except queue.Full:
+                continue
@@ -0,0 +1,31 @@
+# Lists the directory of every directory lister once and passes each path to the rule matchers of all the transformers
+# that use it. The proxy factory creates one directory lister per source directory, so volumes that transform the same
+# source directory differently share a single walk. Only the subdirectories in which one of them can match a path are
+# walked. Mount points are built in processes of their own, so mount points sharing a source directory walk it
+# concurrently instead: the walk that runs behind finds the directories in the cache of the kernel, while the rules of
+# each mount point are matched on a core of its own.
+class SharedWalk:
+
+    def __init__(self):
+        self._consumers_by_listers = {}
+        self._listed_count = 0
+
+    @property
+    def listed_count(self):
+        return self._listed_count
+
+    @property
+    def walked_directory_count(self):
+        return sum(directory_lister.walked_directory_count for directory_lister in self._consumers_by_listers)
+
+    def add(self, directory_lister, transformer, rule_matcher):
+        self._consumers_by_listers.setdefault(directory_lister, []).append((transformer, rule_matcher))
+
+    def run(self):
+        for directory_lister, consumers in self._consumers_by_listers.items():
+            rule_matchers = [rule_matcher for _, rule_matcher in consumers]
+            for path in directory_lister.list_directory(rule_matchers):
+                self._listed_count = self._listed_count + 1
+                captured_stat = directory_lister.pop_stat(path)
+                for transformer, rule_matcher in consumers:
+                    transformer.add_listed_path(path, captured_stat, rule_matcher)
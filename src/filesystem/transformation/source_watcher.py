@@ -0,0 +1,201 @@
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import struct
+import threading
+
+from filesystem.transformation.directory_lister import is_directory_walked
+from filesystem.transformation.path_filter import PathFilter
+
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_DONT_FOLLOW = 0x02000000
+IN_EXCL_UNLINK = 0x04000000
+IN_ONLYDIR = 0x01000000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_Q_OVERFLOW = 0x00004000
+IN_CLOEXEC = 0o2000000
+
+_WATCH_MASK = (
+    IN_ATTRIB | IN_CLOSE_WRITE | IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO | IN_DONT_FOLLOW |
+    IN_EXCL_UNLINK | IN_ONLYDIR)
+_EVENT = struct.Struct('iIII')
+_MAX_DEFERRED_EVENTS = 65536
+_READ_SIZE = 65536
+
+_libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+
+
+# Applies the changes of a source directory to a Transformer by listening to inotify events, so files created, moved or
+# deleted after the index has been built show up in the filesystem without rebuilding the index. Subdirectories that are
+# not walked when the index is built are not watched either. A watcher started while the index is being built defers
+# the events until resume is called once the build has completed, so changes made during the walk are neither missed
+# nor overwritten by it. If too many events are deferred, the source directory is rescanned instead.
+# pylint: disable=too-many-instance-attributes
+class SourceWatcher:
+
+    def __init__(self, transformer, source_path, transformations, path_filter=None):
+        self._transformer = transformer
+        self._source_path = source_path
+        self._rule_matcher = transformer.compile_transformations(transformations)
+        self._path_filter = path_filter if path_filter is not None else PathFilter(source_path)
+
+        self._deferred_events = None
+        self._inotify_fd = -1
+        self._lock = threading.Lock()
+        self._stop_pipe = None
+        self._thread = None
+        self._watches = {}
+
+    def resume(self):
+        with self._lock:
+            deferred_events, self._deferred_events = self._deferred_events, None
+            if not deferred_events:
+                return
+            try:
+                for path, mask in deferred_events:
+                    self._apply_event(path, mask)
+            except Exception:  # pylint: disable=broad-except
+                logging.exception('Could not apply changes of %s.', self._source_path)
+
+    def start(self, is_deferred=False):
+        self._deferred_events = [] if is_deferred else None
+        self._inotify_fd = _libc.inotify_init1(IN_CLOEXEC)
+        if self._inotify_fd < 0:
+            error = ctypes.get_errno()
+            raise OSError(error, os.strerror(error))
+
+        self._stop_pipe = os.pipe()
+        self._add_watches(self._source_path)
+
+        self._thread = threading.Thread(target=self._run, name=F'SourceWatcher({self._source_path})', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is None:
+            return
+
+        os.write(self._stop_pipe[1], b'\0')
+        self._thread.join()
+        self._thread = None
+
+        os.close(self._inotify_fd)
+        os.close(self._stop_pipe[0])
+        os.close(self._stop_pipe[1])
+
+    def _run(self):
+        while True:
+            readable, _, _ = select.select([self._inotify_fd, self._stop_pipe[0]], [], [])
+            if self._stop_pipe[0] in readable:
+                return
+            try:
+                data = os.read(self._inotify_fd, _READ_SIZE)
+                with self._lock:
+                    self._handle_events(data)
+            except Exception:  # pylint: disable=broad-except
+                logging.exception('Could not apply changes of %s.', self._source_path)
+
+    def _handle_events(self, data):
+        offset = 0
+        while offset < len(data):
+            watch_descriptor, mask, _, name_length = _EVENT.unpack_from(data, offset)
+            offset = offset + _EVENT.size
+            name = os.fsdecode(data[offset:offset + name_length].rstrip(b'\0'))
+            offset = offset + name_length
+
+            if mask & IN_Q_OVERFLOW:
+                self._defer_or_apply_event(None, mask)
+            elif mask & IN_IGNORED:
+                self._watches.pop(watch_descriptor, None)
+            elif watch_descriptor in self._watches:
+                path = os.path.join(self._watches[watch_descriptor], name)
+                self._defer_or_apply_event(path, mask)
+
+    def _defer_or_apply_event(self, path, mask):
+        if self._deferred_events is None:
+            self._apply_event(path, mask)
+        elif len(self._deferred_events) < _MAX_DEFERRED_EVENTS:
+            self._deferred_events.append((path, mask))
+        else:
+            self._deferred_events = [(None, IN_Q_OVERFLOW)]
+
+    def _apply_event(self, path, mask):
+        if mask & IN_Q_OVERFLOW:
+            self._resynchronize()
+        else:
+            self._handle_event(path, mask)
+
+    def _handle_event(self, path, mask):
+        is_directory = mask & IN_ISDIR
+        if mask & (IN_CREATE | IN_MOVED_TO):
+            if is_directory:
+                if self._is_walked(path):
+                    self._add_directory(path)
+            elif self._path_filter.is_file_listed(path):
+                self._transformer.add_source_path(path, self._rule_matcher)
+        elif mask & (IN_DELETE | IN_MOVED_FROM):
+            if is_directory:
+                self._remove_directory(path)
+            else:
+                self._transformer.remove_source_path(path, self._rule_matcher)
+        elif mask & (IN_ATTRIB | IN_CLOSE_WRITE) and not is_directory:
+            self._transformer.invalidate_source_path(path, self._rule_matcher)
+
+    def _add_directory(self, directory):
+        # Files may have been created before the watch was added, so the new subtree is scanned as well.
+        self._add_watches(directory)
+        for dirname, _, filenames in self._walk(directory):
+            for filename in filenames:
+                path = os.path.join(dirname, filename)
+                if self._path_filter.is_file_listed(path):
+                    self._transformer.add_source_path(path, self._rule_matcher)
+
+    def _add_watches(self, directory):
+        for dirname, _, _ in self._walk(directory):
+            watch_descriptor = _libc.inotify_add_watch(self._inotify_fd, os.fsencode(dirname), _WATCH_MASK)
+            if watch_descriptor >= 0:
+                self._watches[watch_descriptor] = dirname
+
+    def _is_walked(self, directory):
+        return is_directory_walked(os.path.join(directory, ''), self._path_filter, [self._rule_matcher])
+
+    def _remove_directory(self, directory):
+        prefix = os.path.join(directory, '')
+        moved_watches = [
+            watch_descriptor
+            for watch_descriptor, dirname
+            in self._watches.items()
+            if dirname == directory or dirname.startswith(prefix)
+        ]
+        for watch_descriptor in moved_watches:
+            _libc.inotify_rm_watch(self._inotify_fd, watch_descriptor)
+            del self._watches[watch_descriptor]
+
+        self._transformer.remove_source_directory(directory)
+
+    def _resynchronize(self):
+        logging.warning('Too many changes in %s, rescanning the directory.', self._source_path)
+
+        prefix = os.path.join(self._source_path, '')
+        for _, source in self._transformer.get_entries():
+            if source.startswith(prefix) and not os.path.lexists(source):
+                self._transformer.remove_source_path(source, self._rule_matcher)
+
+        self._add_directory(self._source_path)
+
+    def _walk(self, directory):
+        for dirname, subdirectories, filenames in os.walk(directory):
+            subdirectories[:] = [
+                subdirectory
+                for subdirectory
+                in subdirectories
+                if self._is_walked(os.path.join(dirname, subdirectory))
+            ]
+            yield dirname, subdirectories, filenames
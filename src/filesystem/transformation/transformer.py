@@ -1,74 +1,241 @@
 import os
-import re
+import threading
 
+from filesystem.attribute_cache import KIND_ATTRIBUTES
+from filesystem.stat import Stat
+from filesystem.transformation.path_index import PathIndex
+from filesystem.transformation.rule_matcher import RuleMatcher
 
+
+# Lookups do not take the lock: they only consist of dictionary operations that are atomic in CPython, so they are safe
+# to run concurrently with an update applied by a watcher. The generation is increased whenever the index changes, so
+# results derived from it, such as missing paths and directory listings, can be cached until then. While the index is
+# rebuilt, the changes applied to the current index are recorded and applied to the new one before it is swapped in.
 class Transformer:
 
-    def __init__(self):
-        self._cache = {}
-        self._full_path_cache = {}
+    def __init__(self, attribute_cache=None):
+        self._attribute_cache = attribute_cache
+        self._generation = 0
+        self._index = PathIndex()
+        self._lock = threading.Lock()
+        self._memory_size = (None, 0)
+        self._pending_changes = None
+        self._rule_matchers = []
+
+    @property
+    def generation(self):
+        return self._generation
+
+    @staticmethod
+    def compile_transformations(transformations):
+        return RuleMatcher(transformations)
 
     def add_to_cache(self, directory_lister, transformations):
-        pattern_pairs = [
-            (re.compile(transformation.from_path), transformation.to_path)
-            for transformation
-            in transformations
-        ]
-        paths = directory_lister.list_directory()
-        transformed_paths = self._transform_paths(paths, pattern_pairs)
+        rule_matcher = self.add_transformations(transformations)
+        for path in directory_lister.list_directory([rule_matcher]):
+            self.add_listed_path(path, directory_lister.pop_stat(path), rule_matcher)
 
-        self._build_cache(transformed_paths)
+    def add_entries(self, entries):
+        self._build_cache(entries)
 
-    def get_directory_contents(self, path):
-        if path == os.sep:
-            return list(self._cache.keys())
+    def add_listed_path(self, path, captured_stat, rule_matcher):
+        # The stat result captured by the lister, together with the time it was captured at, is only cached if the path
+        # is transformed.
+        target = rule_matcher.transform(path)
+        if target is None:
+            return
+        if captured_stat is not None and self._attribute_cache is not None:
+            stat, captured_at = captured_stat
+            self._attribute_cache.seed(os.sep + target, KIND_ATTRIBUTES, Stat.to_dict(stat), captured_at)
+        with self._lock:
+            self._add_target(target, path)
+
+    def add_source_path(self, source_path, rule_matcher):
+        for target, source in self._transform_paths([source_path], rule_matcher):
+            self._build_cache([(target, source)])
+            self._invalidate_attributes(target)
+            return True
+
+        return False
+
+    def add_transformations(self, transformations):
+        rule_matcher = self.compile_transformations(transformations)
+        self._rule_matchers.append(rule_matcher)
 
-        parts = path.split(os.sep)
+        return rule_matcher
 
-        current_cache = self._cache
+    def invalidate_source_path(self, source_path, rule_matcher):
+        if self._attribute_cache is None:
+            return
 
-        for part in parts:
-            if part == '':
-                continue
-            if part not in current_cache:
-                return list(current_cache.keys())
-            current_cache = current_cache[part]
+        for target, _ in self._transform_paths([source_path], rule_matcher):
+            self._attribute_cache.invalidate(os.sep + target)
 
-        return list(current_cache.keys())
+    def is_directory(self, path):
+        return self._index.is_directory(path.strip(os.sep))
+
+    def get_directory_contents(self, path):
+        # If the directory does not exist, the contents of its deepest existing ancestor are returned.
+        return self._index.get_directory_contents(path.strip(os.sep))
+
+    def get_entries(self):
+        return self._index.get_entries()
+
+    def get_index_statistics(self):
+        return {
+            'entries': len(self._index),
+            'directories': self._index.get_directory_count(),
+            'memory_bytes': self._get_memory_size()
+        }
+
+    def get_rule_statistics(self):
+        return [
+            statistics
+            for rule_matcher
+            in self._rule_matchers
+            for statistics
+            in rule_matcher.get_statistics()
+        ]
 
     def get_source_path(self, path):
         if path.startswith(os.sep):
             path = path[1:]
-        if path in self._full_path_cache:
-            return self._full_path_cache[path]
 
-        return ''
+        source = self._index.get_source(path)
+
+        return source if source is not None else ''
+
+    def rebuild(self, sources, kept_sources=None):
+        # Builds a new index and swaps it in, so lookups keep using the current one until the new one is complete. The
+        # entries of kept_sources, a list of source directories and their rule matchers, are taken over from the current
+        # index instead of listing the directories again; if it is None, all the current entries are kept. The lock is
+        # only taken to swap the indexes, so watchers keep updating the current index in the meantime.
+        with self._lock:
+            self._pending_changes = []
+        try:
+            index, rule_matchers = self._build_index(sources, kept_sources)
+            with self._lock:
+                for target, source in self._pending_changes:
+                    if source is not None:
+                        index.add(target, source)
+                    else:
+                        index.remove(target)
+                self._index = index
+                self._rule_matchers = rule_matchers
+                self._generation += 1
+                if self._attribute_cache is not None:
+                    self._attribute_cache.clear()
+        finally:
+            with self._lock:
+                self._pending_changes = None
+
+    def remove_missing_sources(self, directories, listings):
+        # Removes the entries whose source directory is not among directories, or whose source file is not among the
+        # file names listed in their directory. Directories end with a separator, those without a listing are unchanged.
+        with self._lock:
+            source_directories = {
+                directory
+                for directory
+                in self._index.get_source_directories()
+                if directory not in directories or directory in listings
+            }
+            if not source_directories:
+                return
+            for target, source in self._index.get_entries(source_directories):
+                split_index = source.rfind(os.sep) + 1
+                filenames = listings.get(source[:split_index])
+                if filenames is None or source[split_index:] not in filenames:
+                    self._remove_target(target)
+
+    def remove_source_directory(self, source_directory):
+        with self._lock:
+            source_directories = set(self._index.get_source_directories(source_directory))
+            for target, _ in self._index.get_entries(source_directories):
+                self._remove_target(target)
+
+    def remove_source_path(self, source_path, rule_matcher):
+        for target, source in self._transform_paths([source_path], rule_matcher):
+            with self._lock:
+                if self._index.get_source(target) != source:
+                    return False
+                self._remove_target(target)
+            return True
+
+        return False
+
+    def _build_index(self, sources, kept_sources):
+        index = PathIndex()
+        rule_matchers = []
+        if kept_sources is None:
+            rule_matchers.extend(self._rule_matchers)
+            for target, source in self._index.get_entries():
+                index.add(target, source)
+        else:
+            rule_matchers.extend(rule_matcher for _, rule_matcher in kept_sources)
+            for target, source in self._get_kept_entries(kept_sources):
+                index.add(target, source)
+        # Sources sharing a directory lister are listed once.
+        rule_matchers_by_listers = {}
+        for directory_lister, transformations in sources:
+            rule_matcher = self.compile_transformations(transformations)
+            rule_matchers.append(rule_matcher)
+            rule_matchers_by_listers.setdefault(directory_lister, []).append(rule_matcher)
+        for directory_lister, listed_rule_matchers in rule_matchers_by_listers.items():
+            for path in directory_lister.list_directory(listed_rule_matchers):
+                directory_lister.pop_stat(path)
+                for rule_matcher in listed_rule_matchers:
+                    target = rule_matcher.transform(path)
+                    if target is not None:
+                        index.add(target, path)
+
+        return index, rule_matchers
+
+    def _get_kept_entries(self, kept_sources):
+        prefixes = [(os.path.join(directory, ''), rule_matcher) for directory, rule_matcher in kept_sources]
+        for target, source in self._index.get_entries():
+            for prefix, rule_matcher in prefixes:
+                if source.startswith(prefix) and rule_matcher.transform(source) == target:
+                    yield target, source
+                    break
 
-    def _transform_paths(self, paths, patterns):
+    def _transform_paths(self, paths, rule_matcher):
         for path in paths:
-            for pattern_pair in patterns:
-                source_regexp = pattern_pair[0]
-                target_pattern = pattern_pair[1]
-                if source_regexp.match(path):
-                    yield source_regexp.sub(target_pattern, path), path
-                    break
+            target = rule_matcher.transform(path)
+            if target is not None:
+                yield target, path
 
     def _build_cache(self, paths):
-        for path in paths:
-            source = path[1]
-            target = path[0]
-            parts = target.split(os.sep)
-
-            current_cache = self._cache
-            current_level = 0
-            deepest_level = len(parts) - 1
-
-            for part in parts:
-                if current_level < deepest_level:
-                    current_cache.setdefault(part, {})
-                    current_cache = current_cache[part]
-                    current_level = current_level + 1
-                else:
-                    current_cache[part] = source
-                    self._full_path_cache[target] = source
-                    break
+        # The lock is taken for every entry, so entries show up as soon as they are listed when the index is built in
+        # the background, and watchers are not blocked until the build finishes.
+        for target, source in paths:
+            with self._lock:
+                self._add_target(target, source)
+
+    def _add_target(self, target, source):
+        # Called with the lock held.
+        self._index.add(target, source)
+        if self._pending_changes is not None:
+            self._pending_changes.append((target, source))
+        self._generation += 1
+
+    def _get_memory_size(self):
+        # Measuring the index walks all of it, so the result is kept until the index changes.
+        generation = self._generation
+        memory_generation, memory_size = self._memory_size
+        if memory_generation != generation:
+            memory_size = self._index.get_memory_size()
+            self._memory_size = (generation, memory_size)
+
+        return memory_size
+
+    def _invalidate_attributes(self, target):
+        if self._attribute_cache is not None:
+            self._attribute_cache.invalidate(os.sep + target)
+
+    def _remove_target(self, target):
+        # Called with the lock held.
+        self._index.remove(target)
+        if self._pending_changes is not None:
+            self._pending_changes.append((target, None))
+        self._generation += 1
+        self._invalidate_attributes(target)
@@ -1,30 +1,64 @@
 import errno
+import itertools
+import logging
 import os
 
 from fuse import FuseOSError, Operations
 
-# pylint: disable=unused-import
+from filesystem.attribute_cache import AttributeCache, KIND_ATTRIBUTES, KIND_STATFS
+from filesystem.directory_listing_cache import DirectoryListingCache
+from filesystem.file_pool import FilePool
+from filesystem.file_syncer import FileSyncer
+from filesystem.mmap_pool import MmapPool
+from filesystem.negative_cache import NegativeCache
+from filesystem.open_files import OpenFiles
+from filesystem.readahead import Readahead
 from filesystem.stat import Stat
-from util.decorate_all import decorate_all, dont_decorate
-from util.log_decorator import log_decorator
 
 
-# pylint: disable=too-many-public-methods
-class TransformerFs(Operations, metaclass=decorate_all(log_decorator)):
+# pylint: disable=too-many-instance-attributes,too-many-public-methods
+class TransformerFs(Operations):
 
-    def __init__(self, transformer):
+    _directory_attributes = Stat.to_dict(Stat.create_default())
+    _statfs_attributes = (
+        'f_bavail', 'f_bfree', 'f_blocks', 'f_bsize',
+        'f_favail', 'f_ffree', 'f_files', 'f_flag',
+        'f_frsize', 'f_namemax')
+
+    # pylint: disable=too-many-arguments
+    def __init__(
+            self, transformer, index_builder=None, watchers=(), *, attribute_cache=None, mmap_pool=None,
+            negative_cache=None, file_syncer=None, readahead=None, file_pool=None):
         self._transformer = transformer
+        self._index_builder = index_builder
+        self._watchers = watchers
+        self._attribute_cache = attribute_cache if attribute_cache is not None else AttributeCache(0)
+        self._negative_cache = negative_cache if negative_cache is not None else NegativeCache(0)
+        self._directory_listing_cache = DirectoryListingCache()
+        self._directory_handles = itertools.count(1)
+        self._directory_listings = {}
+        self._file_syncer = file_syncer if file_syncer is not None else FileSyncer()
+        self._open_files = OpenFiles(
+            mmap_pool if mmap_pool is not None else MmapPool(),
+            readahead if readahead is not None else Readahead(),
+            self._file_syncer)
+        self._file_pool = file_pool if file_pool is not None else FilePool()
 
     ####################################################################################################################
     # Methods related to directory and permission mangement.
     ####################################################################################################################
 
     def access(self, path, amode):
-        source_path = self._get_real_path(path)
-        if source_path != '':
-            if os.access(source_path, amode):
-                return 0
-        elif amode in (os.R_OK, os.X_OK):
+        is_accessible = self._attribute_cache.get(path, amode)
+        if is_accessible is None:
+            source_path = self._get_real_path(path)
+            if source_path != '':
+                is_accessible = os.access(source_path, amode)
+                self._attribute_cache.set(path, amode, is_accessible)
+            else:
+                is_accessible = amode in (os.R_OK, os.X_OK)
+
+        if is_accessible:
             return 0
 
         raise FuseOSError(errno.EACCES)
@@ -32,6 +66,7 @@ class TransformerFs(Operations, metaclass=decorate_all(log_decorator)):
     def chmod(self, path, mode):
         source_path = self._get_real_path(path)
         if source_path != '':
+            self._attribute_cache.invalidate(path)
             return os.chmod(source_path, mode)
 
         raise FuseOSError(errno.EACCES)
@@ -39,21 +74,46 @@ class TransformerFs(Operations, metaclass=decorate_all(log_decorator)):
     def chown(self, path, uid, gid):
         source_path = self._get_real_path(path)
         if source_path != '':
+            self._attribute_cache.invalidate(path)
             return os.chown(source_path, uid, gid)
 
         raise FuseOSError(errno.EACCES)
 
-    def getattr(self, path, fh=None):
-        source_path = self._get_real_path(path)
-        if source_path != '':
-            stat = os.lstat(source_path)
-        else:
-            stat = Stat.create_default()
+    def destroy(self, path):
+        for watcher in self._watchers:
+            watcher.stop()
+        if self._index_builder is not None:
+            self._index_builder.save_snapshot()
+        self._file_syncer.stop()
+        self._file_pool.close()
 
-        attrs = ('st_atime', 'st_ctime', 'st_gid', 'st_mode',
-                 'st_mtime', 'st_nlink', 'st_size', 'st_uid')
-
-        return dict((key, getattr(stat, key)) for key in attrs)
+    def getattr(self, path, fh=None):
+        # Missing paths are only cached once the index is complete, and until entries are added to it.
+        generation = self._transformer.generation
+        if self._negative_cache.contains(path, generation):
+            raise FuseOSError(errno.ENOENT)
+
+        attributes = self._get_attributes(path)
+        if attributes is None and self._wait_for_index():
+            generation = self._transformer.generation
+            attributes = self._get_attributes(path)
+        if attributes is None:
+            if self._index_builder is None or self._index_builder.is_ready:
+                self._negative_cache.add(path, generation)
+            raise FuseOSError(errno.ENOENT)
+
+        return attributes
+
+    def init(self, path):
+        # If the index has not been built before mounting, it is built in the background. The watchers are started
+        # first, unless they have been started before the index was built, so no change made during the build is missed.
+        for watcher in self._watchers:
+            try:
+                watcher.start()
+            except OSError as exception:
+                logging.error('Could not watch source directory. %s', exception)
+        if self._index_builder is not None and not self._index_builder.is_ready:
+            self._index_builder.start()
 
     def link(self, target, source):
         raise FuseOSError(errno.EACCES)
@@ -64,13 +124,31 @@ class TransformerFs(Operations, metaclass=decorate_all(log_decorator)):
     def mknod(self, path, mode, dev):
         raise FuseOSError(errno.EACCES)
 
-    def readdir(self, path, fh):
-        entries = ['.', '..']
-        file_list = self._transformer.get_directory_contents(path)
-        entries.extend(file_list)
-
-        for entry in entries:
-            yield entry
+    def opendir(self, path):
+        return next(self._directory_handles)
+
+    def readdir(self, path, fh, offset=0):
+        # Every entry is returned with its position, and the listing is continued after the position passed as offset,
+        # so a large directory is read in pages of the size of the buffer of the kernel: '.' is at 1, '..' at 2, the
+        # names of the listing follow from 3. The listing taken when the directory handle is first read is kept until
+        # it is released, so the positions do not shift if the index changes between the pages.
+        if offset == 0:
+            self._wait_for_index()
+        if offset < 1:
+            yield '.', self._directory_attributes, 1
+        if offset < 2:
+            yield '..', None, 2
+
+        # Files are listed with their attributes if those are in the cache, directories always.
+        names = self._get_directory_listing(path, fh, offset)
+        prefix = os.path.join(path, '')
+        for i in range(max(offset - 2, 0), len(names)):
+            name = names[i]
+            entry_path = prefix + name
+            attributes = self._attribute_cache.get(entry_path, KIND_ATTRIBUTES)
+            if attributes is None and self._transformer.is_directory(entry_path):
+                attributes = self._directory_attributes
+            yield name, attributes, i + 3
 
     def readlink(self, path):
         full_path = self._get_real_path(path)
@@ -84,6 +162,10 @@ class TransformerFs(Operations, metaclass=decorate_all(log_decorator)):
 
         return pathname
 
+    def releasedir(self, path, fh):
+        self._directory_listings.pop(fh, None)
+        return 0
+
     def rename(self, old, new):
         raise FuseOSError(errno.EACCES)
 
@@ -92,16 +174,18 @@ class TransformerFs(Operations, metaclass=decorate_all(log_decorator)):
 
     def statfs(self, path):
         source_path = self._get_real_path(path)
-        if source_path != '':
-            stv = os.statvfs(source_path)
-            attrs = (
-                'f_bavail', 'f_bfree', 'f_blocks', 'f_bsize',
-                'f_favail', 'f_ffree', 'f_files', 'f_flag',
-                'f_frsize', 'f_namemax')
+        if source_path == '':
+            raise FuseOSError(errno.EACCES)
 
-            return dict((key, getattr(stv, key)) for key in attrs)
+        # Every file of a volume is on the file system of its source directory, so the result is cached per volume.
+        source_directory = self._get_source_directory(source_path)
+        attributes = self._attribute_cache.get(source_directory, KIND_STATFS)
+        if attributes is None:
+            stv = os.statvfs(source_path)
+            attributes = dict((key, getattr(stv, key)) for key in self._statfs_attributes)
+            self._attribute_cache.set(source_directory, KIND_STATFS, attributes)
 
-        raise FuseOSError(errno.EACCES)
+        return attributes
 
     def symlink(self, target, source):
         raise FuseOSError(errno.EACCES)
@@ -112,6 +196,7 @@ class TransformerFs(Operations, metaclass=decorate_all(log_decorator)):
     def utimens(self, path, times=None):
         source_path = self._get_real_path(path)
         if source_path != '':
+            self._attribute_cache.invalidate(path)
             return os.utime(source_path, times)
 
         raise FuseOSError(errno.EACCES)
@@ -128,43 +213,100 @@ class TransformerFs(Operations, metaclass=decorate_all(log_decorator)):
         raise FuseOSError(errno.EACCES)
 
     def flush(self, path, fh):
-        return os.fsync(fh)
+        return self._file_syncer.flush(fh)
 
     def fsync(self, path, datasync, fh):
         source_path = self._get_real_path(path)
         if source_path != '':
-            return self.flush(source_path, fh)
+            return self._file_syncer.fsync(fh)
 
         raise FuseOSError(errno.EACCES)
 
     def open(self, path, flags):
         source_path = self._get_real_path(path)
         if source_path != '':
-            return os.open(source_path, flags)
+            fh = self._file_pool.open(source_path, flags)
+            self._open_files.acquire(fh, flags)
+            return fh
 
         raise FuseOSError(errno.EACCES)
 
     def read(self, path, size, offset, fh):
-        os.lseek(fh, offset, os.SEEK_SET)
-        return os.read(fh, size)
+        return self._open_files.read(fh, size, offset)
+
+    def read_into(self, path, buffer, offset, fh):  # pylint: disable=unused-argument
+        return self._open_files.read_into(fh, buffer, offset)
 
     def release(self, path, fh):
-        return os.close(fh)
+        self._open_files.release(fh)
+        return self._file_pool.release(fh)
 
     def truncate(self, path, length, fh=None):
         source_path = self._get_real_path(path)
         if source_path != '':
+            self._attribute_cache.invalidate(path)
             with open(source_path, 'r+') as opened_file:
                 opened_file.truncate(length)
 
     def write(self, path, data, offset, fh):
-        os.lseek(fh, offset, os.SEEK_SET)
-        return os.write(fh, data)
+        self._attribute_cache.invalidate(path)
+        return os.pwrite(fh, data, offset)
 
     ####################################################################################################################
     # Auxiliary methods.
     ####################################################################################################################
 
-    @dont_decorate
+    def _get_attributes(self, path):
+        attributes = self._attribute_cache.get(path, KIND_ATTRIBUTES)
+        if attributes is not None:
+            return attributes
+
+        source_path = self._get_real_path(path)
+        if source_path != '':
+            attributes = Stat.to_dict(os.lstat(source_path))
+            self._attribute_cache.set(path, KIND_ATTRIBUTES, attributes)
+            return attributes
+
+        if self._transformer.is_directory(path):
+            return self._directory_attributes
+
+        return None
+
+    def _get_directory_listing(self, path, fh, offset):
+        # Reading a directory from the start takes a new listing.
+        names = self._directory_listings.get(fh) if offset > 0 else None
+        if names is not None:
+            return names
+
+        generation = self._transformer.generation
+        names = self._directory_listing_cache.get(path, generation)
+        if names is None:
+            names = self._transformer.get_directory_contents(path)
+            self._directory_listing_cache.set(path, generation, names)
+        if fh is not None:
+            self._directory_listings[fh] = names
+
+        return names
+
+    def _get_source_directory(self, source_path):
+        # Returns the source directory of the volume containing source_path, or source_path itself if it is unknown.
+        source_directories = self._index_builder.source_directories if self._index_builder is not None else ()
+        return max(
+            (
+                source_directory
+                for source_directory
+                in source_directories
+                if source_path.startswith(os.path.join(source_directory, ''))
+            ),
+            key=len,
+            default=source_path)
+
     def _get_real_path(self, path):
         return self._transformer.get_source_path(path)
+
+    def _wait_for_index(self):
+        # Returns whether the index has been completed while waiting.
+        if self._index_builder is None or self._index_builder.is_ready:
+            return False
+
+        return self._index_builder.wait()
@@ -6,6 +6,8 @@ from pylint.lint import Run
 def main():
     arguments = [
         '--rcfile=.pylintrc',
+        'benchmark',
+        'benchmark_runner',
         'domain',
         'filesystem',
         'lint_runner',
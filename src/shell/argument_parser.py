@@ -11,6 +11,7 @@ class ArgumentParser:
         self._config_file_path = None
         self._is_config_generation_requested = False
         self._is_debugging_enabled = False
+        self._is_profiling_enabled = False
         self._log_file_path = None
 
     @property
@@ -25,6 +26,10 @@ class ArgumentParser:
     def is_debugging_enabled(self):
         return self._is_debugging_enabled
 
+    @property
+    def is_profiling_enabled(self):
+        return self._is_profiling_enabled
+
     @property
     def log_file_path(self):
         return self._log_file_path
@@ -33,8 +38,8 @@ class ArgumentParser:
         self._application_name, parameters = self._arguments[0], self._arguments[1:]
 
         try:
-            shortopts = 'c:dhil:'
-            longopts = ['config=', 'debug', 'help', 'install', 'log-path=']
+            shortopts = 'c:dhil:p'
+            longopts = ['config=', 'debug', 'help', 'install', 'log-path=', 'profile']
             opts, _ = getopt.getopt(parameters, shortopts, longopts)
         except getopt.GetoptError as ex:
             raise exceptions.ArgumentParserException(ex)
@@ -51,6 +56,8 @@ class ArgumentParser:
                 self._is_config_generation_requested = True
             elif opt in ('-l', '--log-path'):
                 self._log_file_path = arg
+            elif opt in ('-p', '--profile'):
+                self._is_profiling_enabled = True
 
         if not self._is_config_generation_requested and self._config_file_path == '':
             raise exceptions.ArgumentParserException(
@@ -66,4 +73,5 @@ class ArgumentParser:
         print('  -h, --help       Print this help and exit.')
         print('  -i, --install    Generate a sample configuration file and exit.')
         print('  -l, --log-path   The path of the log file.')
+        print('  -p, --profile    Profile the filesystems until they are unmounted.')
         print('')
@@ -2,9 +2,12 @@ import json
 import os
 
 from domain import exceptions
-from domain.config import Config, LoggingConfig, TransformationConfig, VolumeConfig
+from domain.config import (
+    CacheConfig, Config, ConfigChanges, IndexConfig, IoConfig, LoggingConfig, MetricsConfig, TracingConfig,
+    TransformationConfig, VolumeConfig, WalkerConfig)
 
 SECTION_LOGGING = 'logging'
+SECTION_TRACING = 'tracing'
 SECTION_VOLUMES = 'volumes'
 
 
@@ -13,6 +16,28 @@ class ConfigManager:
     def __init__(self, filename: str):
         self._filename = filename
 
+    def compare(self, old_config, new_config):
+        old_volumes_by_mount_points = self._group_by_mount_points(old_config.volumes)
+        new_volumes_by_mount_points = self._group_by_mount_points(new_config.volumes)
+        config_changes = ConfigChanges()
+
+        for mount_point, volumes in new_volumes_by_mount_points.items():
+            old_volumes = old_volumes_by_mount_points.get(mount_point)
+            if old_volumes is None:
+                config_changes.added[mount_point] = volumes
+            elif self._create_volumes_config(old_volumes) == self._create_volumes_config(volumes):
+                continue
+            elif self._can_reindex(old_volumes, volumes):
+                config_changes.reindexed[mount_point] = volumes
+            else:
+                config_changes.remounted[mount_point] = volumes
+
+        for mount_point in old_volumes_by_mount_points:
+            if mount_point not in new_volumes_by_mount_points:
+                config_changes.removed.append(mount_point)
+
+        return config_changes
+
     def generate_sample_configuration(self):
         logging_config = LoggingConfig()
         logging_config.enabled = True
@@ -62,16 +87,55 @@ class ConfigManager:
             raise exceptions.ConfigManagerException(
                 F'The configuration file {self._filename} does not exist.')
 
+    def _can_reindex(self, old_volumes, new_volumes):
+        # Settings of the mount point are taken from its first volume, except for allow_other, which all volumes must
+        # enable. Mirrors are always remounted.
+        if not all(volume.transformations for volume in old_volumes + new_volumes):
+            return False
+
+        return self._get_mount_settings(old_volumes) == self._get_mount_settings(new_volumes)
+
     def _create_json_config(self, config):
         json_config = {}
 
         json_config[SECTION_LOGGING] = self._create_logging_config(
             config.logging)
+        json_config[SECTION_TRACING] = self._create_tracing_config(
+            config.tracing)
         json_config[SECTION_VOLUMES] = self._create_volumes_config(
             config.volumes)
 
         return json_config
 
+    def _create_cache_config(self, cache_config):
+        return {
+            'attribute_max_entries': cache_config.attribute_max_entries,
+            'attribute_ttl_seconds': cache_config.attribute_ttl_seconds,
+            'directory_handle_max_entries': cache_config.directory_handle_max_entries,
+            'directory_handle_ttl_seconds': cache_config.directory_handle_ttl_seconds,
+            'negative_max_entries': cache_config.negative_max_entries,
+            'negative_ttl_seconds': cache_config.negative_ttl_seconds
+        }
+
+    def _create_index_config(self, index_config):
+        return {
+            'progressive': index_config.progressive,
+            'snapshot_directory': index_config.snapshot_directory,
+            'wait_timeout_seconds': index_config.wait_timeout_seconds,
+            'watch': index_config.watch
+        }
+
+    def _create_io_config(self, io_config):
+        return {
+            'durability': io_config.durability,
+            'file_pool_max_entries': io_config.file_pool_max_entries,
+            'file_pool_ttl_seconds': io_config.file_pool_ttl_seconds,
+            'group_commit_interval_seconds': io_config.group_commit_interval_seconds,
+            'mmap_threshold_bytes': io_config.mmap_threshold_bytes,
+            'readahead_max_bytes': io_config.readahead_max_bytes,
+            'threads': io_config.threads
+        }
+
     def _create_logging_config(self, logging_config):
         return {
             'enabled': logging_config.enabled,
@@ -80,6 +144,18 @@ class ConfigManager:
             'path': logging_config.path
         }
 
+    def _create_metrics_config(self, metrics_config):
+        return {
+            'enabled': metrics_config.enabled
+        }
+
+    def _create_tracing_config(self, tracing_config):
+        return {
+            'enabled': tracing_config.enabled,
+            'max_payload_bytes': tracing_config.max_payload_bytes,
+            'sample_rates': tracing_config.sample_rates
+        }
+
     def _create_volumes_config(self, volumes_config):
         json_volumes = []
 
@@ -95,9 +171,14 @@ class ConfigManager:
 
         return {
             'allow_other': volume_config.allow_other,
+            'cache': self._create_cache_config(volume_config.cache),
+            'index': self._create_index_config(volume_config.index),
+            'io': self._create_io_config(volume_config.io),
+            'metrics': self._create_metrics_config(volume_config.metrics),
             'mount_point': volume_config.mount_point,
             'source_path': volume_config.source_path,
-            'transformations': json_transformations
+            'transformations': json_transformations,
+            'walker': self._create_walker_config(volume_config.walker)
         }
 
     def _create_transformations_config(self, transformations_config):
@@ -112,16 +193,98 @@ class ConfigManager:
 
         return json_transformations
 
+    def _create_walker_config(self, walker_config):
+        return {
+            'collect_stats': walker_config.collect_stats,
+            'engine': walker_config.engine,
+            'exclude': walker_config.exclude,
+            'include': walker_config.include,
+            'max_depth': walker_config.max_depth,
+            'threads': walker_config.threads
+        }
+
+    def _get_mount_settings(self, volumes):
+        mount_settings = self._create_volume_config(volumes[0])
+        mount_settings['allow_other'] = all(volume.allow_other for volume in volumes)
+        del mount_settings['index']['watch']
+        del mount_settings['source_path']
+        del mount_settings['transformations']
+        del mount_settings['walker']
+
+        return mount_settings
+
+    def _group_by_mount_points(self, volumes):
+        volumes_by_mount_points = {}
+        for volume in volumes:
+            volumes_by_mount_points.setdefault(volume.mount_point, []).append(volume)
+
+        return volumes_by_mount_points
+
     def _parse_json_config(self, json_config):
         config = Config()
 
         config.logging = self._parse_logging_config(
             json_config[SECTION_LOGGING])
+        if SECTION_TRACING in json_config:
+            config.tracing = self._parse_tracing_config(
+                json_config[SECTION_TRACING])
         config.volumes = self._parse_volumes_config(
             json_config[SECTION_VOLUMES])
 
         return config
 
+    def _parse_cache_config(self, json_config):
+        cache_config = CacheConfig()
+
+        if 'attribute_max_entries' in json_config:
+            cache_config.attribute_max_entries = json_config['attribute_max_entries']
+        if 'attribute_ttl_seconds' in json_config:
+            cache_config.attribute_ttl_seconds = json_config['attribute_ttl_seconds']
+        if 'directory_handle_max_entries' in json_config:
+            cache_config.directory_handle_max_entries = json_config['directory_handle_max_entries']
+        if 'directory_handle_ttl_seconds' in json_config:
+            cache_config.directory_handle_ttl_seconds = json_config['directory_handle_ttl_seconds']
+        if 'negative_max_entries' in json_config:
+            cache_config.negative_max_entries = json_config['negative_max_entries']
+        if 'negative_ttl_seconds' in json_config:
+            cache_config.negative_ttl_seconds = json_config['negative_ttl_seconds']
+
+        return cache_config
+
+    def _parse_index_config(self, json_config):
+        index_config = IndexConfig()
+
+        if 'progressive' in json_config:
+            index_config.progressive = json_config['progressive']
+        if 'snapshot_directory' in json_config:
+            index_config.snapshot_directory = json_config['snapshot_directory']
+        if 'wait_timeout_seconds' in json_config:
+            index_config.wait_timeout_seconds = json_config['wait_timeout_seconds']
+        if 'watch' in json_config:
+            index_config.watch = json_config['watch']
+
+        return index_config
+
+    def _parse_io_config(self, json_config):
+        io_config = IoConfig()
+
+        if 'durability' in json_config:
+            io_config.durability = json_config['durability']
+        if 'file_pool_max_entries' in json_config:
+            io_config.file_pool_max_entries = json_config['file_pool_max_entries']
+        if 'file_pool_ttl_seconds' in json_config:
+            io_config.file_pool_ttl_seconds = json_config['file_pool_ttl_seconds']
+        if 'group_commit_interval_seconds' in json_config:
+            io_config.group_commit_interval_seconds = json_config['group_commit_interval_seconds']
+        if 'mmap_threshold_bytes' in json_config:
+            io_config.mmap_threshold_bytes = json_config['mmap_threshold_bytes']
+        if 'readahead_max_bytes' in json_config:
+            io_config.readahead_max_bytes = json_config['readahead_max_bytes']
+        if 'threads' in json_config:
+            io_config.threads = json_config['threads']
+
+        return io_config
+
     def _parse_logging_config(self, json_config):
         logging_config = LoggingConfig()
 
@@ -132,6 +295,26 @@ class ConfigManager:
 
         return logging_config
 
+    def _parse_metrics_config(self, json_config):
+        metrics_config = MetricsConfig()
+
+        if 'enabled' in json_config:
+            metrics_config.enabled = json_config['enabled']
+
+        return metrics_config
+
+    def _parse_tracing_config(self, json_config):
+        tracing_config = TracingConfig()
+
+        if 'enabled' in json_config:
+            tracing_config.enabled = json_config['enabled']
+        if 'max_payload_bytes' in json_config:
+            tracing_config.max_payload_bytes = json_config['max_payload_bytes']
+        if 'sample_rates' in json_config:
+            tracing_config.sample_rates = json_config['sample_rates']
+
+        return tracing_config
+
     def _parse_volumes_config(self, json_config):
         volumes_config = []
 
@@ -149,9 +332,19 @@ class ConfigManager:
 
         if 'allow_other' in json_volume:
             volume_config.allow_other = json_volume['allow_other']
+        if 'cache' in json_volume:
+            volume_config.cache = self._parse_cache_config(json_volume['cache'])
+        if 'index' in json_volume:
+            volume_config.index = self._parse_index_config(json_volume['index'])
+        if 'io' in json_volume:
+            volume_config.io = self._parse_io_config(json_volume['io'])
+        if 'metrics' in json_volume:
+            volume_config.metrics = self._parse_metrics_config(json_volume['metrics'])
         if 'transformations' in json_volume:
             volume_config.transformations = self._parse_transformations_config(
                 json_volume['transformations'])
+        if 'walker' in json_volume:
+            volume_config.walker = self._parse_walker_config(json_volume['walker'])
 
         return volume_config
 
@@ -164,3 +357,21 @@ class ConfigManager:
                 json_transformation['to']))
 
         return transformations
+
+    def _parse_walker_config(self, json_config):
+        walker_config = WalkerConfig()
+
+        if 'collect_stats' in json_config:
+            walker_config.collect_stats = json_config['collect_stats']
+        if 'engine' in json_config:
+            walker_config.engine = json_config['engine']
+        if 'exclude' in json_config:
+            walker_config.exclude = json_config['exclude']
+        if 'include' in json_config:
+            walker_config.include = json_config['include']
+        if 'max_depth' in json_config:
+            walker_config.max_depth = json_config['max_depth']
+        if 'threads' in json_config:
+            walker_config.threads = json_config['threads']
+
+        return walker_config
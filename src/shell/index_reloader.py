@@ -0,0 +1,145 @@
+import logging
+import os
+import select
+import threading
+
+from filesystem.transformation.path_filter import get_filter_key
+from filesystem.transformation.transformer import Transformer
+
+
+# Runs in the FUSE process of a mount point with transformations and owns the source watchers of its volumes. The parent
+# process sends the volumes of the mount point through the connection when the configuration has been reloaded; the FUSE
+# loop blocks the main thread, so they are received on a thread of their own. Volumes whose source directory, rules and
+# path filter did not change keep their entries and their watchers, only the others are listed again. The watchers are
+# started before the index is built, and apply the changes made during the build once it has completed.
+# pylint: disable=too-many-instance-attributes
+class IndexReloader:
+
+    # pylint: disable=too-many-arguments
+    def __init__(self, proxy_factory, transformer, index_builder, volumes, connection=None):
+        self._proxy_factory = proxy_factory
+        self._transformer = transformer
+        self._index_builder = index_builder
+        self._source_paths = self._get_source_paths(volumes, {})
+        self._connection = connection
+
+        self._is_started = False
+        self._stop_pipe = None
+        self._thread = None
+        self._watchers = self._create_watchers(volumes, {})
+
+    def reload(self, volumes):
+        old_keys = set(self._source_paths)
+        new_volumes = [volume for volume in volumes if volume.transformations]
+        new_keys = {self._get_volume_key(volume) for volume in new_volumes}
+        added_volumes = [volume for volume in new_volumes if self._get_volume_key(volume) not in old_keys]
+        changed_count = len(added_volumes) + len(old_keys - new_keys)
+        logging.info('Reloading %s volumes, %s of them changed.', len(new_volumes), changed_count)
+
+        # The watchers of the new volumes are started before the index is rebuilt, so no change is missed; the changes
+        # they apply in the meantime are carried over to the new index.
+        watchers = self._create_watchers(volumes, self._watchers)
+        for key, watcher in self._watchers.items():
+            if key not in watchers:
+                watcher.stop()
+        self._start_watchers(watcher for key, watcher in watchers.items() if key not in self._watchers)
+        self._watchers = watchers
+
+        sources = [
+            (self._proxy_factory.create_directory_lister(volume), volume.transformations)
+            for volume
+            in added_volumes
+        ]
+        kept_sources = None
+        if not old_keys.issubset(new_keys):
+            kept_sources = [
+                (self._source_paths[key], Transformer.compile_transformations(volume.transformations))
+                for key, volume
+                in ((self._get_volume_key(volume), volume) for volume in new_volumes)
+                if key in old_keys
+            ]
+        snapshot = self._proxy_factory.create_snapshot(volumes)
+        self._index_builder.rebuild(sources, kept_sources, snapshot)
+        self._source_paths = self._get_source_paths(new_volumes, self._source_paths)
+
+    def start(self):
+        # Called before the index is built and again when the filesystem is mounted.
+        if self._is_started:
+            return
+        self._is_started = True
+
+        is_deferred = not self._index_builder.is_ready
+        if is_deferred:
+            self._index_builder.add_callback(self._resume_watchers)
+        self._start_watchers(self._watchers.values(), is_deferred)
+        if self._connection is None:
+            return
+
+        self._stop_pipe = os.pipe()
+        self._thread = threading.Thread(target=self._run, name='IndexReloader', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._is_started = False
+        for watcher in self._watchers.values():
+            watcher.stop()
+        if self._thread is None:
+            return
+
+        os.write(self._stop_pipe[1], b'\0')
+        self._thread.join()
+        self._thread = None
+
+        os.close(self._stop_pipe[0])
+        os.close(self._stop_pipe[1])
+
+    def _create_watchers(self, volumes, watchers):
+        # Watchers are reused if their volume did not change.
+        return {
+            key: watchers[key] if key in watchers else self._proxy_factory.create_watcher(volume, self._transformer)
+            for key, volume
+            in ((self._get_volume_key(volume), volume) for volume in volumes)
+            if volume.transformations and volume.index.watch
+        }
+
+    def _get_source_paths(self, volumes, source_paths):
+        # The entries of a kept volume are matched against its source path as it was spelled when they were listed.
+        return {
+            key: source_paths.get(key, volume.source_path)
+            for key, volume
+            in ((self._get_volume_key(volume), volume) for volume in volumes)
+            if volume.transformations
+        }
+
+    @staticmethod
+    def _get_volume_key(volume):
+        return (
+            os.path.abspath(volume.source_path),
+            tuple((t.from_path, t.to_path) for t in volume.transformations),
+            get_filter_key(volume.walker))
+
+    def _run(self):
+        while True:
+            readable, _, _ = select.select([self._connection.fileno(), self._stop_pipe[0]], [], [])
+            if self._stop_pipe[0] in readable:
+                return
+            try:
+                volumes = self._connection.recv()
+            except EOFError:
+                return
+            try:
+                self.reload(volumes)
+            except Exception:  # pylint: disable=broad-except
+                logging.exception('Could not reload the configuration.')
+
+    def _resume_watchers(self, _):
+        for watcher in self._watchers.values():
+            watcher.resume()
+
+    @staticmethod
+    def _start_watchers(watchers, is_deferred=False):
+        for watcher in watchers:
+            try:
+                watcher.start(is_deferred)
+            except OSError as exception:
+                logging.error('Could not watch source directory. %s', exception)
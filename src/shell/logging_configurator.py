@@ -9,6 +9,10 @@ class LoggingConfigurator:
         self._is_debugging_enabled = is_debugging_enabled
         self._log_path_override = log_path_override
 
+    @property
+    def log_path(self):
+        return self._determine_log_path()
+
     def configure_logging(self):
         logger = logging.getLogger()
 
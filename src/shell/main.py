@@ -1,14 +1,15 @@
+import functools
+import os
 import sys
 
-from multiprocessing import Process
-
-from fuse import FUSE
-
 from domain import exceptions
 from shell.argument_parser import ArgumentParser
 from shell.config_manager import ConfigManager
 from shell.logging_configurator import LoggingConfigurator
 from shell.proxy_factory import ProxyFactory
+from shell.supervisor import Supervisor, run_fuse
+from util.profiler import Profiler
+from util.tracer import Tracer
 
 
 def run():
@@ -17,13 +18,18 @@ def run():
         if not argument_parser.parse():
             return
 
-        config = _load_or_generate_configuration(argument_parser)
+        config_manager = ConfigManager(argument_parser.config_file_path)
+        config = _load_or_generate_configuration(config_manager, argument_parser)
 
-        _configure_logging(config, argument_parser)
+        log_path = _configure_logging(config, argument_parser)
 
-        proxy_factory = ProxyFactory()
-        proxies = proxy_factory.create_proxies(config.volumes)
-        _run_fuse(proxies, argument_parser)
+        create_proxies = functools.partial(
+            _create_proxies,
+            tracing_config=config.tracing,
+            argument_parser=argument_parser,
+            profile_directory=os.path.dirname(os.path.abspath(log_path)) if log_path is not None else os.getcwd())
+        proxies = create_proxies(config.volumes)
+        _run_fuse(proxies, argument_parser, Supervisor(config_manager, config, create_proxies))
     except exceptions.ArgumentParserException:
         argument_parser.print_help()
         sys.exit(1)
@@ -35,9 +41,7 @@ def run():
         sys.exit(2)
 
 
-def _load_or_generate_configuration(argument_parser):
-    config_manager = ConfigManager(argument_parser.config_file_path)
-
+def _load_or_generate_configuration(config_manager, argument_parser):
     if argument_parser.is_config_generation_requested:
         config = config_manager.generate_sample_configuration()
         config_manager.save(config)
@@ -55,31 +59,33 @@ def _configure_logging(config, argument_parser):
         argument_parser.log_file_path)
     logging_configurator.configure_logging()
 
+    return logging_configurator.log_path
 
-def _run_fuse(proxies, argument_parser):
-    if argument_parser.is_debugging_enabled and len(proxies) == 1:
-        FUSE(
-            proxies[0].fuse_fs,
-            proxies[0].mount_point,
-            nothreads=True,
-            foreground=True)
-    else:
-        for proxy in proxies:
-            _start_fuse_process(proxy)
 
+def _create_proxies(volumes, tracing_config, argument_parser, profile_directory):
+    proxy_factory = ProxyFactory()
+    proxies = proxy_factory.create_proxies(volumes)
+    _install_tracer(proxies, tracing_config, argument_parser)
+    for proxy in proxies:
+        # The profiler only wraps the operations while it is running, so every filesystem gets one.
+        proxy.profiler = Profiler(profile_directory)
+        proxy.is_profiling_enabled = argument_parser.is_profiling_enabled
 
-def _start_fuse_process(proxy):
-    named_args = _get_named_args(proxy)
-    proc = Process(
-        target=FUSE,
-        args=(proxy.fuse_fs, proxy.mount_point),
-        kwargs=named_args)
-    proc.start()
+    return proxies
 
 
-def _get_named_args(proxy):
-    return {
-        'nothreads': True,
-        'foreground': True,
-        'allow_other': proxy.allow_other
-    }
+def _install_tracer(proxies, tracing_config, argument_parser):
+    # Without tracing, the filesystems are called directly.
+    if not tracing_config.enabled and not argument_parser.is_debugging_enabled:
+        return
+
+    tracer = Tracer(tracing_config.sample_rates, tracing_config.max_payload_bytes)
+    for proxy in proxies:
+        tracer.install(proxy.fuse_fs)
+
+
+def _run_fuse(proxies, argument_parser, supervisor):
+    if argument_parser.is_debugging_enabled and len(proxies) == 1:
+        run_fuse(proxies[0], is_debugging_enabled=True)
+    else:
+        supervisor.run(proxies)
@@ -1,19 +1,63 @@
+import logging
+import os
+
+from multiprocessing import Pipe
+
 from domain import exceptions
 from domain.proxy import Proxy
+from filesystem.attribute_cache import AttributeCache
+from filesystem.directory_handles import DirectoryHandles
+from filesystem.file_pool import FilePool
+from filesystem.file_syncer import DURABILITY_GROUP_COMMIT, DURABILITY_PASSTHROUGH, DURABILITY_STRICT, FileSyncer
 from filesystem.mirror_fs import MirrorFs
+from filesystem.mmap_pool import MmapPool
+from filesystem.negative_cache import NegativeCache
+from filesystem.readahead import Readahead
+from filesystem.stats_file import STATS_DIRECTORY, StatsFile
 from filesystem.transformer_fs import TransformerFs
 from filesystem.transformation.directory_lister import DirectoryLister
+from filesystem.transformation.index_builder import IndexBuilder
+from filesystem.transformation.index_snapshot import IndexSnapshot
+from filesystem.transformation.path_filter import PathFilter, get_filter_key
+from filesystem.transformation.scandir_directory_lister import ScandirDirectoryLister
+from filesystem.transformation.source_watcher import SourceWatcher
 from filesystem.transformation.transformer import Transformer
+from shell.index_reloader import IndexReloader
+from util.metrics import Metrics
+from util.operation_wrapper import limit_concurrency
 
 
+# The indexes are not built here but in the FUSE process of each mount point, see Proxy. Volumes of a mount point with
+# the same source directory and path filter share one directory lister (created with the other walker settings of the
+# first of them), so the directory is walked once.
 class ProxyFactory:
 
+    def __init__(self):
+        self._directory_listers = {}
+
     def create_proxies(self, volumes):
         volumes_by_mount_points = self._group_by_mount_points(volumes)
         proxies = self._build_proxies(volumes_by_mount_points)
 
         return proxies
 
+    def create_directory_lister(self, volume):
+        key = (os.path.abspath(volume.source_path), get_filter_key(volume.walker))
+        if key not in self._directory_listers:
+            self._directory_listers[key] = self._create_directory_lister(volume)
+
+        return self._directory_listers[key]
+
+    def create_snapshot(self, volumes):
+        for volume in volumes:
+            if volume.index.snapshot_directory:
+                return IndexSnapshot(volume.index.snapshot_directory, volumes)
+
+        return None
+
+    def create_watcher(self, volume, transformer):
+        return SourceWatcher(transformer, volume.source_path, volume.transformations, self._create_path_filter(volume))
+
     def _group_by_mount_points(self, volumes):
         volumes_by_mount_points = {}
         mount_points_with_mirrors = set()
@@ -37,27 +81,113 @@ class ProxyFactory:
     def _build_proxies(self, volumes_by_mount_points):
         proxies = []
         for mount_point, volumes in volumes_by_mount_points.items():
-            fuse_fs = self._create_fs(volumes)
+            metrics = Metrics() if volumes[0].metrics.enabled else None
+            parent_connection, child_connection = Pipe() if self._is_transformed(volumes) else (None, None)
+            fuse_fs, index_builder, watchers = self._create_fs(volumes, metrics, child_connection)
             allow_other = all(v.allow_other for v in volumes)
-            proxy = Proxy(mount_point, fuse_fs, allow_other)
+            threads = volumes[0].io.threads
+            if threads > 1:
+                limit_concurrency(fuse_fs, threads)
+            if metrics is not None:
+                metrics.install(fuse_fs)
+                if self._can_serve_stats(volumes):
+                    StatsFile(metrics).install(fuse_fs)
+            proxy = Proxy(mount_point, fuse_fs, allow_other, threads, parent_connection)
+            proxy.index_builder = index_builder
+            proxy.watchers = watchers
+            proxy.is_index_progressive = volumes[0].index.progressive
             proxies.append(proxy)
 
         return proxies
 
-    def _create_fs(self, volumes):
-        if len(volumes) > 1 or volumes[0].transformations:
-            transformer = self._build_transformer(volumes)
-            return TransformerFs(transformer)
-
-        return MirrorFs(volumes[0].source_path)
-
-    def _build_transformer(self, volumes):
-        transformer = Transformer()
-        for volume in volumes:
-            if volume.transformations:
-                directory_lister = DirectoryLister(volume.source_path)
-                transformer.add_to_cache(
-                    directory_lister,
-                    volume.transformations)
-
-        return transformer
+    def _create_fs(self, volumes, metrics=None, connection=None):
+        if self._is_transformed(volumes):
+            attribute_cache = AttributeCache(
+                volumes[0].cache.attribute_ttl_seconds, volumes[0].cache.attribute_max_entries)
+            transformer = Transformer(attribute_cache)
+            index_builder = self._create_index_builder(volumes, transformer, metrics)
+            if metrics is not None:
+                metrics.set_index_builder(index_builder)
+                metrics.set_transformer(transformer)
+            watchers = [IndexReloader(self, transformer, index_builder, volumes, connection)]
+            mmap_pool = MmapPool(volumes[0].io.mmap_threshold_bytes)
+            negative_cache = NegativeCache(volumes[0].cache.negative_max_entries)
+            file_syncer = self._create_file_syncer(volumes[0])
+            readahead = Readahead(volumes[0].io.readahead_max_bytes)
+            file_pool = FilePool(volumes[0].io.file_pool_max_entries, volumes[0].io.file_pool_ttl_seconds)
+            transformer_fs = TransformerFs(
+                transformer,
+                index_builder,
+                watchers,
+                attribute_cache=attribute_cache,
+                mmap_pool=mmap_pool,
+                negative_cache=negative_cache,
+                file_syncer=file_syncer,
+                readahead=readahead,
+                file_pool=file_pool)
+            return transformer_fs, index_builder, watchers
+
+        mmap_pool = MmapPool(volumes[0].io.mmap_threshold_bytes)
+        negative_cache = NegativeCache(volumes[0].cache.negative_max_entries, volumes[0].cache.negative_ttl_seconds)
+        file_syncer = self._create_file_syncer(volumes[0])
+        readahead = Readahead(volumes[0].io.readahead_max_bytes)
+        directory_handles = DirectoryHandles(
+            volumes[0].source_path,
+            volumes[0].cache.directory_handle_max_entries,
+            volumes[0].cache.directory_handle_ttl_seconds)
+        return MirrorFs(
+            volumes[0].source_path,
+            mmap_pool=mmap_pool,
+            negative_cache=negative_cache,
+            file_syncer=file_syncer,
+            readahead=readahead,
+            directory_handles=directory_handles), None, ()
+
+    def _create_file_syncer(self, volume):
+        durability = volume.io.durability
+        if durability not in (DURABILITY_GROUP_COMMIT, DURABILITY_PASSTHROUGH, DURABILITY_STRICT):
+            raise exceptions.InvalidConfigException(F'Unknown durability mode: {durability}.')
+
+        return FileSyncer(durability, volume.io.group_commit_interval_seconds)
+
+    def _create_directory_lister(self, volume):
+        walker = volume.walker
+        path_filter = self._create_path_filter(volume)
+        if walker.engine == 'scandir':
+            return ScandirDirectoryLister(volume.source_path, walker.threads, walker.collect_stats, path_filter)
+        if walker.engine == 'walk':
+            return DirectoryLister(volume.source_path, path_filter)
+
+        raise exceptions.InvalidConfigException(F'Unknown walker engine: {walker.engine}.')
+
+    def _can_serve_stats(self, volumes):
+        # The stats directory would hide an entry of the same name in the source directory of a mirror.
+        if self._is_transformed(volumes) or not os.path.lexists(volumes[0].source_path + STATS_DIRECTORY):
+            return True
+
+        logging.warning(
+            'Not serving metrics in %s, the source directory contains %s.', volumes[0].mount_point, STATS_DIRECTORY)
+        return False
+
+    @staticmethod
+    def _create_path_filter(volume):
+        walker = volume.walker
+        if walker.max_depth is not None and walker.max_depth < 0:
+            raise exceptions.InvalidConfigException(F'Invalid maximum depth: {walker.max_depth}.')
+
+        return PathFilter(volume.source_path, walker.include, walker.exclude, walker.max_depth)
+
+    def _create_index_builder(self, volumes, transformer, metrics):
+        sources = [
+            (self.create_directory_lister(volume), volume.transformations)
+            for volume
+            in volumes
+            if volume.transformations
+        ]
+        snapshot = self.create_snapshot(volumes)
+
+        return IndexBuilder(transformer, sources, snapshot, metrics, volumes[0].index.wait_timeout_seconds)
+
+    @staticmethod
+    def _is_transformed(volumes):
+        return len(volumes) > 1 or bool(volumes[0].transformations)
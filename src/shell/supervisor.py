@@ -0,0 +1,190 @@
+import functools
+import gc
+import logging
+import os
+import signal
+import time
+
+from multiprocessing import Process, connection
+
+from domain import exceptions
+from filesystem.router_fuse import RouterFuse
+
+
+# Runs a FUSE process for every mount point, which builds its own index, so indexes are built in parallel and the
+# parent process does not keep any of them in memory. The FUSE processes report when their index is ready.
+#
+# The configuration is reloaded on SIGHUP. libfuse unmounts when a FUSE process receives SIGHUP, so the signal is only
+# handled here: the volumes of mount points that only need a new index are sent to their FUSE process, while added and
+# remounted mount points get a new process. Unchanged mount points are not touched.
+#
+# SIGUSR1 is forwarded to the FUSE processes, where it starts or stops profiling.
+# pylint: disable=too-many-instance-attributes
+class Supervisor:
+
+    def __init__(self, config_manager, config, create_proxies):
+        self._config_manager = config_manager
+        self._config = config
+        self._create_proxies = create_proxies
+        self._is_profiling_toggle_requested = False
+        self._is_reload_requested = False
+        self._proxies = {}
+        self._processes = {}
+        self._start_times = {}
+        self._wakeup_pipe = None
+
+    def reload(self):
+        try:
+            config = self._config_manager.load()
+            config_changes = self._config_manager.compare(self._config, config)
+            volumes = [
+                volume
+                for volumes_by_mount_points in (config_changes.added, config_changes.remounted)
+                for volumes in volumes_by_mount_points.values()
+                for volume in volumes
+            ]
+            # New proxies are created before anything is stopped, so an invalid configuration leaves everything intact.
+            proxies = self._create_proxies(volumes) if volumes else []
+        except (exceptions.ConfigManagerException, exceptions.InvalidConfigException, OSError) as exception:
+            logging.error('Could not reload the configuration. %s', exception)
+            return
+
+        for mount_point in config_changes.removed + list(config_changes.remounted):
+            self._stop_fuse_process(mount_point)
+        for mount_point, volumes in config_changes.reindexed.items():
+            if mount_point in self._proxies:
+                self._proxies[mount_point].connection.send(volumes)
+        for proxy in proxies:
+            self._start_fuse_process(proxy)
+
+        self._config = config
+        logging.info(
+            'Configuration reloaded: %s added, %s reindexed, %s remounted, %s removed.',
+            len(config_changes.added),
+            len(config_changes.reindexed),
+            len(config_changes.remounted),
+            len(config_changes.removed))
+
+    def run(self, proxies):
+        self._wakeup_pipe = os.pipe()
+        for proxy in proxies:
+            self._start_fuse_process(proxy)
+        signal.signal(signal.SIGHUP, self._request_reload)
+        signal.signal(signal.SIGUSR1, self._request_profiling_toggle)
+
+        while self._processes:
+            sentinels = [process.sentinel for process in self._processes.values()]
+            connections = [proxy.connection for proxy in self._proxies.values() if proxy.connection is not None]
+            for ready in connection.wait(sentinels + connections + [self._wakeup_pipe[0]]):
+                if ready in connections:
+                    self._receive_report(ready)
+                elif ready == self._wakeup_pipe[0]:
+                    os.read(self._wakeup_pipe[0], 1024)
+            if self._is_profiling_toggle_requested:
+                self._is_profiling_toggle_requested = False
+                self._toggle_profiling()
+            if self._is_reload_requested:
+                self._is_reload_requested = False
+                self.reload()
+            self._remove_exited_processes()
+
+    def _receive_report(self, fuse_connection):
+        report = fuse_connection.recv()
+        for mount_point, proxy in self._proxies.items():
+            if proxy.connection is fuse_connection:
+                logging.info(
+                    'Index of %s is ready: built in %.1f seconds, %.1f seconds after starting its process.',
+                    mount_point,
+                    report['build_seconds'],
+                    time.monotonic() - self._start_times[mount_point])
+
+    def _remove_exited_processes(self):
+        for mount_point, process in list(self._processes.items()):
+            if process.exitcode is not None:
+                logging.info('FUSE process of %s exited with code %s.', mount_point, process.exitcode)
+                del self._processes[mount_point]
+                del self._proxies[mount_point]
+                del self._start_times[mount_point]
+
+    def _request_profiling_toggle(self, signum, frame):  # pylint: disable=unused-argument
+        self._is_profiling_toggle_requested = True
+        os.write(self._wakeup_pipe[1], b'\0')
+
+    def _request_reload(self, signum, frame):  # pylint: disable=unused-argument
+        self._is_reload_requested = True
+        os.write(self._wakeup_pipe[1], b'\0')
+
+    def _start_fuse_process(self, proxy):
+        # The objects of the parent process are frozen, so the collector does not write to the pages the FUSE process
+        # shares with it.
+        gc.freeze()
+        process = Process(target=run_fuse, args=(proxy,))
+        process.start()
+        self._processes[proxy.mount_point] = process
+        self._proxies[proxy.mount_point] = proxy
+        self._start_times[proxy.mount_point] = time.monotonic()
+
+    def _toggle_profiling(self):
+        for process in self._processes.values():
+            if process.pid is not None:
+                os.kill(process.pid, signal.SIGUSR1)
+
+    def _stop_fuse_process(self, mount_point):
+        # libfuse unmounts the filesystem on SIGTERM.
+        process = self._processes.pop(mount_point, None)
+        self._proxies.pop(mount_point, None)
+        self._start_times.pop(mount_point, None)
+        if process is not None:
+            process.terminate()
+            process.join()
+
+
+def run_fuse(proxy, is_debugging_enabled=False):
+    # Runs in the FUSE process. libfuse only installs its own signal handlers where the default one is in place.
+    signal.signal(signal.SIGHUP, signal.SIG_DFL)
+
+    profiler = proxy.profiler
+    if profiler is not None:
+        profiler.install(proxy.fuse_fs, proxy.index_builder)
+        profiler.listen(signal.SIGUSR1)
+        if proxy.is_profiling_enabled:
+            profiler.start()
+
+    try:
+        _build_and_mount(proxy, is_debugging_enabled)
+    finally:
+        if profiler is not None:
+            profiler.stop()
+
+
+def _build_and_mount(proxy, is_debugging_enabled):
+    index_builder = proxy.index_builder
+    # The watchers are started before the index is built, see IndexReloader.
+    for watcher in proxy.watchers:
+        watcher.start()
+    if index_builder is not None:
+        index_builder.add_callback(functools.partial(_on_index_built, proxy.connection))
+        if not proxy.is_index_progressive:
+            # Building the index allocates millions of objects that are never freed, collecting them is a waste.
+            gc.disable()
+            try:
+                index_builder.build()
+            finally:
+                gc.enable()
+
+    if is_debugging_enabled:
+        RouterFuse(proxy.fuse_fs, proxy.mount_point, nothreads=True, foreground=True)
+    else:
+        RouterFuse(
+            proxy.fuse_fs,
+            proxy.mount_point,
+            nothreads=proxy.threads <= 1,
+            foreground=True,
+            allow_other=proxy.allow_other)
+
+
+def _on_index_built(fuse_connection, index_builder):
+    # The index lives as long as the process (or until the next reload), so the collector does not traverse it again.
+    gc.freeze()
+    if fuse_connection is not None:
+        fuse_connection.send({'build_seconds': index_builder.build_seconds})
@@ -55,6 +55,17 @@ class ArgumentParserTest(unittest.TestCase):
         self.assertEqual('test.log', arg_parsers[1].log_file_path)
         self.assertEqual('test1.log', arg_parsers[2].log_file_path)
 
+    def test_argumentparser_profiling(self):
+        args1 = ['main.py']
+        args2 = ['main.py', '-p']
+        args3 = ['main.py', '--profile']
+
+        arg_parsers = self._run_argumentparser(args1, args2, args3)
+
+        self.assertFalse(arg_parsers[0].is_profiling_enabled)
+        self.assertTrue(arg_parsers[1].is_profiling_enabled)
+        self.assertTrue(arg_parsers[2].is_profiling_enabled)
+
     def test_argumentparser_log_file_error(self):
         args = ['main.py', '--log']
 
@@ -0,0 +1,88 @@
+import time
+import unittest
+from unittest.mock import patch
+
+from filesystem.attribute_cache import AttributeCache, KIND_ATTRIBUTES, KIND_STATFS
+
+
+class AttributeCacheTest(unittest.TestCase):
+
+    def test_get(self):
+        attribute_cache = AttributeCache(10)
+
+        attribute_cache.set('/a.md', KIND_ATTRIBUTES, {'st_size': 1})
+
+        self.assertEqual({'st_size': 1}, attribute_cache.get('/a.md', KIND_ATTRIBUTES))
+        self.assertIsNone(attribute_cache.get('/a.md', KIND_STATFS))
+        self.assertIsNone(attribute_cache.get('/b.md', KIND_ATTRIBUTES))
+
+    @patch('time.monotonic')
+    def test_get_expired(self, mock_monotonic):
+        attribute_cache = AttributeCache(10)
+        mock_monotonic.return_value = 100
+        attribute_cache.set('/a.md', KIND_ATTRIBUTES, {'st_size': 1})
+
+        mock_monotonic.return_value = 111
+        result = attribute_cache.get('/a.md', KIND_ATTRIBUTES)
+
+        self.assertIsNone(result)
+
+    @patch('time.monotonic')
+    def test_get_seeded(self, mock_monotonic):
+        attribute_cache = AttributeCache(10)
+        mock_monotonic.return_value = 200
+        attribute_cache.seed('/a.md', KIND_ATTRIBUTES, {'st_size': 1}, 195)
+        attribute_cache.seed('/b.md', KIND_ATTRIBUTES, {'st_size': 2}, 100)
+
+        mock_monotonic.return_value = 204
+        first_result = attribute_cache.get('/a.md', KIND_ATTRIBUTES)
+        stale_result = attribute_cache.get('/b.md', KIND_ATTRIBUTES)
+        mock_monotonic.return_value = 206
+        result = attribute_cache.get('/a.md', KIND_ATTRIBUTES)
+
+        self.assertEqual({'st_size': 1}, first_result)
+        self.assertIsNone(stale_result)
+        self.assertIsNone(result)
+
+    def test_seed_full(self):
+        attribute_cache = AttributeCache(10, 1)
+        attribute_cache.seed('/a.md', KIND_ATTRIBUTES, {'st_size': 1}, time.monotonic())
+
+        attribute_cache.seed('/b.md', KIND_ATTRIBUTES, {'st_size': 2}, time.monotonic())
+
+        self.assertEqual({'st_size': 1}, attribute_cache.get('/a.md', KIND_ATTRIBUTES))
+        self.assertIsNone(attribute_cache.get('/b.md', KIND_ATTRIBUTES))
+
+    def test_set_evicts_least_recently_used(self):
+        attribute_cache = AttributeCache(10, 2)
+        attribute_cache.set('/a.md', KIND_ATTRIBUTES, {'st_size': 1})
+        attribute_cache.set('/b.md', KIND_ATTRIBUTES, {'st_size': 2})
+        attribute_cache.get('/a.md', KIND_ATTRIBUTES)
+
+        attribute_cache.set('/c.md', KIND_ATTRIBUTES, {'st_size': 3})
+
+        self.assertEqual(2, len(attribute_cache))
+        self.assertEqual({'st_size': 1}, attribute_cache.get('/a.md', KIND_ATTRIBUTES))
+        self.assertIsNone(attribute_cache.get('/b.md', KIND_ATTRIBUTES))
+        self.assertEqual({'st_size': 3}, attribute_cache.get('/c.md', KIND_ATTRIBUTES))
+
+    def test_disabled(self):
+        attribute_cache = AttributeCache(0)
+
+        attribute_cache.set('/a.md', KIND_ATTRIBUTES, {'st_size': 1})
+
+        self.assertIsNone(attribute_cache.get('/a.md', KIND_ATTRIBUTES))
+
+    def test_invalidate(self):
+        attribute_cache = AttributeCache(10)
+        attribute_cache.set('/a.md', KIND_ATTRIBUTES, {'st_size': 1})
+        attribute_cache.set('/a.md', KIND_STATFS, {'f_bsize': 4096})
+        attribute_cache.set('/a.md', 4, True)
+        attribute_cache.set('/b.md', KIND_ATTRIBUTES, {'st_size': 2})
+
+        attribute_cache.invalidate('/a.md')
+
+        self.assertIsNone(attribute_cache.get('/a.md', KIND_ATTRIBUTES))
+        self.assertIsNone(attribute_cache.get('/a.md', KIND_STATFS))
+        self.assertIsNone(attribute_cache.get('/a.md', 4))
+        self.assertEqual({'st_size': 2}, attribute_cache.get('/b.md', KIND_ATTRIBUTES))
@@ -0,0 +1,32 @@
+import unittest
+
+from benchmark.benchmark_result import BenchmarkResult, compare_results
+
+
+class BenchmarkResultTest(unittest.TestCase):
+
+    def test_to_dict(self):
+        result = BenchmarkResult('index.get_source_path', 1000, 0.5, bytes_per_million_entries=100).to_dict()
+
+        self.assertEqual(2000, result['operations_per_second'])
+        self.assertEqual(100, result['bytes_per_million_entries'])
+
+    def test_compare_results(self):
+        baseline_results = [
+            {'name': 'index.add_to_cache', 'operations_per_second': 1000.0, 'peak_rss_bytes': 100},
+            {'name': 'index.get_source_path', 'operations_per_second': 1000.0, 'peak_rss_bytes': 100}
+        ]
+        results = [
+            {'name': 'index.add_to_cache', 'operations_per_second': 850.0, 'peak_rss_bytes': 130},
+            {'name': 'index.get_source_path', 'operations_per_second': 700.0, 'peak_rss_bytes': 90},
+            {'name': 'index_memory', 'operations_per_second': 1.0}
+        ]
+
+        regressions = compare_results(results, baseline_results, 0.2)
+
+        self.assertEqual(
+            [
+                ('index.add_to_cache', 'peak_rss_bytes', 100, 130),
+                ('index.get_source_path', 'operations_per_second', 1000.0, 700.0)
+            ],
+            regressions)
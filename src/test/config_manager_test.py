@@ -34,10 +34,18 @@ class ConfigManagerTest(unittest.TestCase):
 
         volume_config = VolumeConfig('/mount/disk', '/home/root/transformed')
         volume_config.allow_other = True
+        volume_config.walker.collect_stats = True
+        volume_config.walker.engine = 'scandir'
+        volume_config.walker.exclude = ['.git', 'node_modules']
+        volume_config.walker.include = ['doc/*.md']
+        volume_config.walker.max_depth = 3
+        volume_config.walker.threads = 8
         volume_config.transformations = transformations_config
 
         test_config = Config()
         test_config.logging = logging_config
+        test_config.tracing.enabled = True
+        test_config.tracing.sample_rates = {'read': 0.01}
         test_config.volumes = [volume_config]
 
         # Act.
@@ -49,8 +57,16 @@ class ConfigManagerTest(unittest.TestCase):
         self.assertEqual('critical', loaded_config.logging.level)
         self.assertEqual(10000, loaded_config.logging.max_size_bytes)
         self.assertEqual('path/to/logfile.txt', loaded_config.logging.path)
+        self.assertTrue(loaded_config.tracing.enabled)
+        self.assertEqual({'read': 0.01}, loaded_config.tracing.sample_rates)
         self.assertEqual(1, len(loaded_config.volumes))
         self.assertTrue(loaded_config.volumes[0].allow_other)
+        self.assertTrue(loaded_config.volumes[0].walker.collect_stats)
+        self.assertEqual('scandir', loaded_config.volumes[0].walker.engine)
+        self.assertEqual(['.git', 'node_modules'], loaded_config.volumes[0].walker.exclude)
+        self.assertEqual(['doc/*.md'], loaded_config.volumes[0].walker.include)
+        self.assertEqual(3, loaded_config.volumes[0].walker.max_depth)
+        self.assertEqual(8, loaded_config.volumes[0].walker.threads)
         self.assertEqual(
             '/home/root/transformed',
             loaded_config.volumes[0].mount_point)
@@ -65,8 +81,90 @@ class ConfigManagerTest(unittest.TestCase):
         self.assertEqual(
             'to2', loaded_config.volumes[0].transformations[1].to_path)
 
+    def test_configmanager_load_volume_settings(self):
+        # Arrange.
+        config_manager = ConfigManager(self.test_config_filename)
+
+        volume_config = VolumeConfig('/mount/disk', '/home/root/transformed')
+        volume_config.cache.attribute_max_entries = 1024
+        volume_config.cache.attribute_ttl_seconds = 30
+        volume_config.cache.directory_handle_max_entries = 16
+        volume_config.cache.negative_max_entries = 100
+        volume_config.index.snapshot_directory = '/var/cache/routerfs'
+        volume_config.index.progressive = True
+        volume_config.index.wait_timeout_seconds = 5
+        volume_config.index.watch = True
+        volume_config.io.durability = 'group_commit'
+        volume_config.io.file_pool_max_entries = 16
+        volume_config.io.file_pool_ttl_seconds = 5
+        volume_config.io.mmap_threshold_bytes = 1048576
+        volume_config.io.readahead_max_bytes = 0
+        volume_config.io.threads = 4
+        volume_config.metrics.enabled = True
+
+        test_config = Config()
+        test_config.volumes = [volume_config]
+
+        # Act.
+        config_manager.save(test_config)
+        loaded_config = config_manager.load()
+
+        # Assert.
+        self.assertEqual(1024, loaded_config.volumes[0].cache.attribute_max_entries)
+        self.assertEqual(30, loaded_config.volumes[0].cache.attribute_ttl_seconds)
+        self.assertEqual(16, loaded_config.volumes[0].cache.directory_handle_max_entries)
+        self.assertEqual(1.0, loaded_config.volumes[0].cache.directory_handle_ttl_seconds)
+        self.assertEqual(100, loaded_config.volumes[0].cache.negative_max_entries)
+        self.assertEqual(1.0, loaded_config.volumes[0].cache.negative_ttl_seconds)
+        self.assertEqual(
+            '/var/cache/routerfs',
+            loaded_config.volumes[0].index.snapshot_directory)
+        self.assertTrue(loaded_config.volumes[0].index.progressive)
+        self.assertEqual(5, loaded_config.volumes[0].index.wait_timeout_seconds)
+        self.assertTrue(loaded_config.volumes[0].index.watch)
+        self.assertEqual('group_commit', loaded_config.volumes[0].io.durability)
+        self.assertEqual(1.0, loaded_config.volumes[0].io.group_commit_interval_seconds)
+        self.assertEqual(16, loaded_config.volumes[0].io.file_pool_max_entries)
+        self.assertEqual(5, loaded_config.volumes[0].io.file_pool_ttl_seconds)
+        self.assertEqual(1048576, loaded_config.volumes[0].io.mmap_threshold_bytes)
+        self.assertEqual(0, loaded_config.volumes[0].io.readahead_max_bytes)
+        self.assertEqual(4, loaded_config.volumes[0].io.threads)
+        self.assertTrue(loaded_config.volumes[0].metrics.enabled)
+
+    def test_configmanager_compare(self):
+        # Arrange.
+        old_config = Config()
+        old_config.volumes = [
+            self._create_volume('/mnt/kept', 'kept'),
+            self._create_volume('/mnt/reindexed', 'reindexed'),
+            self._create_volume('/mnt/remounted', 'remounted'),
+            self._create_volume('/mnt/removed', 'removed')]
+        new_config = Config()
+        new_config.volumes = [
+            self._create_volume('/mnt/kept', 'kept'),
+            self._create_volume('/mnt/reindexed', 'reindexed', 'to2'),
+            self._create_volume('/mnt/remounted', 'remounted'),
+            self._create_volume('/mnt/added', 'added')]
+        new_config.volumes[2].io.threads = 4
+
+        # Act.
+        config_changes = ConfigManager(self.test_config_filename).compare(old_config, new_config)
+
+        # Assert.
+        self.assertEqual(['/mnt/added'], list(config_changes.added))
+        self.assertEqual(['/mnt/reindexed'], list(config_changes.reindexed))
+        self.assertEqual('to2', config_changes.reindexed['/mnt/reindexed'][0].transformations[0].to_path)
+        self.assertEqual(['/mnt/remounted'], list(config_changes.remounted))
+        self.assertEqual(['/mnt/removed'], config_changes.removed)
+
     def test_configmanager_nonexistent(self):
         config_manager = ConfigManager('nonexistent-file')
 
         with self.assertRaises(exceptions.ConfigManagerException):
             config_manager.load()
+
+    def _create_volume(self, mount_point, source_path, to_path='to1'):
+        volume_config = VolumeConfig(source_path, mount_point)
+        volume_config.transformations = [TransformationConfig('from1', to_path)]
+
+        return volume_config
@@ -0,0 +1,84 @@
+import os
+import tempfile
+import unittest
+
+from filesystem.directory_handles import DirectoryHandles
+
+
+class DirectoryHandlesTest(unittest.TestCase):
+
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        os.makedirs(os.path.join(self._directory.name, 'fruits', 'red'))
+        os.mkdir(os.path.join(self._directory.name, 'nuts'))
+
+    def tearDown(self):
+        self._directory.cleanup()
+
+    def test_resolve(self):
+        directory_handles = DirectoryHandles(self._directory.name)
+
+        with directory_handles.resolve('/') as (root_fd, root_name):
+            with directory_handles.resolve('/fruits/red/apple.md') as (dir_fd, name):
+                with directory_handles.resolve('/fruits/red/cherry.md') as (other_dir_fd, other_name):
+                    pass
+        directory_handles.close()
+
+        self.assertEqual('.', root_name)
+        self.assertNotEqual(root_fd, dir_fd)
+        self.assertEqual(('apple.md', 'cherry.md'), (name, other_name))
+        self.assertEqual(dir_fd, other_dir_fd)
+
+    def test_resolve_uncached(self):
+        directory_handles = DirectoryHandles(self._directory.name, 0)
+
+        with directory_handles.resolve('/') as (root_fd, _):
+            with directory_handles.resolve('/fruits/red/apple.md') as (dir_fd, name):
+                pass
+        directory_handles.close()
+
+        self.assertEqual(root_fd, dir_fd)
+        self.assertEqual(os.path.join('fruits', 'red', 'apple.md'), name)
+
+    def test_resolve_evicted_in_use(self):
+        # Arrange.
+        directory_handles = DirectoryHandles(self._directory.name, 1)
+
+        # Act.
+        with directory_handles.resolve('/fruits/red/apple.md') as (dir_fd, _):
+            with directory_handles.resolve('/nuts/peanut.md'):
+                is_open_while_used = self._is_open(dir_fd)
+        is_open_after_release = self._is_open(dir_fd)
+        directory_handles.close()
+
+        # Assert.
+        self.assertTrue(is_open_while_used)
+        self.assertFalse(is_open_after_release)
+
+    def test_resolve_expired(self):
+        # Arrange.
+        directory_handles = DirectoryHandles(self._directory.name, ttl=0)
+        fruits_directory = os.path.join(self._directory.name, 'fruits')
+        with directory_handles.resolve('/fruits/apple.md'):
+            pass
+
+        # Act.
+        os.rename(fruits_directory, os.path.join(self._directory.name, 'old_fruits'))
+        os.mkdir(fruits_directory)
+        with open(os.path.join(fruits_directory, 'apple.md'), 'w', encoding='utf-8'):
+            pass
+        with directory_handles.resolve('/fruits/apple.md') as (dir_fd, name):
+            stat = os.stat(name, dir_fd=dir_fd)
+        directory_handles.close()
+
+        # Assert.
+        self.assertEqual(0, stat.st_size)
+
+    @staticmethod
+    def _is_open(fd):
+        try:
+            os.fstat(fd)
+        except OSError:
+            return False
+
+        return True
@@ -1,7 +1,10 @@
 import unittest
 from unittest.mock import patch
 
+from domain.config import TransformationConfig
 from filesystem.transformation.directory_lister import DirectoryLister
+from filesystem.transformation.path_filter import PathFilter
+from filesystem.transformation.rule_matcher import RuleMatcher
 
 
 class DirectoryListerTest(unittest.TestCase):
@@ -17,3 +20,19 @@ class DirectoryListerTest(unittest.TestCase):
 
         mock_walk.assert_called_once_with(dirpath)
         self.assertEqual(sorted(expected_files), sorted(result))
+
+    @patch('os.walk')
+    def test_list_directory_pruned(self, mock_walk):
+        # Arrange.
+        dirpath = '/home/root/doc'
+        subdirectories = ['.git', 'fruits', 'vegetables']
+        mock_walk.return_value = [(dirpath, subdirectories, ['apple.txt', 'apple.txt.swp'])]
+        rule_matcher = RuleMatcher([TransformationConfig('/home/root/doc/fruits/(?P<name>[^/]+)$', '\\g<name>')])
+
+        # Act.
+        directory_lister = DirectoryLister(dirpath, PathFilter(dirpath, exclude=['.git', '*.swp']))
+        result = list(directory_lister.list_directory([rule_matcher]))
+
+        # Assert.
+        self.assertEqual(['fruits'], subdirectories)
+        self.assertEqual([dirpath + '/apple.txt'], result)
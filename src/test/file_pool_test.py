@@ -0,0 +1,119 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from filesystem.file_pool import FilePool
+
+
+class FilePoolTest(unittest.TestCase):
+
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self._paths = [os.path.join(self._directory.name, name) for name in ('apple.md', 'banana.md')]
+        for path in self._paths:
+            with open(path, 'w', encoding='utf-8') as source_file:
+                source_file.write(os.path.basename(path))
+
+    def tearDown(self):
+        self._directory.cleanup()
+
+    def test_open(self):
+        # Arrange.
+        file_pool = FilePool(10)
+
+        # Act.
+        fh = file_pool.open(self._paths[0], os.O_RDONLY)
+        file_pool.release(fh)
+        with patch('os.open') as open_mock:
+            reopened_fh = file_pool.open(self._paths[0], os.O_RDONLY)
+        data = os.pread(reopened_fh, 5, 0)
+        file_pool.release(reopened_fh)
+        file_pool.close()
+
+        # Assert.
+        self.assertEqual(fh, reopened_fh)
+        open_mock.assert_not_called()
+        self.assertEqual(b'apple', data)
+        self.assertFalse(self._is_open(fh))
+
+    def test_open_in_use(self):
+        # Arrange.
+        file_pool = FilePool(10)
+
+        # Act.
+        fh = file_pool.open(self._paths[0], os.O_RDONLY)
+        other_fh = file_pool.open(self._paths[0], os.O_RDONLY)
+        file_pool.release(other_fh)
+        is_other_open = self._is_open(other_fh)
+        file_pool.release(fh)
+        reopened_fh = file_pool.open(self._paths[0], os.O_RDONLY)
+        file_pool.release(reopened_fh)
+        file_pool.close()
+
+        # Assert.
+        self.assertNotEqual(fh, other_fh)
+        self.assertFalse(is_other_open)
+        self.assertEqual(fh, reopened_fh)
+
+    def test_open_writable(self):
+        file_pool = FilePool(10)
+
+        fh = file_pool.open(self._paths[0], os.O_RDWR)
+        other_fh = file_pool.open(self._paths[0], os.O_RDWR)
+        file_pool.release(fh)
+        file_pool.release(other_fh)
+
+        self.assertNotEqual(fh, other_fh)
+        self.assertFalse(self._is_open(fh))
+        self.assertFalse(self._is_open(other_fh))
+
+    def test_open_replaced(self):
+        # Arrange.
+        file_pool = FilePool(10, 0)
+        fh = file_pool.open(self._paths[0], os.O_RDONLY)
+        file_pool.release(fh)
+
+        # Act.
+        os.replace(self._paths[1], self._paths[0])
+        replaced_fh = file_pool.open(self._paths[0], os.O_RDONLY)
+        data = os.pread(replaced_fh, 6, 0)
+        file_pool.release(replaced_fh)
+        file_pool.close()
+
+        # Assert.
+        self.assertEqual(b'banana', data)
+
+    def test_open_evicted(self):
+        # Arrange.
+        file_pool = FilePool(1)
+
+        # Act.
+        fh = file_pool.open(self._paths[0], os.O_RDONLY)
+        unpooled_fh = file_pool.open(self._paths[1], os.O_RDONLY)
+        file_pool.release(unpooled_fh)
+        is_unpooled_open = self._is_open(unpooled_fh)
+        file_pool.release(fh)
+        other_fh = file_pool.open(self._paths[1], os.O_RDONLY)
+        is_evicted_open = self._is_open(fh) and fh != other_fh
+        file_pool.release(other_fh)
+        file_pool.close()
+
+        # Assert.
+        self.assertFalse(is_unpooled_open)
+        self.assertFalse(is_evicted_open)
+
+    def test_max_entries_limited(self):
+        with patch('resource.getrlimit', return_value=(64, 4096)):
+            file_pool = FilePool(1000)
+
+        self.assertEqual(32, file_pool._max_entries)  # pylint: disable=protected-access
+
+    @staticmethod
+    def _is_open(fd):
+        try:
+            os.fstat(fd)
+        except OSError:
+            return False
+
+        return True
@@ -0,0 +1,60 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from filesystem.file_syncer import DURABILITY_GROUP_COMMIT, DURABILITY_PASSTHROUGH, DURABILITY_STRICT, FileSyncer
+
+
+class FileSyncerTest(unittest.TestCase):
+
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self._fh = os.open(os.path.join(self._directory.name, 'apple.md'), os.O_WRONLY | os.O_CREAT, 0o644)
+
+    def tearDown(self):
+        os.close(self._fh)
+        self._directory.cleanup()
+
+    def test_flush_strict(self):
+        file_syncer = FileSyncer(DURABILITY_STRICT)
+
+        with patch('os.fsync') as fsync:
+            file_syncer.flush(self._fh)
+
+        fsync.assert_called_once_with(self._fh)
+
+    def test_flush_passthrough(self):
+        file_syncer = FileSyncer(DURABILITY_PASSTHROUGH)
+
+        with patch('os.fsync') as fsync:
+            file_syncer.flush(self._fh)
+            file_syncer.fsync(self._fh)
+
+        fsync.assert_called_once_with(self._fh)
+
+    def test_flush_group_commit(self):
+        # Arrange.
+        file_syncer = FileSyncer(DURABILITY_GROUP_COMMIT, 3600)
+
+        # Act.
+        with patch('os.fsync') as fsync:
+            file_syncer.flush(self._fh)
+            file_syncer.flush(self._fh)
+            file_syncer.release(self._fh)
+            fsync.assert_not_called()
+            file_syncer.stop()
+
+        # Assert.
+        self.assertEqual(1, fsync.call_count)
+        self.assertNotEqual(self._fh, fsync.call_args.args[0])
+
+    def test_fsync_group_commit(self):
+        file_syncer = FileSyncer(DURABILITY_GROUP_COMMIT, 3600)
+
+        with patch('os.fsync') as fsync:
+            file_syncer.flush(self._fh)
+            file_syncer.fsync(self._fh)
+            file_syncer.stop()
+
+        fsync.assert_called_once_with(self._fh)
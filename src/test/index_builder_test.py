@@ -0,0 +1,216 @@
+import errno
+import os
+import tempfile
+import threading
+import unittest
+from unittest.mock import MagicMock
+
+from fuse import FuseOSError
+
+from domain.config import TransformationConfig, VolumeConfig
+from filesystem.transformer_fs import TransformerFs
+from filesystem.transformation.directory_lister import DirectoryLister
+from filesystem.transformation.index_builder import IndexBuilder, build_indexes
+from filesystem.transformation.index_snapshot import IndexSnapshot
+from filesystem.transformation.path_filter import PathFilter
+from filesystem.transformation.transformer import Transformer
+
+
+class BlockingDirectoryLister:
+
+    def __init__(self, paths):
+        self.paths = paths
+        self.release = threading.Event()
+        self.source_directory = '/doc'
+        self.walked_directory_count = 1
+
+    def list_directory(self, rule_matchers=()):  # pylint: disable=unused-argument
+        yield self.paths[0]
+        self.release.wait(5)
+        yield from self.paths[1:]
+
+    def pop_stat(self, path):  # pylint: disable=unused-argument
+        return None
+
+
+class IndexBuilderTest(unittest.TestCase):
+
+    def test_build(self):
+        transformer = Transformer()
+        snapshot = MagicMock()
+        snapshot.load.return_value = False
+        directory_lister = MagicMock(list_directory=MagicMock(return_value=['/doc/a.md']))
+        directory_lister.get_directory_mtimes.return_value = {'/doc/': 1}
+        index_builder = IndexBuilder(transformer, [(directory_lister, self._transformations)], snapshot)
+
+        index_builder.build()
+
+        self.assertTrue(index_builder.is_ready)
+        self.assertEqual([('a.md', '/doc/a.md')], transformer.get_entries())
+        self.assertIs(True, directory_lister.is_recording_directory_mtimes)
+        snapshot.save.assert_called_once_with(transformer, {'/doc/': 1})
+
+    def test_rebuild_source_directories(self):
+        transformer = Transformer()
+        kept_directory_lister = MagicMock(source_directory='/doc', list_directory=MagicMock(return_value=[]))
+        removed_directory_lister = MagicMock(source_directory='/old', list_directory=MagicMock(return_value=[]))
+        added_directory_lister = MagicMock(source_directory='/new', list_directory=MagicMock(return_value=[]))
+        index_builder = IndexBuilder(
+            transformer,
+            [(kept_directory_lister, self._transformations), (removed_directory_lister, self._transformations)])
+        index_builder.build()
+
+        index_builder.rebuild(
+            [(added_directory_lister, self._transformations)],
+            [('/doc', transformer.compile_transformations(self._transformations))])
+
+        self.assertEqual(['/doc', '/new'], index_builder.source_directories)
+
+    def test_rebuild_snapshot(self):
+        # Arrange.
+        transformer = Transformer()
+        snapshot = MagicMock(path='/var/cache/routerfs/1.idx')
+        snapshot.load.return_value = False
+        kept_directory_lister = MagicMock(source_directory='/doc', list_directory=MagicMock(return_value=[]))
+        kept_directory_lister.get_directory_mtimes.return_value = {'/doc/': 1}
+        removed_directory_lister = MagicMock(source_directory='/old', list_directory=MagicMock(return_value=[]))
+        removed_directory_lister.get_directory_mtimes.return_value = {'/old/': 2}
+        added_directory_lister = MagicMock(source_directory='/new', list_directory=MagicMock(return_value=[]))
+        added_directory_lister.get_directory_mtimes.return_value = {'/new/': 3}
+        index_builder = IndexBuilder(
+            transformer,
+            [(kept_directory_lister, self._transformations), (removed_directory_lister, self._transformations)],
+            snapshot)
+        index_builder.build()
+        new_snapshot = MagicMock(path='/var/cache/routerfs/2.idx')
+
+        # Act.
+        index_builder.rebuild(
+            [(added_directory_lister, self._transformations)],
+            [('/doc', transformer.compile_transformations(self._transformations))],
+            new_snapshot)
+
+        # Assert.
+        new_snapshot.save.assert_called_once_with(transformer, {'/doc/': 1, '/new/': 3})
+        snapshot.delete.assert_called_once_with()
+        new_snapshot.delete.assert_not_called()
+
+    def test_build_reconciled(self):
+        # Arrange.
+        with tempfile.TemporaryDirectory() as directory:
+            source_directory = os.path.join(directory, 'doc')
+            os.mkdir(source_directory)
+            self._create_file(source_directory, 'a.md')
+            os.utime(source_directory, ns=(1000000000, 1000000000))
+            transformations = [TransformationConfig('.*/doc/(?P<name>.+)$', '\\g<name>')]
+            volume = VolumeConfig(source_directory, '/mnt/doc')
+            volume.transformations = transformations
+            IndexBuilder(
+                Transformer(),
+                [(DirectoryLister(source_directory), transformations)],
+                IndexSnapshot(directory, [volume])).build()
+            self._create_file(source_directory, 'b.md')
+            transformer = Transformer()
+            directory_lister = MagicMock(source_directory=source_directory, path_filter=PathFilter(source_directory))
+
+            # Act.
+            IndexBuilder(transformer, [(directory_lister, transformations)], IndexSnapshot(directory, [volume])).build()
+
+        # Assert.
+        directory_lister.list_directory.assert_not_called()
+        self.assertEqual(['a.md', 'b.md'], sorted(target for target, _ in transformer.get_entries()))
+
+    def test_build_callback(self):
+        callback = MagicMock()
+        index_builder = IndexBuilder(Transformer(), [])
+        index_builder.add_callback(callback)
+
+        index_builder.build()
+        index_builder.rebuild([])
+
+        self.assertEqual(2, callback.call_count)
+        callback.assert_called_with(index_builder)
+
+    def test_build_indexes_shared_source(self):
+        # Arrange.
+        directory_lister = MagicMock(list_directory=MagicMock(return_value=['/doc/a.md', '/doc/b.txt']))
+        directory_lister.pop_stat.return_value = None
+        transformations = [TransformationConfig('/doc/(?P<name>.+)\\.txt$', '\\g<name>')]
+        transformer1 = Transformer()
+        transformer2 = Transformer()
+        index_builders = [
+            IndexBuilder(transformer1, [(directory_lister, self._transformations)]),
+            IndexBuilder(transformer2, [(directory_lister, transformations)])]
+
+        # Act.
+        build_indexes(index_builders)
+
+        # Assert.
+        directory_lister.list_directory.assert_called_once()
+        self.assertEqual(2, len(directory_lister.list_directory.call_args[0][0]))
+        self.assertEqual([('a.md', '/doc/a.md'), ('b.txt', '/doc/b.txt')], transformer1.get_entries())
+        self.assertEqual([('b', '/doc/b.txt')], transformer2.get_entries())
+        self.assertTrue(all(index_builder.is_ready for index_builder in index_builders))
+
+    def test_start_partial(self):
+        # Arrange.
+        transformer = Transformer()
+        directory_lister = BlockingDirectoryLister(['/doc/a.md', '/doc/b.md'])
+        index_builder = IndexBuilder(transformer, [(directory_lister, self._transformations)], wait_timeout=0)
+        transformer_fs = TransformerFs(transformer, index_builder)
+
+        # Act.
+        transformer_fs.init('/')
+        partial_entries = self._wait_for_entries(transformer_fs, 3)
+        progress = index_builder.get_progress()
+        with self.assertRaises(FuseOSError) as context:
+            transformer_fs.getattr('/b.md')
+        directory_lister.release.set()
+        is_ready = index_builder.wait() or self._wait_for_ready(index_builder)
+
+        # Assert.
+        self.assertEqual(['.', '..', 'a.md'], partial_entries)
+        self.assertEqual({'ready': 0, 'walked_directories': 1, 'listed_files': 1}, progress)
+        self.assertEqual(errno.ENOENT, context.exception.errno)
+        self.assertTrue(is_ready)
+        self.assertEqual(['.', '..', 'a.md', 'b.md'], [entry[0] for entry in transformer_fs.readdir('/', None)])
+
+    def test_start_blocking(self):
+        transformer = Transformer()
+        directory_lister = BlockingDirectoryLister(['/doc/a.md', '/doc/b.md'])
+        index_builder = IndexBuilder(transformer, [(directory_lister, self._transformations)], wait_timeout=5)
+        transformer_fs = TransformerFs(transformer, index_builder)
+
+        transformer_fs.init('/')
+        threading.Timer(0.05, directory_lister.release.set).start()
+
+        with self.assertRaises(FileNotFoundError):
+            # The index contains the file after waiting, but it does not exist on the disk.
+            transformer_fs.getattr('/b.md')
+        self.assertTrue(index_builder.is_ready)
+
+    @staticmethod
+    def _create_file(directory, name):
+        with open(os.path.join(directory, name), 'w', encoding='utf-8') as source_file:
+            source_file.write(name)
+
+    @property
+    def _transformations(self):
+        return [TransformationConfig('/doc/(?P<name>.+)$', '\\g<name>')]
+
+    def _wait_for_entries(self, transformer_fs, count):
+        for _ in range(500):
+            entries = [entry[0] for entry in transformer_fs.readdir('/', None)]
+            if len(entries) >= count:
+                return entries
+            threading.Event().wait(0.01)
+
+        return []
+
+    def _wait_for_ready(self, index_builder):
+        for _ in range(500):
+            if index_builder.is_ready:
+                return True
+            threading.Event().wait(0.01)
+
+        return False
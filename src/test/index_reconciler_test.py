@@ -0,0 +1,85 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from domain.config import TransformationConfig
+from filesystem.transformation.index_reconciler import IndexReconciler
+from filesystem.transformation.path_filter import PathFilter
+from filesystem.transformation.transformer import Transformer
+
+
+class IndexReconcilerTest(unittest.TestCase):
+
+    _mtime = 1000000000
+
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self._source = os.path.join(self._directory.name, 'doc')
+        for path in ('fruits/apple.md', 'fruits/banana.md', 'nuts/peanut.md', 'old/pie.md'):
+            self._create_file(path)
+        self._directory_mtimes = {}
+        for directory in ('', 'fruits', 'nuts', 'old'):
+            path = os.path.join(self._source, directory, '')
+            os.utime(path, ns=(self._mtime, self._mtime))
+            self._directory_mtimes[path] = self._mtime
+
+    def tearDown(self):
+        self._directory.cleanup()
+
+    def test_reconcile(self):
+        # Arrange.
+        transformer = Transformer()
+        rule_matcher = transformer.add_transformations([TransformationConfig('.*/doc/.+/(?P<name>.+)$', '\\g<name>')])
+        for directory in ('fruits', 'nuts', 'old'):
+            for filename in os.listdir(os.path.join(self._source, directory)):
+                transformer.add_listed_path(os.path.join(self._source, directory, filename), None, rule_matcher)
+        self._create_file('fruits/cherry.md')
+        self._create_file('new/walnut.md')
+        shutil.rmtree(os.path.join(self._source, 'old'))
+
+        # Act.
+        reconciler = IndexReconciler(transformer, self._directory_mtimes)
+        directory_mtimes, listed_count = reconciler.reconcile([(self._source, rule_matcher, PathFilter(self._source))])
+
+        # Assert.
+        self.assertEqual(
+            ['apple.md', 'banana.md', 'cherry.md', 'peanut.md', 'walnut.md'],
+            sorted(target for target, _ in transformer.get_entries()))
+        self.assertEqual(3, listed_count)
+        self.assertEqual(self._mtime, directory_mtimes[os.path.join(self._source, 'nuts', '')])
+        self.assertNotIn(os.path.join(self._source, 'old', ''), directory_mtimes)
+
+    def test_reconcile_unchanged(self):
+        transformer = Transformer()
+        transformer.add_entries([('apple.md', os.path.join(self._source, 'fruits', 'apple.md'))])
+        rule_matcher = transformer.add_transformations([TransformationConfig('.*/doc/.+/(?P<name>.+)$', '\\g<name>')])
+
+        reconciler = IndexReconciler(transformer, self._directory_mtimes)
+        directory_mtimes, listed_count = reconciler.reconcile([(self._source, rule_matcher, PathFilter(self._source))])
+
+        self.assertEqual([('apple.md', os.path.join(self._source, 'fruits', 'apple.md'))], transformer.get_entries())
+        self.assertEqual(0, listed_count)
+        self.assertEqual(self._directory_mtimes, directory_mtimes)
+
+    def test_reconcile_excluded(self):
+        # Arrange.
+        transformer = Transformer()
+        rule_matcher = transformer.add_transformations([TransformationConfig('.*/doc/.+/(?P<name>.+)$', '\\g<name>')])
+        self._create_file('node_modules/walnut.md')
+        self._create_file('fruits/cherry.txt')
+
+        # Act.
+        reconciler = IndexReconciler(transformer, self._directory_mtimes)
+        directory_mtimes, _ = reconciler.reconcile(
+            [(self._source, rule_matcher, PathFilter(self._source, exclude=['node_modules', '*.txt']))])
+
+        # Assert.
+        self.assertEqual(['apple.md', 'banana.md'], sorted(target for target, _ in transformer.get_entries()))
+        self.assertNotIn(os.path.join(self._source, 'node_modules', ''), directory_mtimes)
+
+    def _create_file(self, path):
+        full_path = os.path.join(self._source, path)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        with open(full_path, 'w', encoding='utf-8') as source_file:
+            source_file.write(path)
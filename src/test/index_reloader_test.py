@@ -0,0 +1,184 @@
+import os
+import tempfile
+import time
+import unittest
+from multiprocessing import Pipe
+from unittest.mock import MagicMock
+
+from domain.config import TransformationConfig, VolumeConfig
+from filesystem.transformation.directory_lister import DirectoryLister
+from filesystem.transformation.index_builder import IndexBuilder
+from filesystem.transformation.source_watcher import SourceWatcher
+from filesystem.transformation.transformer import Transformer
+from shell.index_reloader import IndexReloader
+
+
+# Creates a file in the source directory once it has been listed, while the index is being built.
+class CreatingDirectoryLister(DirectoryLister):
+
+    def __init__(self, source_directory, created_path):
+        super().__init__(source_directory)
+        self.created_path = created_path
+
+    def list_directory(self, rule_matchers=()):
+        yield from super().list_directory(rule_matchers)
+        with open(self.created_path, 'w', encoding='utf-8'):
+            pass
+        # The event is received by the watcher before the build completes.
+        time.sleep(0.1)
+
+
+class IndexReloaderTest(unittest.TestCase):
+
+    _files = {
+        '/doc': ['/doc/a.md', '/doc/b.txt'],
+        '/notes': ['/notes/c.md']
+    }
+
+    def test_reload_changed_volume(self):
+        # Arrange.
+        proxy_factory = self._create_proxy_factory()
+        volumes = [self._create_volume('/doc', 'doc'), self._create_volume('/notes', 'notes')]
+        transformer, index_builder = self._build_index(proxy_factory, volumes)
+        index_reloader = IndexReloader(proxy_factory, transformer, index_builder, volumes)
+
+        # Act.
+        index_reloader.reload([self._create_volume('/doc', 'doc'), self._create_volume('/notes', 'texts')])
+
+        # Assert.
+        self.assertEqual(
+            [('doc/a.md', '/doc/a.md'), ('texts/c.md', '/notes/c.md')],
+            sorted(transformer.get_entries()))
+        listed_directories = [call.args[0].source_path for call in proxy_factory.create_directory_lister.mock_calls]
+        self.assertEqual(['/notes'], listed_directories)
+
+    def test_reload_respelled_volume(self):
+        # Arrange.
+        proxy_factory = self._create_proxy_factory()
+        volumes = [self._create_volume('/doc', 'doc'), self._create_volume('/notes', 'notes')]
+        transformer, index_builder = self._build_index(proxy_factory, volumes)
+        index_reloader = IndexReloader(proxy_factory, transformer, index_builder, volumes)
+
+        # Act.
+        index_reloader.reload([self._create_volume('/doc/', 'doc'), self._create_volume('/notes', 'texts')])
+
+        # Assert.
+        self.assertEqual(
+            [('doc/a.md', '/doc/a.md'), ('texts/c.md', '/notes/c.md')],
+            sorted(transformer.get_entries()))
+        listed_directories = [call.args[0].source_path for call in proxy_factory.create_directory_lister.mock_calls]
+        self.assertEqual(['/notes'], listed_directories)
+
+    def test_reload_added_volume(self):
+        proxy_factory = self._create_proxy_factory()
+        volumes = [self._create_volume('/doc', 'doc')]
+        transformer, index_builder = self._build_index(proxy_factory, volumes)
+        index_reloader = IndexReloader(proxy_factory, transformer, index_builder, volumes)
+
+        index_reloader.reload(volumes + [self._create_volume('/notes', 'notes')])
+
+        self.assertEqual(
+            [('doc/a.md', '/doc/a.md'), ('notes/c.md', '/notes/c.md')],
+            sorted(transformer.get_entries()))
+
+    def test_reload_watchers(self):
+        # Arrange.
+        proxy_factory = self._create_proxy_factory()
+        volumes = [self._create_volume('/doc', 'doc', True), self._create_volume('/notes', 'notes', True)]
+        kept_watcher = MagicMock()
+        removed_watcher = MagicMock()
+        added_watcher = MagicMock()
+        proxy_factory.create_watcher.side_effect = [kept_watcher, removed_watcher, added_watcher]
+        transformer, index_builder = self._build_index(proxy_factory, volumes)
+        index_reloader = IndexReloader(proxy_factory, transformer, index_builder, volumes)
+        index_reloader.start()
+
+        # Act.
+        index_reloader.reload([self._create_volume('/doc', 'doc', True), self._create_volume('/notes', 'texts', True)])
+        index_reloader.stop()
+
+        # Assert.
+        kept_watcher.start.assert_called_once_with(False)
+        kept_watcher.stop.assert_called_once_with()
+        removed_watcher.stop.assert_called_once_with()
+        added_watcher.start.assert_called_once_with(False)
+        added_watcher.stop.assert_called_once_with()
+
+    def test_start_before_build(self):
+        # Arrange.
+        with tempfile.TemporaryDirectory() as directory:
+            volume = self._create_volume(directory, 'doc', True)
+            transformer = Transformer()
+            proxy_factory = MagicMock()
+            proxy_factory.create_watcher.side_effect = lambda volume, transformer: SourceWatcher(
+                transformer, volume.source_path, volume.transformations)
+            directory_lister = CreatingDirectoryLister(directory, os.path.join(directory, 'b.md'))
+            index_builder = IndexBuilder(transformer, [(directory_lister, volume.transformations)])
+            index_reloader = IndexReloader(proxy_factory, transformer, index_builder, [volume])
+            with open(os.path.join(directory, 'a.md'), 'w', encoding='utf-8'):
+                pass
+
+            # Act.
+            index_reloader.start()
+            index_builder.build()
+            expected_entries = [
+                ('doc/a.md', os.path.join(directory, 'a.md')),
+                ('doc/b.md', directory_lister.created_path)
+            ]
+            entries = self._wait_for_entries(transformer, expected_entries)
+            index_reloader.stop()
+
+        # Assert.
+        self.assertEqual(['doc/a.md', 'doc/b.md'], [target for target, _ in entries])
+
+    def test_reload_through_connection(self):
+        # Arrange.
+        proxy_factory = self._create_proxy_factory()
+        volumes = [self._create_volume('/doc', 'doc')]
+        transformer, index_builder = self._build_index(proxy_factory, volumes)
+        receiver, sender = Pipe(duplex=False)
+        index_reloader = IndexReloader(proxy_factory, transformer, index_builder, volumes, receiver)
+
+        # Act.
+        index_reloader.start()
+        sender.send([self._create_volume('/doc', 'documents')])
+        entries = self._wait_for_entries(transformer, [('documents/a.md', '/doc/a.md')])
+        index_reloader.stop()
+
+        # Assert.
+        self.assertEqual([('documents/a.md', '/doc/a.md')], entries)
+
+    def _build_index(self, proxy_factory, volumes):
+        transformer = Transformer()
+        sources = [(proxy_factory.create_directory_lister(volume), volume.transformations) for volume in volumes]
+        index_builder = IndexBuilder(transformer, sources)
+        index_builder.build()
+        proxy_factory.create_directory_lister.reset_mock()
+
+        return transformer, index_builder
+
+    def _create_proxy_factory(self):
+        proxy_factory = MagicMock()
+        proxy_factory.create_directory_lister.side_effect = lambda volume: MagicMock(
+            list_directory=MagicMock(return_value=self._files[volume.source_path]))
+        proxy_factory.create_snapshot.return_value = None
+
+        return proxy_factory
+
+    @staticmethod
+    def _create_volume(source_path, target_directory, watch=False):
+        volume = VolumeConfig(source_path, '/mnt/volume')
+        volume.index.watch = watch
+        volume.transformations = [TransformationConfig('.*/(?P<name>[^/]+\\.md)$', target_directory + '/\\g<name>')]
+
+        return volume
+
+    @staticmethod
+    def _wait_for_entries(transformer, expected_entries):
+        for _ in range(100):
+            entries = transformer.get_entries()
+            if entries == expected_entries:
+                break
+            time.sleep(0.05)
+
+        return entries
@@ -0,0 +1,81 @@
+import os
+import tempfile
+import unittest
+
+from domain.config import TransformationConfig, VolumeConfig
+from filesystem.transformation.index_snapshot import IndexSnapshot
+from filesystem.transformation.transformer import Transformer
+
+
+class IndexSnapshotTest(unittest.TestCase):
+
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+
+    def tearDown(self):
+        self._directory.cleanup()
+
+    def test_save_and_load(self):
+        # Arrange.
+        volumes = [self._create_volume('to')]
+        transformer = Transformer()
+        transformer.add_entries([
+            ('cyclopaedia/food [fruits]/apple.md', '/doc/food/fruits/content/apple.md'),
+            ('cyclopaedia/food [vegetables]/aubergine.txt', '/doc/food/vegetables/content/aubergine.txt')])
+
+        # Act.
+        IndexSnapshot(self._directory.name, volumes).save(transformer, {'/doc/': 1, '/doc/food/': 2})
+        loaded_transformer = Transformer()
+        directory_mtimes = {}
+        is_loaded = IndexSnapshot(self._directory.name, volumes).load(loaded_transformer, directory_mtimes)
+
+        # Assert.
+        self.assertTrue(is_loaded)
+        self.assertEqual({'/doc/': 1, '/doc/food/': 2}, directory_mtimes)
+        self.assertEqual(
+            ['food [fruits]', 'food [vegetables]'],
+            sorted(loaded_transformer.get_directory_contents('/cyclopaedia')))
+        self.assertEqual(
+            '/doc/food/fruits/content/apple.md',
+            loaded_transformer.get_source_path('/cyclopaedia/food [fruits]/apple.md'))
+
+    def test_load_different_rules(self):
+        transformer = Transformer()
+        transformer.add_entries([('a.md', '/doc/a.md')])
+        IndexSnapshot(self._directory.name, [self._create_volume('to1')]).save(transformer)
+
+        is_loaded = IndexSnapshot(self._directory.name, [self._create_volume('to2')]).load(Transformer())
+
+        self.assertFalse(is_loaded)
+
+    def test_load_corrupt(self):
+        volumes = [self._create_volume('to')]
+        snapshot = IndexSnapshot(self._directory.name, volumes)
+        with open(snapshot.path, 'wb') as snapshot_file:
+            snapshot_file.write(b'RFSI')
+
+        transformer = Transformer()
+        is_loaded = snapshot.load(transformer)
+
+        self.assertFalse(is_loaded)
+        self.assertEqual([], list(transformer.get_entries()))
+
+    def test_delete(self):
+        snapshot = IndexSnapshot(self._directory.name, [self._create_volume('to')])
+        snapshot.save(Transformer())
+
+        snapshot.delete()
+        snapshot.delete()
+
+        self.assertFalse(os.path.exists(snapshot.path))
+
+    def test_load_nonexistent(self):
+        snapshot = IndexSnapshot(os.path.join(self._directory.name, 'nonexistent'), [self._create_volume('to')])
+
+        self.assertFalse(snapshot.load(Transformer()))
+
+    def _create_volume(self, to_path):
+        volume = VolumeConfig('/doc', '/mnt/doc')
+        volume.transformations = [TransformationConfig('from', to_path)]
+
+        return volume
@@ -0,0 +1,64 @@
+import errno
+import json
+import unittest
+
+from util.metrics import Metrics
+
+
+class SampleFs:
+
+    def read(self, path, size, offset, fh):  # pylint: disable=unused-argument
+        return b'x' * size
+
+    def readdir(self, path, fh):  # pylint: disable=unused-argument
+        yield '.'
+        yield '..'
+
+    def unlink(self, path):
+        raise OSError(errno.ENOENT, path)
+
+
+class MetricsTest(unittest.TestCase):
+
+    def test_install(self):
+        # Arrange.
+        sample_fs = SampleFs()
+        metrics = Metrics()
+
+        # Act.
+        metrics.install(sample_fs)
+        sample_fs.read('/a', 10, 0, 3)
+        sample_fs.read('/a', 5, 10, 3)
+        list(sample_fs.readdir('/', 0))
+        with self.assertRaises(OSError):
+            sample_fs.unlink('/a')
+        result = metrics.to_dict()
+
+        # Assert.
+        self.assertEqual(2, result['operations']['read']['calls'])
+        self.assertEqual(15, result['operations']['read']['bytes'])
+        self.assertEqual(2, sum(result['operations']['read']['latency_buckets'].values()))
+        self.assertEqual(1, result['operations']['readdir']['calls'])
+        self.assertEqual({'ENOENT': 1}, result['operations']['unlink']['errors'])
+
+    def test_record_phase(self):
+        metrics = Metrics()
+
+        metrics.record_phase('walk', 1.5)
+        metrics.record_phase('walk', 0.5)
+
+        self.assertEqual({'walk': 2.0}, json.loads(metrics.to_json())['index']['build_seconds'])
+
+    def test_to_prometheus(self):
+        metrics = Metrics()
+
+        metrics.record('read', 0.002, size=4)
+        metrics.record('read', 0.2, errno.EIO)
+        lines = metrics.to_prometheus().splitlines()
+
+        self.assertIn('routerfs_operation_calls_total{operation="read"} 2', lines)
+        self.assertIn('routerfs_operation_errors_total{operation="read",errno="EIO"} 1', lines)
+        self.assertIn('routerfs_operation_bytes_total{operation="read"} 4', lines)
+        self.assertIn('routerfs_operation_latency_seconds_bucket{operation="read",le="0.005"} 1', lines)
+        self.assertIn('routerfs_operation_latency_seconds_bucket{operation="read",le="+Inf"} 2', lines)
+        self.assertIn('routerfs_operation_latency_seconds_count{operation="read"} 2', lines)
@@ -0,0 +1,90 @@
+import os
+import stat
+import tempfile
+import unittest
+
+from fuse import FuseOSError
+
+from filesystem.mirror_fs import MirrorFs
+from filesystem.negative_cache import NegativeCache
+
+
+class MirrorFsTest(unittest.TestCase):
+
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        os.mkdir(os.path.join(self._directory.name, 'fruits'))
+        with open(os.path.join(self._directory.name, 'fruits', 'apple.md'), 'w', encoding='utf-8') as source_file:
+            source_file.write('apple')
+        os.symlink('apple.md', os.path.join(self._directory.name, 'fruits', 'pie.md'))
+
+        self._mirror_fs = MirrorFs(self._directory.name, negative_cache=NegativeCache(10, 60))
+
+    def tearDown(self):
+        self._directory.cleanup()
+
+    def test_readdir(self):
+        root_entries = list(self._mirror_fs.readdir('/', None))
+        entries = sorted(self._mirror_fs.readdir('/fruits', None))
+
+        self.assertEqual(['.', '..', 'fruits'], [entry[0] for entry in root_entries])
+        self.assertEqual(stat.S_IFDIR, root_entries[2][1]['st_mode'])
+        self.assertEqual(['.', '..', 'apple.md', 'pie.md'], [entry[0] for entry in entries])
+        self.assertEqual(stat.S_IFREG, entries[2][1]['st_mode'])
+        self.assertEqual(stat.S_IFLNK, entries[3][1]['st_mode'])
+
+    def test_readdir_nonexistent(self):
+        self.assertEqual(['.', '..'], [entry[0] for entry in self._mirror_fs.readdir('/nuts', None)])
+
+    def test_getattr_nonexistent_cached(self):
+        # Arrange.
+        with self.assertRaises(FileNotFoundError):
+            self._mirror_fs.getattr('/fruits/cherry.md')
+        with open(os.path.join(self._directory.name, 'fruits', 'cherry.md'), 'w', encoding='utf-8') as source_file:
+            source_file.write('cherry')
+
+        # Act.
+        with self.assertRaises(FuseOSError):
+            self._mirror_fs.getattr('/fruits/cherry.md')
+        os.close(self._mirror_fs.create('/fruits/cherry.md', 0o644))
+        result = self._mirror_fs.getattr('/fruits/cherry.md')
+
+        # Assert.
+        self.assertEqual(6, result['st_size'])
+
+    def test_source_renamed(self):
+        # Arrange.
+        self._mirror_fs.getattr('/fruits/apple.md')
+        renamed_directory = self._directory.name + '.renamed'
+
+        # Act.
+        os.rename(self._directory.name, renamed_directory)
+        try:
+            fh = self._mirror_fs.open('/fruits/apple.md', os.O_RDONLY)
+            data = self._mirror_fs.read('/fruits/apple.md', 5, 0, fh)
+            self._mirror_fs.release('/fruits/apple.md', fh)
+        finally:
+            os.rename(renamed_directory, self._directory.name)
+
+        # Assert.
+        self.assertEqual(b'apple', data)
+
+    def test_rename_directory(self):
+        self._mirror_fs.getattr('/fruits/apple.md')
+
+        self._mirror_fs.rename('/fruits', '/vegetables')
+        os.mkdir(os.path.join(self._directory.name, 'fruits'))
+
+        with self.assertRaises(FileNotFoundError):
+            self._mirror_fs.getattr('/fruits/apple.md')
+        self.assertEqual(5, self._mirror_fs.getattr('/vegetables/apple.md')['st_size'])
+
+    def test_link(self):
+        self._mirror_fs.link('/fruits/pear.md', '/fruits/apple.md')
+
+        self.assertEqual(2, self._mirror_fs.getattr('/fruits/pear.md')['st_nlink'])
+
+    def test_truncate(self):
+        self._mirror_fs.truncate('/fruits/apple.md', 2)
+
+        self.assertEqual(2, self._mirror_fs.getattr('/fruits/apple.md')['st_size'])
@@ -0,0 +1,81 @@
+import os
+import tempfile
+import unittest
+
+from filesystem.mmap_pool import MmapPool
+
+
+class MmapPoolTest(unittest.TestCase):
+
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self._path = os.path.join(self._directory.name, 'apple.md')
+        with open(self._path, 'wb') as source_file:
+            source_file.write(b'apple pie' * 100)
+
+    def tearDown(self):
+        self._directory.cleanup()
+
+    def test_read_into(self):
+        # Arrange.
+        mmap_pool = MmapPool(100)
+        fh = os.open(self._path, os.O_RDONLY)
+        buffer = bytearray(9)
+
+        # Act.
+        mmap_pool.acquire(fh, os.O_RDONLY)
+        size = mmap_pool.read_into(fh, memoryview(buffer), 9)
+        size_outside = mmap_pool.read_into(fh, memoryview(buffer), 895)
+        mmap_pool.release(fh)
+        size_released = mmap_pool.read_into(fh, memoryview(buffer), 9)
+        os.close(fh)
+
+        # Assert.
+        self.assertEqual(9, size)
+        self.assertEqual(b'apple pie', buffer)
+        self.assertIsNone(size_outside)
+        self.assertIsNone(size_released)
+
+    def test_acquire_shared(self):
+        mmap_pool = MmapPool(100)
+        handles = [os.open(self._path, os.O_RDONLY) for _ in range(2)]
+
+        for fh in handles:
+            mmap_pool.acquire(fh, os.O_RDONLY)
+        mapping_count = len(mmap_pool._mappings)  # pylint: disable=protected-access
+        mmap_pool.release(handles[0])
+        size = mmap_pool.read_into(handles[1], memoryview(bytearray(5)), 0)
+        mmap_pool.release(handles[1])
+        for fh in handles:
+            os.close(fh)
+
+        self.assertEqual(1, mapping_count)
+        self.assertEqual(5, size)
+        self.assertEqual({}, mmap_pool._mappings)  # pylint: disable=protected-access
+
+    def test_acquire_same_handle(self):
+        mmap_pool = MmapPool(100)
+        fh = os.open(self._path, os.O_RDONLY)
+
+        mmap_pool.acquire(fh, os.O_RDONLY)
+        mmap_pool.acquire(fh, os.O_RDONLY)
+        mmap_pool.release(fh)
+        size = mmap_pool.read_into(fh, memoryview(bytearray(5)), 0)
+        mmap_pool.release(fh)
+        os.close(fh)
+
+        self.assertEqual(5, size)
+        self.assertEqual({}, mmap_pool._mappings)  # pylint: disable=protected-access
+
+    def test_acquire_ignored(self):
+        mmap_pool = MmapPool(1000)
+        small_fh = os.open(self._path, os.O_RDONLY)
+        writable_fh = os.open(self._path, os.O_RDWR)
+
+        mmap_pool.acquire(small_fh, os.O_RDONLY)
+        MmapPool(100).acquire(writable_fh, os.O_RDWR)
+
+        self.assertIsNone(mmap_pool.read_into(small_fh, memoryview(bytearray(5)), 0))
+        self.assertIsNone(mmap_pool.read_into(writable_fh, memoryview(bytearray(5)), 0))
+        os.close(small_fh)
+        os.close(writable_fh)
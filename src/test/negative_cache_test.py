@@ -0,0 +1,60 @@
+import unittest
+from unittest.mock import patch
+
+from filesystem.negative_cache import NegativeCache
+
+
+class NegativeCacheTest(unittest.TestCase):
+
+    def test_contains(self):
+        negative_cache = NegativeCache(10)
+
+        negative_cache.add('/.git', 1)
+
+        self.assertTrue(negative_cache.contains('/.git', 1))
+        self.assertFalse(negative_cache.contains('/.hidden', 1))
+
+    def test_contains_other_generation(self):
+        negative_cache = NegativeCache(10)
+        negative_cache.add('/.git', 1)
+
+        result = negative_cache.contains('/.git', 2)
+
+        self.assertFalse(result)
+        self.assertEqual(0, len(negative_cache))
+
+    @patch('time.monotonic')
+    def test_contains_expired(self, mock_monotonic):
+        negative_cache = NegativeCache(10, 10)
+        mock_monotonic.return_value = 100
+        negative_cache.add('/desktop.ini')
+
+        mock_monotonic.return_value = 111
+        result = negative_cache.contains('/desktop.ini')
+
+        self.assertFalse(result)
+
+    def test_add_evicts_least_recently_used(self):
+        # Arrange.
+        negative_cache = NegativeCache(2)
+        negative_cache.add('/a')
+        negative_cache.add('/b')
+        negative_cache.contains('/a')
+
+        # Act.
+        negative_cache.add('/c')
+
+        # Assert.
+        self.assertTrue(negative_cache.contains('/a'))
+        self.assertFalse(negative_cache.contains('/b'))
+        self.assertTrue(negative_cache.contains('/c'))
+
+    def test_disabled(self):
+        negative_cache = NegativeCache(0)
+        expiring_negative_cache = NegativeCache(10, 0)
+
+        negative_cache.add('/a')
+        expiring_negative_cache.add('/a')
+
+        self.assertFalse(negative_cache.contains('/a'))
+        self.assertFalse(expiring_negative_cache.contains('/a'))
@@ -0,0 +1,51 @@
+import unittest
+from unittest.mock import MagicMock, patch
+
+from filesystem.open_files import OpenFiles
+
+
+class OpenFilesTest(unittest.TestCase):
+
+    def test_read_into_mapped(self):
+        mmap_pool = MagicMock()
+        mmap_pool.read_into.return_value = 3
+        readahead = MagicMock()
+        open_files = OpenFiles(mmap_pool, readahead, MagicMock())
+
+        with patch('os.preadv') as preadv:
+            size = open_files.read_into(3, bytearray(3), 0)
+
+        self.assertEqual(3, size)
+        preadv.assert_not_called()
+        readahead.on_read.assert_not_called()
+
+    def test_read_into_unmapped(self):
+        # Arrange.
+        mmap_pool = MagicMock()
+        mmap_pool.read_into.return_value = None
+        readahead = MagicMock()
+        open_files = OpenFiles(mmap_pool, readahead, MagicMock())
+        buffer = bytearray(5)
+
+        # Act.
+        with patch('os.preadv', return_value=5) as preadv:
+            size = open_files.read_into(3, buffer, 8)
+
+        # Assert.
+        self.assertEqual(5, size)
+        preadv.assert_called_once_with(3, [buffer], 8)
+        readahead.on_read.assert_called_once_with(3, 8, 5)
+
+    def test_release(self):
+        mmap_pool = MagicMock()
+        readahead = MagicMock()
+        file_syncer = MagicMock()
+        open_files = OpenFiles(mmap_pool, readahead, file_syncer)
+
+        with patch('os.close') as close:
+            open_files.release(3)
+
+        mmap_pool.release.assert_called_once_with(3)
+        readahead.release.assert_called_once_with(3)
+        file_syncer.release.assert_called_once_with(3)
+        close.assert_not_called()
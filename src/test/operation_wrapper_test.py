@@ -0,0 +1,57 @@
+import threading
+import time
+import unittest
+
+from util.operation_wrapper import get_operation_names, limit_concurrency, wrap_operations
+
+
+class SampleFs:
+
+    def __init__(self):
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def read(self, path):
+        with self._lock:
+            self.active = self.active + 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(0.01)
+        with self._lock:
+            self.active = self.active - 1
+
+        return path
+
+    def readdir(self, path):
+        yield path
+        yield '..'
+
+    def _helper(self):
+        pass
+
+
+class OperationWrapperTest(unittest.TestCase):
+
+    def test_get_operation_names(self):
+        self.assertEqual(['read', 'readdir'], get_operation_names(SampleFs()))
+
+    def test_wrap_operations(self):
+        sample_fs = SampleFs()
+
+        wrap_operations(sample_fs, lambda name, operation: lambda *args: (name, operation(*args)))
+
+        self.assertEqual(('read', '/a'), sample_fs.read('/a'))
+        self.assertEqual('/a', SampleFs.read(sample_fs, '/a'))
+
+    def test_limit_concurrency(self):
+        sample_fs = SampleFs()
+        limit_concurrency(sample_fs, 2)
+
+        threads = [threading.Thread(target=sample_fs.read, args=('/a',)) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(2, sample_fs.max_active)
+        self.assertEqual(['/', '..'], list(sample_fs.readdir('/')))
@@ -0,0 +1,37 @@
+import unittest
+
+from filesystem.transformation.path_filter import PathFilter
+
+
+class PathFilterTest(unittest.TestCase):
+
+    def test_is_directory_walked(self):
+        path_filter = PathFilter('/doc', exclude=['.git', 'build/cache'], max_depth=2)
+
+        self.assertTrue(path_filter.is_directory_walked('/doc/'))
+        self.assertTrue(path_filter.is_directory_walked('/doc/food/fruits/'))
+        self.assertFalse(path_filter.is_directory_walked('/doc/food/fruits/content/'))
+        self.assertFalse(path_filter.is_directory_walked('/doc/food/.git/'))
+        self.assertTrue(path_filter.is_directory_walked('/doc/build/'))
+        self.assertFalse(path_filter.is_directory_walked('/doc/build/cache/'))
+
+    def test_is_directory_walked_included(self):
+        path_filter = PathFilter('/doc', include=['food/*/content/*.md'])
+
+        self.assertTrue(path_filter.is_directory_walked('/doc/food/'))
+        self.assertTrue(path_filter.is_directory_walked('/doc/food/fruits/content/'))
+        self.assertFalse(path_filter.is_directory_walked('/doc/drinks/'))
+
+    def test_is_file_listed(self):
+        path_filter = PathFilter('/doc', include=['*.md', 'food/*.txt'], exclude=['draft-*'])
+
+        self.assertTrue(path_filter.is_file_listed('/doc/food/fruits/apple.md'))
+        self.assertTrue(path_filter.is_file_listed('/doc/food/fruits/banana.txt'))
+        self.assertFalse(path_filter.is_file_listed('/doc/drinks/tea.txt'))
+        self.assertFalse(path_filter.is_file_listed('/doc/food/draft-cherry.md'))
+
+    def test_is_file_listed_unfiltered(self):
+        path_filter = PathFilter('/doc/')
+
+        self.assertTrue(path_filter.is_directory_walked('/doc/food/'))
+        self.assertTrue(path_filter.is_file_listed('/doc/food/apple.md'))
@@ -0,0 +1,88 @@
+import unittest
+
+from filesystem.transformation.path_index import PathIndex
+
+
+class PathIndexTest(unittest.TestCase):
+
+    def test_add(self):
+        path_index = self._create_path_index()
+
+        self.assertEqual(3, len(path_index))
+        self.assertEqual(3, path_index.get_directory_count())
+        self.assertEqual('/doc/fruits/content/apple.md', path_index.get_source('food/fruits/apple.md'))
+        self.assertEqual('/doc/fruits/content/banana.odt', path_index.get_source('food/fruits/banana [draft].odt'))
+        self.assertIsNone(path_index.get_source('food/fruits'))
+        self.assertIsNone(path_index.get_source('food/nuts/walnut.md'))
+        self.assertTrue(path_index.is_directory('food/fruits'))
+        self.assertFalse(path_index.is_directory('food/fruits/apple.md'))
+
+    def test_add_existing(self):
+        path_index = self._create_path_index()
+
+        path_index.add('food/fruits/apple.md', '/doc/fruits/draft/apple.md')
+
+        self.assertEqual(3, len(path_index))
+        self.assertEqual('/doc/fruits/draft/apple.md', path_index.get_source('food/fruits/apple.md'))
+
+    def test_get_directory_contents(self):
+        path_index = self._create_path_index()
+
+        self.assertEqual(['food'], path_index.get_directory_contents(''))
+        self.assertEqual(['apple.md', 'banana [draft].odt'], path_index.get_directory_contents('food/fruits'))
+        self.assertEqual(['fruits', 'vegetables'], path_index.get_directory_contents('food/nuts'))
+
+    def test_get_entries(self):
+        path_index = self._create_path_index()
+        source_directories = path_index.get_source_directories('/doc/vegetables')
+
+        self.assertEqual(
+            [
+                ('food/fruits/apple.md', '/doc/fruits/content/apple.md'),
+                ('food/fruits/banana [draft].odt', '/doc/fruits/content/banana.odt'),
+                ('food/vegetables/aubergine.txt', '/doc/vegetables/content/aubergine.txt')
+            ],
+            sorted(path_index.get_entries()))
+        self.assertEqual(
+            [('food/vegetables/aubergine.txt', '/doc/vegetables/content/aubergine.txt')],
+            path_index.get_entries(source_directories))
+
+    def test_remove(self):
+        path_index = self._create_path_index()
+
+        path_index.remove('food/vegetables/aubergine.txt')
+        path_index.remove('food/fruits/apple.md')
+
+        self.assertEqual(1, len(path_index))
+        self.assertEqual(2, path_index.get_directory_count())
+        self.assertEqual(['fruits'], path_index.get_directory_contents('food'))
+        self.assertFalse(path_index.is_directory('food/vegetables'))
+
+    def test_remove_source_directories(self):
+        path_index = self._create_path_index()
+
+        path_index.remove('food/vegetables/aubergine.txt')
+        path_index.add('food/fruits/apple.md', '/doc/fruits/draft/apple.md')
+
+        self.assertEqual(
+            ['/doc/fruits/content/', '/doc/fruits/draft/'],
+            sorted(path_index.get_source_directories()))
+
+    def test_remove_unknown(self):
+        path_index = self._create_path_index()
+
+        path_index.remove('food/nuts/walnut.md')
+        path_index.remove('food/fruits/cherry.md')
+        path_index.remove('food/fruits')
+
+        self.assertEqual(3, len(path_index))
+        self.assertEqual(['apple.md', 'banana [draft].odt'], path_index.get_directory_contents('food/fruits'))
+
+    def _create_path_index(self):
+        path_index = PathIndex()
+
+        path_index.add('food/fruits/apple.md', '/doc/fruits/content/apple.md')
+        path_index.add('food/fruits/banana [draft].odt', '/doc/fruits/content/banana.odt')
+        path_index.add('food/vegetables/aubergine.txt', '/doc/vegetables/content/aubergine.txt')
+
+        return path_index
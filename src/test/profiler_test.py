@@ -0,0 +1,65 @@
+import os
+import tempfile
+import time
+import unittest
+
+from util.profiler import Profiler
+
+
+class SampleFs:
+
+    def read(self, path, size):  # pylint: disable=unused-argument
+        time.sleep(0.05)
+        return b'x' * size
+
+    def readdir(self, path):  # pylint: disable=unused-argument
+        yield '.'
+        yield '..'
+
+
+class ProfilerTest(unittest.TestCase):
+
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+
+    def tearDown(self):
+        self._directory.cleanup()
+
+    def test_start_and_stop(self):
+        # Arrange.
+        sample_fs = SampleFs()
+        profiler = Profiler(self._directory.name, 0.001)
+        profiler.install(sample_fs)
+
+        # Act.
+        profiler.start()
+        sample_fs.read('/a', 3)
+        self.assertEqual(['.', '..'], list(sample_fs.readdir('/')))
+        profiler.stop()
+
+        # Assert.
+        self.assertFalse(profiler.is_running)
+        self.assertNotIn('read', vars(sample_fs))
+        filenames = sorted(os.listdir(self._directory.name))
+        self.assertEqual(['.collapsed', '.txt'], [os.path.splitext(filename)[1] for filename in filenames])
+        with open(os.path.join(self._directory.name, filenames[0]), encoding='utf-8') as collapsed_file:
+            self.assertTrue(collapsed_file.readline().startswith('read;read (profiler_test.py:'))
+        with open(os.path.join(self._directory.name, filenames[1]), encoding='utf-8') as report_file:
+            report = report_file.read()
+        self.assertIn('read: 1 calls', report)
+        self.assertIn('readdir: 3 calls', report)
+
+    def test_toggle(self):
+        sample_fs = SampleFs()
+        wrapped_read = sample_fs.read
+        sample_fs.read = wrapped_read
+        profiler = Profiler(self._directory.name)
+        profiler.install(sample_fs)
+
+        profiler.toggle()
+        is_running = profiler.is_running
+        profiler.toggle()
+
+        self.assertTrue(is_running)
+        self.assertFalse(profiler.is_running)
+        self.assertIs(wrapped_read, vars(sample_fs)['read'])
@@ -1,9 +1,13 @@
+import os
+import tempfile
 import unittest
+from unittest.mock import patch
 
 from domain import exceptions
 from domain.config import TransformationConfig, VolumeConfig
 from filesystem.mirror_fs import MirrorFs
 from filesystem.transformer_fs import TransformerFs
+from filesystem.transformation.directory_lister import DirectoryLister
 from shell.proxy_factory import ProxyFactory
 
 
@@ -20,6 +24,22 @@ class ProxyFactoryTest(unittest.TestCase):
         self.assertEqual('/mnt/new_volume', proxies[0].mount_point)
         self.assertIsInstance(proxies[0].fuse_fs.__class__, type(MirrorFs))
 
+    def test_create_proxies_mirror_with_stats_directory(self):
+        # Arrange.
+        with tempfile.TemporaryDirectory() as directory:
+            os.mkdir(os.path.join(directory, '.routerfs'))
+            with open(os.path.join(directory, '.routerfs', 'notes.md'), 'w', encoding='utf-8'):
+                pass
+            volume = VolumeConfig(directory, '/mnt/new_volume')
+            volume.metrics.enabled = True
+
+            # Act.
+            proxies = ProxyFactory().create_proxies([volume])
+            entries = [entry[0] for entry in proxies[0].fuse_fs.readdir('/.routerfs', None)]
+
+        # Assert.
+        self.assertEqual(['.', '..', 'notes.md'], entries)
+
     def test_create_proxies_mirrors(self):
         # Arrange.
         volume1 = VolumeConfig('data', '/mnt/new_volume')
@@ -125,6 +145,43 @@ class ProxyFactoryTest(unittest.TestCase):
             proxies[1].fuse_fs.__class__,
             type(TransformerFs))
 
+    def test_create_proxies_transformers_shared_source(self):
+        # Arrange.
+        volume1 = VolumeConfig('data', '/var/doc')
+        volume1.transformations = [TransformationConfig('data/dir1/(?P<title>[^/]+).csv', '\\g<title>_1.csv')]
+        volume2 = VolumeConfig('./data/', '/var/doc')
+        volume2.transformations = [TransformationConfig('data/dir2/(?P<title>[^/]+).csv', '\\g<title>_2.csv')]
+        proxies = ProxyFactory().create_proxies([volume1, volume2])
+
+        # Act.
+        with patch.object(DirectoryLister, 'list_directory', autospec=True) as list_directory:
+            list_directory.return_value = ['data/dir1/a.csv', 'data/dir2/b.csv']
+            proxies[0].index_builder.build()
+        entries = [entry[0] for entry in proxies[0].fuse_fs.readdir('/', None)]
+
+        # Assert.
+        list_directory.assert_called_once()
+        self.assertEqual(['.', '..', 'a_1.csv', 'b_2.csv'], entries)
+
+    def test_create_directory_lister_shared(self):
+        volume1 = VolumeConfig('data', '/var/doc1')
+        volume2 = VolumeConfig('./data/', '/var/doc2')
+        volume3 = VolumeConfig('data2', '/var/doc2')
+
+        proxy_factory = ProxyFactory()
+
+        self.assertIs(proxy_factory.create_directory_lister(volume1), proxy_factory.create_directory_lister(volume2))
+        self.assertIsNot(proxy_factory.create_directory_lister(volume1), proxy_factory.create_directory_lister(volume3))
+
+    def test_create_directory_lister_filtered(self):
+        volume1 = VolumeConfig('data', '/var/doc1')
+        volume2 = VolumeConfig('data', '/var/doc2')
+        volume2.walker.exclude = ['.git']
+
+        proxy_factory = ProxyFactory()
+
+        self.assertIsNot(proxy_factory.create_directory_lister(volume1), proxy_factory.create_directory_lister(volume2))
+
     def test_create_proxies_transformers_same_mount_point(self):
         # Arrange.
         transformation1 = TransformationConfig(
@@ -150,3 +207,25 @@ class ProxyFactoryTest(unittest.TestCase):
         self.assertIsInstance(
             proxies[0].fuse_fs.__class__,
             type(TransformerFs))
+
+    def test_create_proxies_unknown_walker_engine(self):
+        transformation = TransformationConfig(
+            'dir/(?P<title>[^/]+).csv', '\\g<title>.csv')
+        volume = VolumeConfig('data', '/mnt/new_volume')
+        volume.transformations = [transformation]
+        volume.walker.engine = 'unknown'
+
+        proxy_factory = ProxyFactory()
+
+        with self.assertRaises(exceptions.InvalidConfigException):
+            proxy_factory.create_proxies([volume])
+
+    def test_create_proxies_invalid_max_depth(self):
+        volume = VolumeConfig('data', '/mnt/new_volume')
+        volume.transformations = [TransformationConfig('dir/(?P<title>[^/]+).csv', '\\g<title>.csv')]
+        volume.walker.max_depth = -1
+
+        proxy_factory = ProxyFactory()
+
+        with self.assertRaises(exceptions.InvalidConfigException):
+            proxy_factory.create_proxies([volume])
@@ -0,0 +1,55 @@
+import os
+import unittest
+from unittest.mock import call, patch
+
+from filesystem.readahead import Readahead
+
+
+class ReadaheadTest(unittest.TestCase):
+
+    def test_on_read_sequential(self):
+        # Arrange.
+        readahead = Readahead(4096, 1024)
+
+        # Act.
+        with patch('os.posix_fadvise') as posix_fadvise:
+            for offset in range(0, 4096, 512):
+                readahead.on_read(3, offset, 512)
+
+        # Assert.
+        self.assertEqual(
+            [
+                call(3, 0, 0, os.POSIX_FADV_SEQUENTIAL),
+                call(3, 512, 1024, os.POSIX_FADV_WILLNEED),
+                call(3, 1536, 1536, os.POSIX_FADV_WILLNEED),
+                call(3, 3072, 2560, os.POSIX_FADV_WILLNEED),
+                call(3, 5632, 2560, os.POSIX_FADV_WILLNEED)
+            ],
+            posix_fadvise.mock_calls)
+
+    def test_on_read_random(self):
+        readahead = Readahead(4096, 1024)
+
+        with patch('os.posix_fadvise') as posix_fadvise:
+            readahead.on_read(3, 8192, 512)
+            readahead.on_read(3, 1024, 512)
+
+        posix_fadvise.assert_called_once_with(3, 0, 0, os.POSIX_FADV_RANDOM)
+
+    def test_on_read_disabled(self):
+        readahead = Readahead(0)
+
+        with patch('os.posix_fadvise') as posix_fadvise:
+            readahead.on_read(3, 0, 512)
+
+        posix_fadvise.assert_not_called()
+
+    def test_release(self):
+        readahead = Readahead(4096, 1024)
+
+        with patch('os.posix_fadvise') as posix_fadvise:
+            readahead.on_read(3, 8192, 512)
+            readahead.release(3)
+            readahead.on_read(3, 8192, 512)
+
+        self.assertEqual(2, posix_fadvise.call_count)
@@ -0,0 +1,104 @@
+import re
+import unittest
+
+from domain.config import TransformationConfig
+from filesystem.transformation.rule_matcher import RuleMatcher
+
+
+class RuleMatcherTest(unittest.TestCase):
+
+    def test_transform_first_match_wins(self):
+        rule_matcher = RuleMatcher([
+            TransformationConfig('.*/content/(?P<filename>[^/]+)\\.md$', 'markdown/\\g<filename>.md'),
+            TransformationConfig('.*/(?P<filename>[^/]+)\\.(md|txt)$', 'text/\\g<filename>.\\2'),
+            TransformationConfig('.*/(?P<filename>[^/]+)$', 'other/\\g<filename>')])
+
+        self.assertEqual('markdown/apple.md', rule_matcher.transform('/doc/fruits/content/apple.md'))
+        self.assertEqual('text/cherry.md', rule_matcher.transform('/doc/fruits/draft/cherry.md'))
+        self.assertEqual('text/aubergine.txt', rule_matcher.transform('/doc/content/aubergine.txt'))
+        self.assertEqual('other/banana.odt', rule_matcher.transform('/doc/fruits/content/banana.odt'))
+        self.assertEqual('other/readme', rule_matcher.transform('/doc/readme'))
+
+    def test_transform_no_match(self):
+        rule_matcher = RuleMatcher([
+            TransformationConfig('/doc/(?P<title>[^/]+)/(?P<filename>[^/]+)\\.txt$', '\\g<title>/\\g<filename>.txt')])
+
+        self.assertIsNone(rule_matcher.transform('/doc/food/fruits/apple.txt'))
+        self.assertIsNone(rule_matcher.transform('/doc/food/apple.md'))
+        self.assertIsNone(rule_matcher.transform('/doc/food'))
+        self.assertEqual('food/apple.txt', rule_matcher.transform('/doc/food/apple.txt'))
+
+    def test_transform_same_as_regular_expressions(self):
+        patterns = [
+            '.*/(?P<title>[^/]+)/(?P<category>[^/]+)/content/(?P<filename>.+)\\.(?P<extension>md|odt|txt)$',
+            'dir/(?P<title>[^/]+).csv',
+            '(?i).*/IMAGES/(?P<filename>.+)\\.(jpg|png)$',
+            '/data/(a|b)/(?P<filename>[^/]+)\\.(mp3|md|m)\\Z',
+            '/data/x+/(?P<filename>\\w+)\\.[ch]$',
+            '.*\\.(tar\\.gz|zip)$']
+        paths = [
+            '/doc/food/fruits/content/apple.md',
+            '/doc/food/fruits/content/apple.MD',
+            '/doc/food/fruits/content/apple.md\n',
+            'dir/title.csv',
+            'dir/title.csv/more',
+            '/photos/images/sea.PNG',
+            '/photos/Images/sea.png',
+            '/data/a/song.mp3',
+            '/data/b/deep/song.mp3',
+            '/data/b/notes.md',
+            '/data/b/notes.m',
+            '/data/xxx/main.c',
+            '/data/xxx/main.h.c',
+            '/data/xxx/y/main.c',
+            '/backup/archive.tar.gz',
+            '/backup/archive.gz',
+            '/backup/archive.zip',
+            '',
+            '.']
+        transformations = [TransformationConfig(pattern, F'matched {i}') for i, pattern in enumerate(patterns)]
+
+        rule_matcher = RuleMatcher(transformations)
+
+        for path in paths:
+            self.assertEqual(self._transform_naively(transformations, path), rule_matcher.transform(path), path)
+
+    def test_can_match_below(self):
+        rule_matcher = RuleMatcher([
+            TransformationConfig('^/doc/(?P<title>[^/]+)/content/(?P<filename>[^/]+)\\.md$', '\\g<filename>.md'),
+            TransformationConfig('/data/[^/]+/.+\\.csv$', 'data.csv')])
+
+        self.assertTrue(rule_matcher.can_match_below('/'))
+        self.assertTrue(rule_matcher.can_match_below('/doc/'))
+        self.assertTrue(rule_matcher.can_match_below('/doc/food/content/'))
+        self.assertFalse(rule_matcher.can_match_below('/doc/food/content/old/'))
+        self.assertFalse(rule_matcher.can_match_below('/home/'))
+        self.assertTrue(rule_matcher.can_match_below('/data/2024/01/'))
+
+    def test_can_match_below_unanchored(self):
+        rule_matcher = RuleMatcher([TransformationConfig('.*/content/(?P<filename>[^/]+)$', '\\g<filename>')])
+
+        self.assertTrue(rule_matcher.can_match_below('/home/node_modules/'))
+
+    def test_get_statistics(self):
+        rule_matcher = RuleMatcher([
+            TransformationConfig('.*\\.md$', 'markdown'),
+            TransformationConfig('.*/content/.*', 'content')])
+
+        for path in ['/a.md', '/content/b.md', '/content/c.txt', '/d.txt']:
+            rule_matcher.transform(path)
+        statistics = rule_matcher.get_statistics()
+
+        self.assertEqual(('.*\\.md$', 2, 2), self._unpack(statistics[0]))
+        self.assertEqual(('.*/content/.*', 1, 1), self._unpack(statistics[1]))
+
+    def _transform_naively(self, transformations, path):
+        for transformation in transformations:
+            regexp = re.compile(transformation.from_path)
+            if regexp.match(path):
+                return regexp.sub(transformation.to_path, path)
+
+        return None
+
+    def _unpack(self, statistics):
+        return statistics.from_path, statistics.candidates, statistics.matches
@@ -0,0 +1,95 @@
+import os
+import tempfile
+import unittest
+
+from domain.config import TransformationConfig
+from filesystem.transformation.path_filter import PathFilter
+from filesystem.transformation.rule_matcher import RuleMatcher
+from filesystem.transformation.scandir_directory_lister import ScandirDirectoryLister
+
+
+class ScandirDirectoryListerTest(unittest.TestCase):
+
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self._root = self._directory.name
+        self._files = [
+            os.path.join(self._root, 'food', 'fruits', 'content', 'apple.md'),
+            os.path.join(self._root, 'food', 'fruits', 'content', 'banana.odt'),
+            os.path.join(self._root, 'food', 'fruits', 'draft', 'cherry.md'),
+            os.path.join(self._root, 'food', 'vegetables', 'content', 'aubergine.txt'),
+            os.path.join(self._root, 'readme.txt')]
+        for path in self._files:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'w', encoding='utf-8') as opened_file:
+                opened_file.write(path)
+
+    def tearDown(self):
+        self._directory.cleanup()
+
+    def test_list_directory(self):
+        directory_lister = ScandirDirectoryLister(self._root, threads=3)
+
+        result = list(directory_lister.list_directory())
+
+        self.assertEqual(sorted(self._files), sorted(result))
+        self.assertIsNone(directory_lister.pop_stat(self._files[0]))
+
+    def test_list_directory_pruned(self):
+        # Arrange.
+        path_filter = PathFilter(self._root, exclude=['vegetables', '*.odt'])
+        directory_lister = ScandirDirectoryLister(self._root, threads=2, path_filter=path_filter)
+        directory_lister.is_recording_directory_mtimes = True
+        from_path = F'{self._root}/(food|readme)/(?P<category>[^/]+)/content/(?P<name>[^/]+)$'
+        rule_matcher = RuleMatcher([TransformationConfig(from_path, '\\g<name>')])
+
+        # Act.
+        result = list(directory_lister.list_directory([rule_matcher]))
+
+        # Assert.
+        self.assertEqual([self._files[0], self._files[2], self._files[4]], sorted(result))
+        self.assertIn(os.path.join(self._root, 'food', ''), directory_lister.get_directory_mtimes())
+        self.assertNotIn(os.path.join(self._root, 'food', 'vegetables', ''), directory_lister.get_directory_mtimes())
+
+    def test_list_directory_single_thread(self):
+        directory_lister = ScandirDirectoryLister(self._root, threads=1)
+
+        result = list(directory_lister.list_directory())
+
+        self.assertEqual(sorted(self._files), sorted(result))
+        self.assertEqual({}, directory_lister.get_directory_mtimes())
+        self.assertEqual(7, directory_lister.walked_directory_count)
+
+    def test_list_directory_collect_stats(self):
+        directory_lister = ScandirDirectoryLister(self._root, collect_stats=True)
+
+        result = list(directory_lister.list_directory())
+        stat, _ = directory_lister.pop_stat(self._files[4])
+
+        self.assertEqual(len(self._files), len(result))
+        self.assertEqual(len(self._files[4]), stat.st_size)
+        self.assertIsNone(directory_lister.pop_stat(self._files[4]))
+
+    def test_list_directory_skips_directory_symlinks(self):
+        os.symlink(os.path.join(self._root, 'food'), os.path.join(self._root, 'link'))
+        directory_lister = ScandirDirectoryLister(self._root)
+
+        result = list(directory_lister.list_directory())
+
+        self.assertEqual(sorted(self._files), sorted(result))
+
+    def test_list_directory_nonexistent(self):
+        directory_lister = ScandirDirectoryLister(os.path.join(self._root, 'nonexistent'))
+
+        result = list(directory_lister.list_directory())
+
+        self.assertEqual([], result)
+
+    def test_list_directory_stop_early(self):
+        directory_lister = ScandirDirectoryLister(self._root)
+
+        paths = directory_lister.list_directory()
+        first_path = next(paths)
+        paths.close()
+
+        self.assertIn(first_path, self._files)
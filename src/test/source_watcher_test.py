@@ -0,0 +1,76 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from domain.config import TransformationConfig
+from filesystem.transformation.source_watcher import SourceWatcher
+from filesystem.transformation.transformer import Transformer
+
+
+class SourceWatcherTest(unittest.TestCase):
+
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self._root = self._directory.name
+        os.makedirs(os.path.join(self._root, 'food', 'fruits', 'content'))
+
+        transformations = [
+            TransformationConfig(
+                '.*/(?P<title>[^/]+)/(?P<category>[^/]+)/content/(?P<filename>.+)\\.(?P<extension>md|odt|txt)$',
+                'cyclopaedia/\\g<title> [\\g<category>]/\\g<filename>.\\g<extension>')
+        ]
+        self._transformer = Transformer()
+        self._watcher = SourceWatcher(self._transformer, self._root, transformations)
+        self._watcher.start()
+
+    def tearDown(self):
+        self._watcher.stop()
+        self._directory.cleanup()
+
+    def test_file_created(self):
+        source = self._create_file('food', 'fruits', 'content', 'apple.md')
+
+        self._wait_for(lambda: self._transformer.get_source_path('cyclopaedia/food [fruits]/apple.md') == source)
+
+    def test_file_deleted(self):
+        source = self._create_file('food', 'fruits', 'content', 'apple.md')
+        self._wait_for(lambda: self._transformer.get_source_path('cyclopaedia/food [fruits]/apple.md') == source)
+
+        os.unlink(source)
+
+        self._wait_for(lambda: not self._transformer.get_directory_contents('/'))
+
+    def test_directory_created(self):
+        directory = os.path.join(self._root, 'food', 'vegetables', 'content')
+        os.makedirs(directory)
+        source = self._create_file('food', 'vegetables', 'content', 'aubergine.txt')
+
+        self._wait_for(
+            lambda: self._transformer.get_source_path('cyclopaedia/food [vegetables]/aubergine.txt') == source)
+
+    def test_directory_moved(self):
+        self._create_file('food', 'fruits', 'content', 'apple.md')
+        self._wait_for(lambda: self._transformer.get_directory_contents('/cyclopaedia') == ['food [fruits]'])
+
+        shutil.move(os.path.join(self._root, 'food', 'fruits'), os.path.join(self._root, 'food', 'berries'))
+
+        self._wait_for(lambda: self._transformer.get_directory_contents('/cyclopaedia') == ['food [berries]'])
+        self.assertEqual(
+            os.path.join(self._root, 'food', 'berries', 'content', 'apple.md'),
+            self._transformer.get_source_path('cyclopaedia/food [berries]/apple.md'))
+
+    def _create_file(self, *parts):
+        path = os.path.join(self._root, *parts)
+        with open(path, 'w', encoding='utf-8'):
+            pass
+
+        return path
+
+    def _wait_for(self, condition):
+        deadline = time.monotonic() + 5
+        while not condition():
+            if time.monotonic() > deadline:
+                self.fail('The index has not been updated.')
+            time.sleep(0.01)
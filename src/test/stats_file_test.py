@@ -0,0 +1,89 @@
+import errno
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from fuse import FuseOSError
+
+from filesystem.mirror_fs import MirrorFs
+from filesystem.stats_file import StatsFile
+from filesystem.transformer_fs import TransformerFs
+from filesystem.transformation.transformer import Transformer
+from util.metrics import Metrics
+
+
+class StatsFileTest(unittest.TestCase):
+
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        with open(os.path.join(self._directory.name, 'apple.md'), 'w', encoding='utf-8') as source_file:
+            source_file.write('apple')
+
+        self._mirror_fs = MirrorFs(self._directory.name)
+        self._metrics = Metrics()
+        self._metrics.install(self._mirror_fs)
+        StatsFile(self._metrics).install(self._mirror_fs)
+
+    def tearDown(self):
+        self._directory.cleanup()
+
+    def test_readdir(self):
+        root_entries = [entry[0] for entry in self._mirror_fs.readdir('/', None)]
+        entries = [entry[0] for entry in self._mirror_fs.readdir('/.routerfs', None)]
+
+        self.assertEqual(['.', '..', 'apple.md', '.routerfs'], root_entries)
+        self.assertEqual(['.', '..', 'stats', 'stats.prom'], entries)
+
+    def test_readdir_offset(self):
+        transformer = Transformer()
+        transformer.add_entries([('apple.md', os.path.join(self._directory.name, 'apple.md'))])
+        transformer_fs = TransformerFs(transformer)
+        StatsFile(self._metrics).install(transformer_fs)
+
+        root_entries = list(transformer_fs.readdir('/', None, 2))
+        last_entries = list(transformer_fs.readdir('/', None, 3))
+        no_entries = list(transformer_fs.readdir('/', None, root_entries[-1][2]))
+
+        self.assertEqual(['apple.md', '.routerfs'], [entry[0] for entry in root_entries])
+        self.assertEqual(['.routerfs'], [entry[0] for entry in last_entries])
+        self.assertEqual([], no_entries)
+
+    def test_read(self):
+        # Arrange.
+        self._mirror_fs.getattr('/apple.md')
+        attributes = self._mirror_fs.getattr('/.routerfs/stats')
+
+        # Act.
+        fh = self._mirror_fs.open('/.routerfs/stats', os.O_RDONLY)
+        content = self._mirror_fs.read('/.routerfs/stats', attributes['st_size'], 0, fh)
+        self._mirror_fs.release('/.routerfs/stats', fh)
+
+        # Assert.
+        self.assertEqual(attributes['st_size'], len(content))
+        self.assertEqual(1, json.loads(content.decode())['operations']['getattr']['calls'])
+
+    def test_getattr_not_rendered(self):
+        # Arrange.
+        fh = self._mirror_fs.open('/.routerfs/stats', os.O_RDONLY)
+        content = self._mirror_fs.read('/.routerfs/stats', 65536, 0, fh)
+        self._mirror_fs.release('/.routerfs/stats', fh)
+
+        # Act.
+        with patch.object(self._metrics, 'to_json') as to_json:
+            attributes = self._mirror_fs.getattr('/.routerfs/stats')
+
+        # Assert.
+        to_json.assert_not_called()
+        self.assertEqual(len(content), attributes['st_size'])
+
+    def test_write(self):
+        with self.assertRaises(FuseOSError) as context:
+            self._mirror_fs.open('/.routerfs/stats', os.O_WRONLY)
+        self.assertEqual(errno.EACCES, context.exception.errno)
+
+        with self.assertRaises(FuseOSError) as context:
+            self._mirror_fs.mkdir('/.routerfs/directory', 0o755)
+        self.assertEqual(errno.EROFS, context.exception.errno)
+        self.assertFalse(os.path.exists(os.path.join(self._directory.name, '.routerfs')))
@@ -0,0 +1,78 @@
+import signal
+import unittest
+from unittest.mock import MagicMock, patch
+
+from domain import exceptions
+from domain.config import Config, ConfigChanges
+from domain.proxy import Proxy
+from shell.supervisor import Supervisor, run_fuse
+
+
+@patch('shell.supervisor.Process')
+class SupervisorTest(unittest.TestCase):
+
+    def test_reload(self, process_class):
+        # Arrange.
+        config_changes = ConfigChanges()
+        config_changes.added['/mnt/added'] = ['added_volume']
+        config_changes.reindexed['/mnt/reindexed'] = ['reindexed_volume']
+        config_changes.removed.append('/mnt/removed')
+        config_manager = MagicMock()
+        config_manager.compare.return_value = config_changes
+        reindexed_proxy = Proxy('/mnt/reindexed', None, False, connection=MagicMock())
+        create_proxies = MagicMock(return_value=[Proxy('/mnt/added', None, False)])
+        supervisor = Supervisor(config_manager, Config(), create_proxies)
+        supervisor._start_fuse_process(reindexed_proxy)  # pylint: disable=protected-access
+        supervisor._start_fuse_process(Proxy('/mnt/removed', None, False))  # pylint: disable=protected-access
+
+        # Act.
+        supervisor.reload()
+
+        # Assert.
+        create_proxies.assert_called_once_with(['added_volume'])
+        reindexed_proxy.connection.send.assert_called_once_with(['reindexed_volume'])
+        process_class.return_value.terminate.assert_called_once_with()
+        self.assertEqual(3, process_class.return_value.start.call_count)
+
+    def test_reload_invalid(self, process_class):
+        config_manager = MagicMock()
+        config_manager.load.side_effect = exceptions.InvalidConfigException('Key missing.')
+        supervisor = Supervisor(config_manager, Config(), MagicMock())
+        supervisor._start_fuse_process(Proxy('/mnt/volume', None, False))  # pylint: disable=protected-access
+
+        with self.assertLogs(level='ERROR'):
+            supervisor.reload()
+
+        process_class.return_value.terminate.assert_not_called()
+
+    @patch('shell.supervisor.RouterFuse')
+    def test_run_fuse(self, router_fuse_class, _):
+        # Arrange.
+        calls = []
+        proxy = Proxy('/mnt/volume', 'fuse_fs', False, connection=MagicMock())
+        proxy.index_builder = MagicMock(build_seconds=1.5)
+        proxy.index_builder.build.side_effect = lambda: calls.append('build')
+        router_fuse_class.side_effect = lambda *args, **kwargs: calls.append('mount')
+
+        # Act.
+        run_fuse(proxy)
+        on_index_built = proxy.index_builder.add_callback.call_args.args[0]
+        on_index_built(proxy.index_builder)
+
+        # Assert.
+        self.assertEqual(['build', 'mount'], calls)
+        proxy.connection.send.assert_called_once_with({'build_seconds': 1.5})
+
+    @patch('shell.supervisor.RouterFuse')
+    def test_run_fuse_profiled(self, router_fuse_class, _):
+        proxy = Proxy('/mnt/volume', 'fuse_fs', False)
+        proxy.is_profiling_enabled = True
+        proxy.profiler = MagicMock()
+
+        run_fuse(proxy)
+
+        proxy.profiler.install.assert_called_once_with('fuse_fs', None)
+        proxy.profiler.listen.assert_called_once_with(signal.SIGUSR1)
+        proxy.profiler.start.assert_called_once_with()
+        proxy.profiler.stop.assert_called_once_with()
+        router_fuse_class.assert_called_once()
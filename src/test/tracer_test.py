@@ -0,0 +1,69 @@
+import logging
+import unittest
+
+from util.tracer import TRACE_LOGGER_NAME, Tracer
+
+
+class SampleFs:
+
+    def read(self, path, size):  # pylint: disable=unused-argument
+        return b'x' * size
+
+    def readdir(self, path):  # pylint: disable=unused-argument
+        yield '.'
+        yield '..'
+
+    def unlink(self, path):
+        raise OSError(path)
+
+
+class TracerTest(unittest.TestCase):
+
+    def test_format_value(self):
+        tracer = Tracer(max_payload_bytes=4)
+
+        self.assertEqual("<3 bytes b'abc'>", tracer.format_value(b'abc'))
+        self.assertEqual("<6 bytes b'abcd'...>", tracer.format_value(b'abcdef'))
+        self.assertEqual("'/a'", tracer.format_value('/a'))
+
+    def test_install(self):
+        # Arrange.
+        sample_fs = SampleFs()
+        tracer = Tracer({'unlink': 0}, max_payload_bytes=2)
+
+        # Act.
+        tracer.install(sample_fs)
+        with self.assertLogs(TRACE_LOGGER_NAME, logging.INFO) as logs:
+            sample_fs.read('/a', 3)
+            self.assertEqual(['.', '..'], list(sample_fs.readdir('/')))
+
+        # Assert.
+        self.assertEqual(
+            [
+                "SampleFs.read('/a', 3)",
+                "    -> <3 bytes b'xx'...>",
+                "SampleFs.readdir('/')",
+                "    -> ['.', '..']"
+            ],
+            [record.getMessage() for record in logs.records])
+        self.assertNotIn('unlink', vars(sample_fs))
+
+    def test_install_disabled_level(self):
+        sample_fs = SampleFs()
+        Tracer(level=logging.DEBUG).install(sample_fs)
+
+        with self.assertLogs(TRACE_LOGGER_NAME, logging.INFO) as logs:
+            sample_fs.read('/a', 1)
+            logging.getLogger(TRACE_LOGGER_NAME).info('end')
+
+        self.assertEqual(['end'], [record.getMessage() for record in logs.records])
+
+    def test_install_raised(self):
+        sample_fs = SampleFs()
+        Tracer().install(sample_fs)
+
+        with self.assertLogs(TRACE_LOGGER_NAME, logging.INFO) as logs:
+            with self.assertRaises(OSError):
+                sample_fs.unlink('/a')
+
+        self.assertEqual("    raised /a", logs.records[-1].getMessage())
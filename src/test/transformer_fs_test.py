@@ -0,0 +1,168 @@
+import errno
+import itertools
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+from fuse import FuseOSError
+
+from filesystem.attribute_cache import AttributeCache
+from filesystem.mmap_pool import MmapPool
+from filesystem.negative_cache import NegativeCache
+from filesystem.transformer_fs import TransformerFs
+from filesystem.transformation.transformer import Transformer
+
+
+class TransformerFsTest(unittest.TestCase):
+
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self._source = os.path.join(self._directory.name, 'apple.md')
+        with open(self._source, 'w', encoding='utf-8') as source_file:
+            source_file.write('apple')
+
+        self._attribute_cache = AttributeCache(60)
+        self._transformer = Transformer(self._attribute_cache)
+        self._transformer.add_entries([('cyclopaedia/food [fruits]/apple.md', self._source)])
+        self._transformer_fs = TransformerFs(self._transformer, attribute_cache=self._attribute_cache)
+
+    def tearDown(self):
+        self._directory.cleanup()
+
+    def test_getattr_file(self):
+        result = self._transformer_fs.getattr('/cyclopaedia/food [fruits]/apple.md')
+
+        self.assertEqual(5, result['st_size'])
+
+    def test_getattr_cached(self):
+        self._transformer_fs.getattr('/cyclopaedia/food [fruits]/apple.md')
+        with open(self._source, 'a', encoding='utf-8') as source_file:
+            source_file.write(' pie')
+
+        cached_result = self._transformer_fs.getattr('/cyclopaedia/food [fruits]/apple.md')
+        self._attribute_cache.invalidate('/cyclopaedia/food [fruits]/apple.md')
+        result = self._transformer_fs.getattr('/cyclopaedia/food [fruits]/apple.md')
+
+        self.assertEqual(5, cached_result['st_size'])
+        self.assertEqual(9, result['st_size'])
+
+    def test_getattr_directory(self):
+        root_result = self._transformer_fs.getattr('/')
+        result = self._transformer_fs.getattr('/cyclopaedia/food [fruits]')
+
+        self.assertEqual(16877, root_result['st_mode'])
+        self.assertEqual(16877, result['st_mode'])
+
+    def test_getattr_nonexistent(self):
+        with self.assertRaises(FuseOSError) as context:
+            self._transformer_fs.getattr('/cyclopaedia/food [vegetables]')
+
+        self.assertEqual(errno.ENOENT, context.exception.errno)
+
+    def test_getattr_nonexistent_cached(self):
+        transformer_fs = TransformerFs(self._transformer, negative_cache=NegativeCache(10))
+        with self.assertRaises(FuseOSError):
+            transformer_fs.getattr('/cyclopaedia/food [fruits]/pie.md')
+
+        with patch.object(self._transformer, 'get_source_path') as get_source_path:
+            with self.assertRaises(FuseOSError):
+                transformer_fs.getattr('/cyclopaedia/food [fruits]/pie.md')
+
+        get_source_path.assert_not_called()
+
+    def test_getattr_nonexistent_added(self):
+        transformer_fs = TransformerFs(self._transformer, negative_cache=NegativeCache(10))
+        with self.assertRaises(FuseOSError):
+            transformer_fs.getattr('/cyclopaedia/food [fruits]/pie.md')
+
+        self._transformer.add_entries([('cyclopaedia/food [fruits]/pie.md', self._source)])
+        result = transformer_fs.getattr('/cyclopaedia/food [fruits]/pie.md')
+
+        self.assertEqual(5, result['st_size'])
+
+    def test_access_directory(self):
+        self.assertEqual(0, self._transformer_fs.access('/cyclopaedia', os.R_OK))
+        with self.assertRaises(FuseOSError):
+            self._transformer_fs.access('/cyclopaedia', os.W_OK)
+
+    def test_statfs_cached_per_volume(self):
+        # Arrange.
+        self._transformer.add_entries([('cyclopaedia/food [fruits]/banana.md', self._source + '.banana')])
+        index_builder = MagicMock(is_ready=True, source_directories=[self._directory.name])
+        transformer_fs = TransformerFs(self._transformer, index_builder, attribute_cache=self._attribute_cache)
+
+        # Act.
+        with patch('os.statvfs', wraps=os.statvfs) as statvfs:
+            result = transformer_fs.statfs('/cyclopaedia/food [fruits]/apple.md')
+            cached_result = transformer_fs.statfs('/cyclopaedia/food [fruits]/banana.md')
+
+        # Assert.
+        statvfs.assert_called_once_with(self._source)
+        self.assertEqual(result, cached_result)
+
+    def test_read_into(self):
+        transformer_fs = TransformerFs(self._transformer, mmap_pool=MmapPool(1))
+        buffer = bytearray(8)
+
+        fh = transformer_fs.open('/cyclopaedia/food [fruits]/apple.md', os.O_RDONLY)
+        mapped_size = transformer_fs.read_into('/cyclopaedia/food [fruits]/apple.md', memoryview(buffer)[:3], 1, fh)
+        size = transformer_fs.read_into('/cyclopaedia/food [fruits]/apple.md', memoryview(buffer)[3:], 1, fh)
+        transformer_fs.release('/cyclopaedia/food [fruits]/apple.md', fh)
+
+        self.assertEqual(3, mapped_size)
+        self.assertEqual(4, size)
+        self.assertEqual(b'pplpple\0', buffer)
+
+    def test_readdir(self):
+        self._transformer.add_entries([('cyclopaedia/food [fruits]/banana.md', self._source + '.banana')])
+        self._transformer_fs.getattr('/cyclopaedia/food [fruits]/apple.md')
+
+        root_entries = list(self._transformer_fs.readdir('/', None))
+        entries = list(self._transformer_fs.readdir('/cyclopaedia/food [fruits]', None))
+
+        self.assertEqual(('cyclopaedia', 16877), (root_entries[2][0], root_entries[2][1]['st_mode']))
+        self.assertEqual(['.', '..', 'apple.md', 'banana.md'], [entry[0] for entry in entries])
+        self.assertEqual(5, entries[2][1]['st_size'])
+        self.assertIsNone(entries[3][1])
+
+    def test_readdir_offset(self):
+        self._transformer.add_entries([('cyclopaedia/food [fruits]/banana.md', self._source + '.banana')])
+
+        first_entries = list(itertools.islice(self._transformer_fs.readdir('/cyclopaedia/food [fruits]', None), 3))
+        entries = list(self._transformer_fs.readdir('/cyclopaedia/food [fruits]', None, first_entries[-1][2]))
+
+        self.assertEqual([('.', 1), ('..', 2), ('apple.md', 3)], [(entry[0], entry[2]) for entry in first_entries])
+        self.assertEqual([('banana.md', 4)], [(entry[0], entry[2]) for entry in entries])
+
+    def test_readdir_pinned_to_handle(self):
+        # Arrange.
+        self._transformer.add_entries([('cyclopaedia/food [fruits]/banana.md', self._source + '.banana')])
+        fh = self._transformer_fs.opendir('/cyclopaedia/food [fruits]')
+        first_entries = list(itertools.islice(self._transformer_fs.readdir('/cyclopaedia/food [fruits]', fh), 3))
+        self._transformer.add_entries([('cyclopaedia/food [fruits]/avocado.md', self._source + '.avocado')])
+
+        # Act.
+        with patch.object(self._transformer, 'get_directory_contents') as get_directory_contents:
+            entries = list(self._transformer_fs.readdir('/cyclopaedia/food [fruits]', fh, first_entries[-1][2]))
+        self._transformer_fs.releasedir('/cyclopaedia/food [fruits]', fh)
+        released_entries = list(self._transformer_fs.readdir('/cyclopaedia/food [fruits]', fh))
+
+        # Assert.
+        get_directory_contents.assert_not_called()
+        self.assertEqual([('banana.md', 4)], [(entry[0], entry[2]) for entry in entries])
+        self.assertIn('avocado.md', [entry[0] for entry in released_entries])
+
+    def test_readdir_cached(self):
+        # Arrange.
+        list(self._transformer_fs.readdir('/cyclopaedia/food [fruits]', None))
+
+        # Act.
+        with patch.object(self._transformer, 'get_directory_contents') as get_directory_contents:
+            list(self._transformer_fs.readdir('/cyclopaedia/food [fruits]', None, 2))
+        self._transformer.add_entries([('cyclopaedia/food [fruits]/banana.md', self._source + '.banana')])
+        entries = list(self._transformer_fs.readdir('/cyclopaedia/food [fruits]', None, 2))
+
+        # Assert.
+        get_directory_contents.assert_not_called()
+        self.assertEqual(['apple.md', 'banana.md'], [entry[0] for entry in entries])
@@ -1,8 +1,13 @@
+import os
+import threading
+import time
 import unittest
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 
 from domain.config import TransformationConfig
+from filesystem.attribute_cache import AttributeCache, KIND_ATTRIBUTES
 from filesystem.transformation.directory_lister import DirectoryLister
+from filesystem.transformation.path_index import PathIndex
 from filesystem.transformation.transformer import Transformer
 
 
@@ -24,6 +29,28 @@ class DirectoryListerTest(unittest.TestCase):
 
         self.assertEqual(['cyclopaedia'], result)
 
+    def test_is_directory(self):
+        transformer = self._prepare_transformer()
+
+        self.assertTrue(transformer.is_directory('/'))
+        self.assertTrue(transformer.is_directory('/cyclopaedia/food [fruits]'))
+        self.assertFalse(transformer.is_directory('/cyclopaedia/food [fruits]/apple.md'))
+        self.assertFalse(transformer.is_directory('/cyclopaedia/food [nuts]'))
+
+    def test_add_to_cache_attributes(self):
+        attribute_cache = AttributeCache(60)
+        directory_lister = DirectoryLister('/home/root/food')
+        directory_lister.list_directory = MagicMock(return_value=['/home/root/doc/food/fruits/content/apple.md'])
+        directory_lister.pop_stat = MagicMock(
+            return_value=(os.stat_result((33188, 0, 0, 1, 0, 0, 5, 0, 0, 0)), time.monotonic()))
+
+        transformer = Transformer(attribute_cache)
+        transformer.add_to_cache(directory_lister, self._create_transformations())
+        result = attribute_cache.get('/cyclopaedia/food [fruits]/apple.md', KIND_ATTRIBUTES)
+
+        self.assertEqual(5, result['st_size'])
+        self.assertEqual(33188, result['st_mode'])
+
     def test_get_source_path_existing(self):
         transformer = self._prepare_transformer()
 
@@ -52,6 +79,160 @@ class DirectoryListerTest(unittest.TestCase):
             '/home/root/doc/food/vegetables/content/aubergine.txt',
             result)
 
+    def test_add_source_path(self):
+        transformer = self._prepare_transformer()
+        rule_matcher = transformer.compile_transformations(self._create_transformations())
+
+        is_added = transformer.add_source_path('/home/root/doc/food/nuts/content/walnut.md', rule_matcher)
+        is_ignored = not transformer.add_source_path('/home/root/doc/food/nuts/draft/peanut.md', rule_matcher)
+
+        self.assertTrue(is_added)
+        self.assertTrue(is_ignored)
+        self.assertEqual(
+            ['food [fruits]', 'food [nuts]', 'food [vegetables]'],
+            sorted(transformer.get_directory_contents('cyclopaedia')))
+        self.assertEqual(
+            '/home/root/doc/food/nuts/content/walnut.md',
+            transformer.get_source_path('cyclopaedia/food [nuts]/walnut.md'))
+
+    def test_remove_source_path(self):
+        transformer = self._prepare_transformer()
+        rule_matcher = transformer.compile_transformations(self._create_transformations())
+
+        is_removed = transformer.remove_source_path(
+            '/home/root/doc/food/vegetables/content/aubergine.txt', rule_matcher)
+
+        self.assertTrue(is_removed)
+        self.assertEqual(['food [fruits]'], transformer.get_directory_contents('cyclopaedia'))
+        self.assertEqual('', transformer.get_source_path('cyclopaedia/food [vegetables]/aubergine.txt'))
+
+    def test_remove_source_directory(self):
+        transformer = self._prepare_transformer()
+
+        transformer.remove_source_directory('/home/root/doc/food')
+
+        self.assertEqual([], transformer.get_directory_contents('/'))
+        self.assertEqual([], transformer.get_entries())
+
+    def test_rebuild_keeping_entries(self):
+        transformer = self._prepare_transformer()
+        directory_lister = MagicMock(list_directory=MagicMock(return_value=['/home/root/notes/plum.md']))
+
+        transformer.rebuild([(directory_lister, [TransformationConfig('.*/(?P<name>[^/]+)$', 'notes/\\g<name>')])])
+
+        self.assertEqual(4, len(transformer.get_entries()))
+        self.assertEqual('/home/root/notes/plum.md', transformer.get_source_path('/notes/plum.md'))
+        self.assertEqual(2, len(transformer.get_rule_statistics()))
+
+    def test_rebuild_applying_changes(self):
+        # Arrange.
+        transformer = self._prepare_transformer()
+        rule_matcher = transformer.compile_transformations(self._create_transformations())
+
+        def list_directory(rule_matchers):  # pylint: disable=unused-argument
+            # Changes reported by a watcher while the index is rebuilt.
+            transformer.add_source_path('/home/root/doc/food/nuts/content/walnut.md', rule_matcher)
+            transformer.remove_source_path('/home/root/doc/food/fruits/content/apple.md', rule_matcher)
+            yield '/home/root/notes/plum.md'
+
+        directory_lister = MagicMock(list_directory=MagicMock(side_effect=list_directory))
+
+        # Act.
+        transformer.rebuild([(directory_lister, [TransformationConfig('.*/(?P<name>[^/]+)$', 'notes/\\g<name>')])])
+
+        # Assert.
+        self.assertEqual(
+            [
+                ('cyclopaedia/food [fruits]/banana.odt', '/home/root/doc/food/fruits/content/banana.odt'),
+                ('cyclopaedia/food [nuts]/walnut.md', '/home/root/doc/food/nuts/content/walnut.md'),
+                ('cyclopaedia/food [vegetables]/aubergine.txt', '/home/root/doc/food/vegetables/content/aubergine.txt'),
+                ('notes/plum.md', '/home/root/notes/plum.md')
+            ],
+            sorted(transformer.get_entries()))
+
+    def test_rebuild_replacing_volume(self):
+        # Arrange.
+        kept_sources = [('/home/root/doc', Transformer.compile_transformations(self._create_transformations()))]
+        attribute_cache = AttributeCache(60)
+        transformer = Transformer(attribute_cache)
+        transformer.add_entries([
+            ('cyclopaedia/food [fruits]/apple.md', '/home/root/doc/food/fruits/content/apple.md'),
+            ('removed/plum.md', '/home/root/removed/plum.md')])
+        attribute_cache.set('/removed/plum.md', KIND_ATTRIBUTES, {'st_size': 1})
+
+        # Act.
+        transformer.rebuild([], kept_sources)
+
+        # Assert.
+        self.assertEqual(
+            [('cyclopaedia/food [fruits]/apple.md', '/home/root/doc/food/fruits/content/apple.md')],
+            transformer.get_entries())
+        self.assertEqual(['cyclopaedia'], transformer.get_directory_contents('/'))
+        self.assertIsNone(attribute_cache.get('/removed/plum.md', KIND_ATTRIBUTES))
+
+    def test_get_index_statistics(self):
+        transformer = self._prepare_transformer()
+
+        statistics = transformer.get_index_statistics()
+
+        self.assertEqual(3, statistics['entries'])
+        self.assertEqual(3, statistics['directories'])
+        self.assertGreater(statistics['memory_bytes'], 0)
+
+    def test_get_index_statistics_cached(self):
+        transformer = self._prepare_transformer()
+        transformer.get_index_statistics()
+
+        with patch.object(PathIndex, 'get_memory_size', return_value=1) as get_memory_size:
+            cached_statistics = transformer.get_index_statistics()
+            transformer.add_entries([('cyclopaedia/walnut.md', '/home/root/doc/walnut.md')])
+            statistics = transformer.get_index_statistics()
+
+        get_memory_size.assert_called_once_with()
+        self.assertGreater(cached_statistics['memory_bytes'], 1)
+        self.assertEqual(1, statistics['memory_bytes'])
+
+    def test_lookups_during_updates(self):
+        transformer = self._prepare_transformer()
+        rule_matcher = transformer.compile_transformations(self._create_transformations())
+        paths = [F'/home/root/doc/food/nuts/content/walnut{i}.md' for i in range(100)]
+        errors = []
+
+        def update():
+            for _ in range(20):
+                for path in paths:
+                    transformer.add_source_path(path, rule_matcher)
+                for path in paths:
+                    transformer.remove_source_path(path, rule_matcher)
+
+        def look_up():
+            try:
+                for _ in range(2000):
+                    transformer.get_directory_contents('/cyclopaedia/food [nuts]')
+                    transformer.is_directory('/cyclopaedia/food [nuts]')
+                    transformer.get_source_path('/cyclopaedia/food [nuts]/walnut50.md')
+                    transformer.get_entries()
+            except Exception as exception:  # pylint: disable=broad-except
+                errors.append(exception)
+
+        threads = [threading.Thread(target=update)] + [threading.Thread(target=look_up) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual([], errors)
+        self.assertEqual(
+            ['food [fruits]', 'food [vegetables]'],
+            sorted(transformer.get_directory_contents('/cyclopaedia')))
+
+    def _create_transformations(self):
+        return [
+            TransformationConfig(
+                '.*/(?P<title>[^/]+)/(?P<category>[^/]+)/content/(?P<filename>.+)\\.(?P<extension>md|odt|txt)$',
+                'cyclopaedia/\\g<title> [\\g<category>]/\\g<filename>.\\g<extension>')
+        ]
+
     def _prepare_transformer(self):
 
         files = [
@@ -61,11 +242,7 @@ class DirectoryListerTest(unittest.TestCase):
             '/home/root/doc/food/fruits/draft/cherry.md']
         directory_lister = DirectoryLister('/home/root/food')
         directory_lister.list_directory = MagicMock(return_value=files)
-        transformations = [
-            TransformationConfig(
-                '.*/(?P<title>[^/]+)/(?P<category>[^/]+)/content/(?P<filename>.+)\\.(?P<extension>md|odt|txt)$',
-                'cyclopaedia/\\g<title> [\\g<category>]/\\g<filename>.\\g<extension>')
-        ]
+        transformations = self._create_transformations()
 
         transformer = Transformer()
         transformer.add_to_cache(directory_lister, transformations)
@@ -0,0 +1,35 @@
+import os
+import tempfile
+import unittest
+
+from benchmark.tree_generator import TRANSFORMATION, GeneratedDirectoryLister, TreeGenerator
+from domain.config import TransformationConfig
+from filesystem.transformation.transformer import Transformer
+
+
+class TreeGeneratorTest(unittest.TestCase):
+
+    def test_create(self):
+        with tempfile.TemporaryDirectory() as directory:
+            tree_generator = TreeGenerator(directory, 250, files_per_directory=50)
+
+            tree_generator.create()
+
+            created_paths = sorted(
+                os.path.join(dirname, filename)
+                for dirname, _, filenames
+                in os.walk(directory)
+                for filename
+                in filenames)
+            self.assertEqual(sorted(tree_generator.generate_paths()), created_paths)
+            self.assertEqual(250, len(created_paths))
+
+    def test_generate_paths(self):
+        transformer = Transformer()
+        tree_generator = TreeGenerator('/doc', 1000)
+
+        transformer.add_to_cache(GeneratedDirectoryLister(tree_generator), [TransformationConfig(*TRANSFORMATION)])
+
+        self.assertEqual(list(tree_generator.generate_paths()), list(TreeGenerator('/doc', 1000).generate_paths()))
+        self.assertGreater(len(transformer.get_entries()), 300)
+        self.assertLess(len(transformer.get_entries()), 800)
@@ -0,0 +1,167 @@
+import errno
+import functools
+import inspect
+import json
+import threading
+import time
+
+from util.operation_wrapper import wrap_operations
+
+LATENCY_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+
+class OperationMetrics:
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = {}
+        self.latency_buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.latency_sum = 0.0
+        self.bytes = 0
+
+    def to_dict(self):
+        return {
+            'calls': self.calls,
+            'errors': dict(self.errors),
+            'latency_buckets': dict(zip([str(bound) for bound in LATENCY_BUCKETS] + ['+Inf'], self.latency_buckets)),
+            'latency_sum_seconds': self.latency_sum,
+            'bytes': self.bytes
+        }
+
+
+# Collects call counts, errors, latencies and transferred bytes per filesystem operation together with the statistics
+# of the index. Operations are measured by wrappers installed on the filesystem instance.
+class Metrics:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._operations = {}
+        self._index_builder = None
+        self._phases = {}
+        self._transformer = None
+
+    def install(self, fuse_fs):
+        wrap_operations(fuse_fs, self._wrap)
+
+    def record(self, name, seconds, error_number=None, size=0):
+        bucket = 0
+        while bucket < len(LATENCY_BUCKETS) and seconds > LATENCY_BUCKETS[bucket]:
+            bucket = bucket + 1
+
+        with self._lock:
+            operation_metrics = self._operations.get(name)
+            if operation_metrics is None:
+                operation_metrics = self._operations[name] = OperationMetrics()
+            operation_metrics.calls = operation_metrics.calls + 1
+            operation_metrics.latency_buckets[bucket] = operation_metrics.latency_buckets[bucket] + 1
+            operation_metrics.latency_sum = operation_metrics.latency_sum + seconds
+            operation_metrics.bytes = operation_metrics.bytes + size
+            if error_number is not None:
+                error_name = errno.errorcode.get(error_number, str(error_number))
+                operation_metrics.errors[error_name] = operation_metrics.errors.get(error_name, 0) + 1
+
+    def record_phase(self, name, seconds):
+        with self._lock:
+            self._phases[name] = self._phases.get(name, 0.0) + seconds
+
+    def set_index_builder(self, index_builder):
+        self._index_builder = index_builder
+
+    def set_transformer(self, transformer):
+        self._transformer = transformer
+
+    def to_dict(self):
+        with self._lock:
+            operations = {name: metrics.to_dict() for name, metrics in self._operations.items()}
+            phases = dict(self._phases)
+
+        result = {'operations': operations, 'index': {'build_seconds': phases}}
+        if self._index_builder is not None:
+            result['index'].update(self._index_builder.get_progress())
+        if self._transformer is not None:
+            result['index'].update(self._transformer.get_index_statistics())
+            result['rules'] = [
+                {'from': statistics.from_path, 'candidates': statistics.candidates, 'matches': statistics.matches}
+                for statistics
+                in self._transformer.get_rule_statistics()
+            ]
+
+        return result
+
+    def to_json(self):
+        return json.dumps(self.to_dict(), indent=2, sort_keys=True) + '\n'
+
+    def to_prometheus(self):
+        metrics = self.to_dict()
+        lines = []
+
+        _add_metric_header(lines, 'routerfs_operation_calls_total', 'counter')
+        for name, operation in sorted(metrics['operations'].items()):
+            lines.append(F'routerfs_operation_calls_total{{operation="{name}"}} {operation["calls"]}')
+        _add_metric_header(lines, 'routerfs_operation_errors_total', 'counter')
+        for name, operation in sorted(metrics['operations'].items()):
+            for error_name, count in sorted(operation['errors'].items()):
+                lines.append(F'routerfs_operation_errors_total{{operation="{name}",errno="{error_name}"}} {count}')
+        _add_metric_header(lines, 'routerfs_operation_bytes_total', 'counter')
+        for name, operation in sorted(metrics['operations'].items()):
+            lines.append(F'routerfs_operation_bytes_total{{operation="{name}"}} {operation["bytes"]}')
+
+        _add_metric_header(lines, 'routerfs_operation_latency_seconds', 'histogram')
+        for name, operation in sorted(metrics['operations'].items()):
+            cumulative_count = 0
+            for bound, count in operation['latency_buckets'].items():
+                cumulative_count = cumulative_count + count
+                lines.append(
+                    F'routerfs_operation_latency_seconds_bucket{{operation="{name}",le="{bound}"}} {cumulative_count}')
+            latency_sum = operation['latency_sum_seconds']
+            lines.append(F'routerfs_operation_latency_seconds_sum{{operation="{name}"}} {latency_sum}')
+            lines.append(F'routerfs_operation_latency_seconds_count{{operation="{name}"}} {operation["calls"]}')
+
+        index = metrics['index']
+        _add_metric_header(lines, 'routerfs_index_build_seconds', 'gauge')
+        for phase, seconds in sorted(index['build_seconds'].items()):
+            lines.append(F'routerfs_index_build_seconds{{phase="{phase}"}} {seconds}')
+        for key, value in sorted(index.items()):
+            if key != 'build_seconds':
+                _add_metric_header(lines, F'routerfs_index_{key}', 'gauge')
+                lines.append(F'routerfs_index_{key} {value}')
+
+        return '\n'.join(lines) + '\n'
+
+    def _wrap(self, name, operation):
+        if inspect.isgeneratorfunction(inspect.unwrap(operation)):
+            @functools.wraps(operation)
+            def generator_wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    yield from operation(*args, **kwargs)
+                except OSError as exception:
+                    self.record(name, time.perf_counter() - start, exception.errno)
+                    raise
+                self.record(name, time.perf_counter() - start)
+            return generator_wrapper
+
+        @functools.wraps(operation)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return_value = operation(*args, **kwargs)
+            except OSError as exception:
+                self.record(name, time.perf_counter() - start, exception.errno)
+                raise
+            self.record(name, time.perf_counter() - start, size=_get_size(name, return_value))
+            return return_value
+        return wrapper
+
+
+def _add_metric_header(lines, name, metric_type):
+    lines.append(F'# TYPE {name} {metric_type}')
+
+
+def _get_size(name, return_value):
+    if name == 'read':
+        return len(return_value)
+    if name in ('read_into', 'write'):
+        return return_value
+
+    return 0
@@ -0,0 +1,40 @@
+import functools
+import inspect
+import threading
+
+
+def get_operation_names(fuse_fs):
+    return [
+        name
+        for name
+        in dir(type(fuse_fs))
+        if not name.startswith('_') and callable(getattr(fuse_fs, name))
+    ]
+
+
+# The wrappers are installed on the instance, so nothing is added to the calls of filesystems that do not use them.
+def wrap_operations(fuse_fs, wrap, names=None):
+    for name in names if names is not None else get_operation_names(fuse_fs):
+        setattr(fuse_fs, name, wrap(name, getattr(fuse_fs, name)))
+
+
+def limit_concurrency(fuse_fs, limit):
+    semaphore = threading.BoundedSemaphore(limit)
+
+    def wrap(_, operation):
+        if inspect.isgeneratorfunction(inspect.unwrap(operation)):
+            @functools.wraps(operation)
+            def generator_wrapper(*args, **kwargs):
+                with semaphore:
+                    yield from operation(*args, **kwargs)
+
+            return generator_wrapper
+
+        @functools.wraps(operation)
+        def wrapper(*args, **kwargs):
+            with semaphore:
+                return operation(*args, **kwargs)
+
+        return wrapper
+
+    wrap_operations(fuse_fs, wrap)
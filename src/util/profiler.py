@@ -0,0 +1,210 @@
+import collections
+import functools
+import inspect
+import logging
+import os
+import signal
+import sys
+import threading
+import time
+
+from util.operation_wrapper import get_operation_names, wrap_operations
+
+_INDEX_BUILDER_OPERATIONS = ('build', 'rebuild')
+_REPORTED_FUNCTIONS = 25
+
+
+# Samples the stacks of the threads running filesystem operations or building the index. While the profiler is
+# stopped, nothing is wrapped and no thread is running, so it has no overhead. Starting it wraps the operations on the
+# instances, to record their calls and to mark the threads running them, and starts a thread that takes a sample every
+# sample_interval seconds. Stopping it restores the operations and writes two files to the output directory: the
+# cumulative statistics of every operation (.txt) and the sampled stacks in the collapsed format read by flame graph
+# tools (.collapsed).
+# pylint: disable=too-many-instance-attributes
+class Profiler:
+
+    def __init__(self, output_directory, sample_interval=0.01):
+        self._output_directory = output_directory
+        self._sample_interval = sample_interval
+        self._calls = {}
+        self._lock = threading.Lock()
+        self._operations_by_threads = {}
+        self._original_operations = []
+        self._stack_counts = collections.Counter()
+        self._start_time = None
+        self._stop_event = threading.Event()
+        self._targets = []
+        self._thread = None
+        self._wrapper_codes = set()
+
+    @property
+    def is_running(self):
+        return self._thread is not None
+
+    def install(self, fuse_fs, index_builder=None):
+        self._targets.append((fuse_fs, get_operation_names(fuse_fs), ''))
+        if index_builder is not None:
+            self._targets.append((index_builder, _INDEX_BUILDER_OPERATIONS, 'index.'))
+
+    def listen(self, signum):
+        # Python only runs signal handlers on the main thread, which does not return from libfuse while the filesystem
+        # is mounted, so the signal is received through the wakeup file descriptor on a thread of its own.
+        read_fd, write_fd = os.pipe()
+        os.set_blocking(write_fd, False)
+        signal.signal(signum, lambda *_: None)
+        signal.set_wakeup_fd(write_fd)
+        thread = threading.Thread(target=self._receive_signals, args=(read_fd, signum), name='profiler-signals')
+        thread.daemon = True
+        thread.start()
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._calls = {}
+            self._stack_counts = collections.Counter()
+            for target, names, prefix in self._targets:
+                self._original_operations.extend((target, name, vars(target).get(name)) for name in names)
+                wrap_operations(target, functools.partial(self._wrap, prefix), names)
+            self._start_time = time.monotonic()
+            self._stop_event.clear()
+            self._thread = threading.Thread(target=self._run, name='profiler', daemon=True)
+            self._thread.start()
+        logging.info('Profiling started.')
+
+    def stop(self):
+        with self._lock:
+            if self._thread is None:
+                return
+            for target, name, operation in reversed(self._original_operations):
+                if operation is None:
+                    delattr(target, name)
+                else:
+                    setattr(target, name, operation)
+            self._original_operations = []
+            self._stop_event.set()
+            thread, self._thread = self._thread, None
+        thread.join()
+
+        self._write_results(time.monotonic() - self._start_time)
+
+    def toggle(self):
+        if self.is_running:
+            self.stop()
+        else:
+            self.start()
+
+    def _enter(self, name):
+        thread_id = threading.get_ident()
+        previous_name = self._operations_by_threads.get(thread_id)
+        self._operations_by_threads[thread_id] = name
+
+        return thread_id, previous_name, time.perf_counter()
+
+    def _exit(self, name, thread_id, previous_name, start):
+        seconds = time.perf_counter() - start
+        if previous_name is None:
+            del self._operations_by_threads[thread_id]
+        else:
+            self._operations_by_threads[thread_id] = previous_name
+        with self._lock:
+            calls = self._calls.setdefault(name, [0, 0.0])
+            calls[0] = calls[0] + 1
+            calls[1] = calls[1] + seconds
+
+    def _receive_signals(self, read_fd, signum):
+        while True:
+            for received_signum in os.read(read_fd, 64):
+                if received_signum == signum:
+                    try:
+                        self.toggle()
+                    except Exception:  # pylint: disable=broad-except
+                        logging.exception('Could not toggle profiling.')
+
+    def _run(self):
+        while not self._stop_event.wait(self._sample_interval):
+            self._sample()
+
+    def _sample(self):
+        frames = sys._current_frames()  # pylint: disable=protected-access
+        for thread_id, name in list(self._operations_by_threads.items()):
+            frame = frames.get(thread_id)
+            stack = []
+            # Frames are collected up to the wrapper of the operation.
+            while frame is not None and frame.f_code not in self._wrapper_codes:
+                code = frame.f_code
+                stack.append(F'{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})')
+                frame = frame.f_back
+            stack.append(name)
+            self._stack_counts[tuple(reversed(stack))] += 1
+
+    def _wrap(self, prefix, name, operation):
+        name = prefix + name
+        if inspect.isgeneratorfunction(inspect.unwrap(operation)):
+            @functools.wraps(operation)
+            def generator_wrapper(*args, **kwargs):
+                iterator = operation(*args, **kwargs)
+                while True:
+                    state = self._enter(name)
+                    try:
+                        item = next(iterator)
+                    except StopIteration:
+                        return
+                    finally:
+                        self._exit(name, *state)
+                    yield item
+            self._wrapper_codes.add(generator_wrapper.__code__)
+            return generator_wrapper
+
+        @functools.wraps(operation)
+        def wrapper(*args, **kwargs):
+            state = self._enter(name)
+            try:
+                return operation(*args, **kwargs)
+            finally:
+                self._exit(name, *state)
+        self._wrapper_codes.add(wrapper.__code__)
+        return wrapper
+
+    def _write_results(self, seconds):
+        path = os.path.join(self._output_directory, F'routerfs-profile-{os.getpid()}-{time.strftime("%Y%m%d-%H%M%S")}')
+        try:
+            with open(F'{path}.collapsed', 'w', encoding='utf-8') as collapsed_file:
+                for stack, count in sorted(self._stack_counts.items()):
+                    collapsed_file.write(F'{";".join(stack)} {count}\n')
+            with open(F'{path}.txt', 'w', encoding='utf-8') as report_file:
+                report_file.write(self._format_report(seconds))
+        except OSError as exception:
+            logging.error('Could not write profile %s. %s', path, exception)
+            return
+        logging.info('Profiling stopped, results written to %s.', path)
+
+    def _format_report(self, seconds):
+        lines = [F'Profiled for {seconds:.1f} seconds, sampled every {self._sample_interval * 1000:.0f} ms.', '']
+
+        samples_by_operations = collections.defaultdict(collections.Counter)
+        for stack, count in self._stack_counts.items():
+            samples_by_operations[stack[0]][stack] += count
+
+        for name, (call_count, total_seconds) in sorted(self._calls.items(), key=lambda item: -item[1][1]):
+            lines.append(F'{name}: {call_count} calls, {total_seconds:.3f} seconds in total')
+            stack_counts = samples_by_operations[name]
+            sample_count = sum(stack_counts.values())
+            if sample_count == 0:
+                lines.append('')
+                continue
+
+            cumulative_counts = collections.Counter()
+            own_counts = collections.Counter()
+            for stack, count in stack_counts.items():
+                for function in set(stack[1:]):
+                    cumulative_counts[function] += count
+                if len(stack) > 1:
+                    own_counts[stack[-1]] += count
+            lines.append(F'    {"cumulative":>10} {"own":>10}  function ({sample_count} samples)')
+            for function, count in cumulative_counts.most_common(_REPORTED_FUNCTIONS):
+                lines.append(
+                    F'    {count / sample_count:>10.1%} {own_counts[function] / sample_count:>10.1%}  {function}')
+            lines.append('')
+
+        return '\n'.join(lines)
@@ -0,0 +1,77 @@
+import functools
+import inspect
+import logging
+import random
+
+from util.operation_wrapper import get_operation_names, wrap_operations
+
+TRACE_LOGGER_NAME = 'routerfs.trace'
+
+
+# Logs the calls of filesystem operations. Operations with a sampling rate of zero are not wrapped at all, and the
+# arguments of the others are only formatted if the log record is going to be emitted.
+class Tracer:
+
+    def __init__(self, sample_rates=None, max_payload_bytes=32, level=logging.INFO):
+        self._sample_rates = sample_rates if sample_rates is not None else {}
+        self._max_payload_bytes = max_payload_bytes
+        self._level = level
+        self._logger = logging.getLogger(TRACE_LOGGER_NAME)
+
+    def install(self, fuse_fs):
+        names = [name for name in get_operation_names(fuse_fs) if self._get_sample_rate(name) > 0]
+        wrap_operations(fuse_fs, self._wrap, names)
+
+    def format_value(self, value):
+        if isinstance(value, (bytes, bytearray, memoryview)):
+            payload = bytes(value[:self._max_payload_bytes])
+            ellipsis = '...' if len(value) > self._max_payload_bytes else ''
+            return F'<{len(value)} bytes {payload!r}{ellipsis}>'
+
+        return repr(value)
+
+    def _get_sample_rate(self, name):
+        return self._sample_rates.get(name, 1.0)
+
+    def _wrap(self, name, operation):
+        sample_rate = self._get_sample_rate(name)
+        class_name = type(getattr(operation, '__self__', operation)).__name__
+
+        def is_traced():
+            if not self._logger.isEnabledFor(self._level):
+                return False
+            return sample_rate >= 1.0 or random.random() < sample_rate
+
+        if inspect.isgeneratorfunction(inspect.unwrap(operation)):
+            @functools.wraps(operation)
+            def generator_wrapper(*args, **kwargs):
+                if not is_traced():
+                    return (yield from operation(*args, **kwargs))
+                self._log_call(class_name, name, args, kwargs)
+                try:
+                    return_value = list(operation(*args, **kwargs))
+                except Exception as exception:
+                    self._logger.log(self._level, '    raised %s', exception)
+                    raise
+                self._logger.log(self._level, '    -> %s', self.format_value(return_value))
+                return (yield from return_value)
+            return generator_wrapper
+
+        @functools.wraps(operation)
+        def wrapper(*args, **kwargs):
+            if not is_traced():
+                return operation(*args, **kwargs)
+            self._log_call(class_name, name, args, kwargs)
+            try:
+                return_value = operation(*args, **kwargs)
+            except Exception as exception:
+                self._logger.log(self._level, '    raised %s', exception)
+                raise
+            self._logger.log(self._level, '    -> %s', self.format_value(return_value))
+            return return_value
+        return wrapper
+
+    def _log_call(self, class_name, name, args, kwargs):
+        arguments = [self.format_value(argument) for argument in args]
+        arguments.extend(F'{key}={self.format_value(value)}' for key, value in kwargs.items())
+        self._logger.log(self._level, '%s.%s(%s)', class_name, name, ', '.join(arguments))